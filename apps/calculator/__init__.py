@@ -1,5 +1,25 @@
-"""電卓アプリケーションパッケージ"""
+"""電卓アプリケーションパッケージ
 
-from .calculator import Calculator
+import apps.calculator だけでは何も読み込まない。Calculator などは最初に
+参照されたときに読み込むため、一部の機能だけを使う短命なプロセスでも
+起動が遅くならない。GUI（tkinter）は calculator_gui を明示的に
+読み込んだときだけ使われる。
+"""
 
-__all__ = ["Calculator"]
+__all__ = ["Calculator", "CachedCalculator"]
+
+
+def __getattr__(name):
+    if name == "Calculator":
+        from .calculator import Calculator as value
+    elif name == "CachedCalculator":
+        from .cached import CachedCalculator as value
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # 2回目以降は通常の属性として参照される
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
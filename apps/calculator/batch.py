@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""一括（ベクトル）演算のヘルパー
+
+NumPyが使える場合は列全体を1回のベクトル演算で計算し、
+使えない場合は純Pythonのチャンクループにフォールバックする。
+整数型の範囲を超えうる整数の計算はPythonの整数（object配列）で行うため、
+どちらでも結果は Calculator の各演算と同じになる。
+"""
+
+# Standard library imports
+import math
+import operator
+from functools import partial
+from itertools import islice, starmap, zip_longest
+
+from .power import DEFAULT_MAX_BITS, PowerLimitError, bounded_power
+
+# 純Pythonフォールバックで一度に処理する要素数
+CHUNK_SIZE = 4096
+
+ERROR_MODES = ("raise", "mask")
+
+_PY_OPS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+    "power": bounded_power,
+}
+
+_MISSING = object()
+_numpy = None
+
+
+def get_numpy():
+    """NumPyを遅延インポートして返す（インストールされていなければNone）"""
+    global _numpy
+    if _numpy is None:
+        try:
+            # Third party imports
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def apply(
+    name,
+    a,
+    b,
+    errors="raise",
+    power_max_bits=DEFAULT_MAX_BITS,
+    power_overflow="raise",
+):
+    """二項演算 name を a, b の各要素に適用する
+
+    NumPyがあれば numpy.ndarray を、なければ list を返す。
+    errors="mask" の場合は (結果, ゼロ除算マスク) のタプルを返し、
+    ゼロ除算になった要素の結果はNaNになる。
+    累乗には Calculator.power と同じ上限（power_max_bits, power_overflow）を適用する。
+    """
+    if name not in _PY_OPS:
+        raise ValueError(f"未対応の演算です: {name}")
+    if errors not in ERROR_MODES:
+        raise ValueError(f"errors は {ERROR_MODES} のいずれかを指定してください")
+
+    limits = (power_max_bits, power_overflow)
+    np = get_numpy()
+    if np is not None:
+        return _apply_numpy(np, name, a, b, errors, limits)
+    return _apply_python(name, a, b, errors, limits)
+
+
+def last_value(values, mask=None):
+    """結果の最終要素をPythonのスカラーとして返す（なければ _MISSING）"""
+    if mask is not None and len(mask) and mask[-1]:
+        return _MISSING
+    if hasattr(values, "reshape"):
+        values = values.reshape(-1)
+    if not len(values):
+        return _MISSING
+    value = values[-1]
+    return value.item() if hasattr(value, "item") else value
+
+
+def is_missing(value):
+    """last_value が値を返さなかったかどうか"""
+    return value is _MISSING
+
+
+def _zero_division_error(index):
+    return ZeroDivisionError(f"ゼロで割ることはできません (index {index})")
+
+
+def _apply_numpy(np, name, a, b, errors, limits):
+    a = _numpy_operand(np, a)
+    b = _numpy_operand(np, b)
+    if a.shape != b.shape:
+        raise ValueError("オペランドの長さが一致しません")
+
+    zero = None
+    if name == "divide":
+        zero = b == 0
+        if errors == "raise" and zero.any():
+            raise _zero_division_error(int(np.argmax(zero.reshape(-1))))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = np.true_divide(a, b)
+        result[zero] = np.nan
+    elif name == "power":
+        result = _numpy_power(np, a, b, limits)
+    elif _numpy_may_overflow(np, name, a, b):
+        # 整数型の範囲を超えうるときはPythonの整数で正確に計算する
+        result = getattr(np, name)(a.astype(object), b.astype(object))
+    else:
+        result = getattr(np, name)(a, b)
+
+    if errors == "mask":
+        if zero is None:
+            zero = np.zeros(result.shape, dtype=bool)
+        return result, zero
+    return result
+
+
+def _numpy_power(np, a, b, limits):
+    """累乗（整数同士なら Calculator.power と同じ上限と結果の型にする）"""
+    _numpy_check_zero_power(np, a, b)
+    integral = np.issubdtype(a.dtype, np.integer) and np.issubdtype(b.dtype, np.integer)
+    if not integral:
+        return np.power(a, b)
+    negative = b < 0
+    if not negative.any():
+        return _numpy_integral_power(np, a, b, limits)
+    # Pythonの 10 ** -1 == 0.1 と同じく、負の指数の要素だけ浮動小数点で計算
+    if negative.all():
+        return np.power(a.astype(np.float64), b)
+    result = np.empty(a.shape, dtype=object)
+    result[negative] = np.power(a[negative].astype(np.float64), b[negative])
+    rest = ~negative
+    result[rest] = _numpy_integral_power(np, a[rest], b[rest], limits)
+    return result
+
+
+def _numpy_integral_power(np, a, b, limits):
+    """非負の整数の指数の累乗（上限と整数型の幅を超える場合を扱う）"""
+    bits = _numpy_power_bits(np, a, b)
+    if (bits > limits[0]).any():
+        a = _numpy_power_downgrade(np, a, limits)
+    elif (bits >= np.iinfo(np.result_type(a, b)).bits - 1).any():
+        # 上限内でも整数型の幅を超えるならPythonの整数で計算する
+        a, b = a.astype(object), b.astype(object)
+    return np.power(a, b)
+
+
+def _numpy_operand(np, values):
+    """オペランドを配列にする（boolはPythonと同じく整数として計算する）"""
+    values = np.asarray(values)
+    if values.dtype.kind == "b":
+        values = values.astype(np.int64)
+    return values
+
+
+def _numpy_may_overflow(np, name, a, b):
+    """整数配列の加減乗算の結果が整数型の範囲を超えうるか（両端の値で判定）"""
+    dtype = np.result_type(a, b)
+    if dtype.kind not in "iu" or not a.size:
+        return False
+    a_min, a_max = int(a.min()), int(a.max())
+    b_min, b_max = int(b.min()), int(b.max())
+    if name == "add":
+        bounds = (a_min + b_min, a_max + b_max)
+    elif name == "subtract":
+        bounds = (a_min - b_max, a_max - b_min)
+    else:
+        bounds = (a_min * b_min, a_min * b_max, a_max * b_min, a_max * b_max)
+    info = np.iinfo(dtype)
+    return min(bounds) < info.min or max(bounds) > info.max
+
+
+def _numpy_check_zero_power(np, a, b):
+    """0 の負の累乗をPythonと同じくZeroDivisionErrorにする"""
+    invalid = (a == 0) & (b < 0)
+    if invalid.any():
+        index = int(np.argmax(invalid.reshape(-1)))
+        raise ZeroDivisionError(f"0 を負の数で累乗することはできません (index {index})")
+
+
+def _numpy_power_bits(np, a, b):
+    """整数配列の累乗の結果のおおよそのビット数（power.estimate_bits と同じ見積もり）"""
+    magnitude = np.abs(a.astype(np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bits = b * np.log2(magnitude)
+    return np.where(magnitude > 1, bits, 0)
+
+
+def _numpy_power_downgrade(np, a, limits):
+    """上限超過時の扱いを適用（"float" なら浮動小数点の配列を返す）"""
+    max_bits, overflow = limits
+    if overflow == "float":
+        return a.astype(np.float64)
+    error = PowerLimitError if overflow == "raise" else overflow
+    raise error(f"累乗の結果が大きすぎます（上限 {max_bits} ビット）")
+
+
+def iter_values(values):
+    """値を順に返す（バッファプロトコル対応オブジェクトはmemoryview経由で走査する）"""
+    try:
+        view = memoryview(values)
+    except TypeError:
+        return iter(values)
+    return iter(view.tolist()) if view.ndim > 1 else iter(view)
+
+
+def _apply_python(name, a, b, errors, limits):
+    op = _PY_OPS[name]
+    if name == "power":
+        op = partial(bounded_power, max_bits=limits[0], overflow=limits[1])
+    pairs = zip_longest(iter_values(a), iter_values(b), fillvalue=_MISSING)
+    results = []
+    mask = [] if errors == "mask" else None
+
+    while True:
+        chunk = list(islice(pairs, CHUNK_SIZE))
+        if not chunk:
+            break
+        # 長さが違う場合、埋め値はチャンクの末尾に現れる
+        if _MISSING in chunk[-1]:
+            raise ValueError("オペランドの長さが一致しません")
+        if name == "divide":
+            results.extend(_divide_chunk(chunk, len(results), mask))
+        else:
+            results.extend(starmap(op, chunk))
+            if mask is not None:
+                mask.extend([False] * len(chunk))
+
+    if mask is not None:
+        return results, mask
+    return results
+
+
+def _divide_chunk(chunk, offset, mask):
+    divisors = [y for _, y in chunk]
+    if 0 not in divisors:
+        if mask is not None:
+            mask.extend([False] * len(chunk))
+        return list(starmap(operator.truediv, chunk))
+
+    out = []
+    for i, (x, y) in enumerate(chunk):
+        if y == 0:
+            if mask is None:
+                raise _zero_division_error(offset + i)
+            mask.append(True)
+            out.append(math.nan)
+        else:
+            if mask is not None:
+                mask.append(False)
+            out.append(x / y)
+    return out
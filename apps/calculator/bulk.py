@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""一括評価パイプライン
+
+入力を一定行数のチャンクに分けてジェネレータで流し、Calculator で評価した
+結果を入力と同じ順序で返す。メモリ使用量は入力サイズによらず一定になる。
+"""
+
+# Standard library imports
+import csv
+from collections import deque
+from itertools import islice
+
+from .calculator import Calculator
+
+FORMATS = ("expr", "csv")
+
+# CSV行の演算子（記号でもメソッド名でも指定できる）
+OPERATIONS = {
+    "+": "add",
+    "-": "subtract",
+    "×": "multiply",
+    "*": "multiply",
+    "÷": "divide",
+    "/": "divide",
+    "^": "power",
+    "add": "add",
+    "subtract": "subtract",
+    "multiply": "multiply",
+    "divide": "divide",
+    "power": "power",
+}
+
+
+def parse_number(text):
+    """数値文字列を int または float に変換"""
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def format_result(value):
+    """結果を1行の文字列に変換"""
+    return str(value)
+
+
+def chunked(lines, size):
+    """行のイテラブルを size 行ずつのリストに分割"""
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_chunk(lines, fmt="expr", op=None):
+    """1チャンク分の行を評価して出力行のリストを返す
+
+    プロセスプールのワーカーからも呼ばれるため、モジュールのトップレベルに置く。
+    空行は空行のまま出力し、エラーは "エラー: ..." として該当行に出力する。
+    """
+    calc = Calculator()
+    if fmt == "csv":
+        rows = csv.reader(line.rstrip("\r\n") for line in lines)
+        return [_evaluate_row(calc, row, op) for row in rows]
+    return [_evaluate_expression(calc, line) for line in lines]
+
+
+def _evaluate_expression(calc, line):
+    line = line.strip()
+    if not line:
+        return ""
+    try:
+        return format_result(calc.evaluate(line))
+    except (ArithmeticError, ValueError, NameError, RecursionError) as e:
+        # 構文エラー（深すぎる入れ子を含む）も該当行だけのエラーにする
+        return f"エラー: {e}"
+
+
+def _evaluate_row(calc, row, op):
+    if not row:
+        return ""
+    try:
+        if op is None:
+            op, *row = row
+        name = OPERATIONS.get(op.strip())
+        if name is None:
+            raise ValueError(f"未対応の演算です: {op}")
+        if len(row) != 2:
+            raise ValueError(f"オペランドは2つ必要です: {row}")
+        a, b = (parse_number(value) for value in row)
+        return format_result(getattr(calc, name)(a, b))
+    except (ArithmeticError, ValueError) as e:
+        return f"エラー: {e}"
+
+
+def evaluate_stream(lines, fmt="expr", op=None, chunk_size=1000, workers=1):
+    """行のイテラブルを評価し、出力行のチャンクを順番にyieldする
+
+    workers が2以上ならチャンクをプロセスプールに分散する。先行して投入する
+    チャンク数を制限しているため、入力全体を読み込むことはない。
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format は {FORMATS} のいずれかを指定してください")
+    if op is not None and op not in OPERATIONS:
+        raise ValueError(f"未対応の演算です: {op}")
+    if chunk_size < 1 or workers < 1:
+        raise ValueError("chunk_size と workers は1以上を指定してください")
+
+    chunks = chunked(lines, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            yield evaluate_chunk(chunk, fmt, op)
+        return
+
+    # プロセスプールを使うときだけ読み込む（multiprocessing の読み込みは重い）
+    # Standard library imports
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(evaluate_chunk, chunk, fmt, op))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""演算結果のキャッシュ付き電卓
+
+同じ (演算, a, b) の組み合わせが繰り返される場合に、計算結果を再利用する。
+キャッシュは件数上限付きのLRUで、任意で有効期限（TTL）も設定できる。
+"""
+
+# Standard library imports
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from .calculator import Calculator
+
+
+def freeze(value):
+    """値をキャッシュのキーに変換
+
+    0.0 と -0.0、1 と 1.0 は == では等しいが結果が変わりうるため型と符号を区別し、
+    NaN は自分自身と等しくならないため16進表記で比較する。
+    """
+    if isinstance(value, float):
+        return (float, value.hex())
+    return (type(value), value)
+
+
+class ResultCache:
+    """スレッドセーフなLRU（＋TTL）キャッシュ
+
+    複数の CachedCalculator で共有できる。
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize は1以上を指定してください")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl は正の秒数を指定してください")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+
+    def get(self, key):
+        """(見つかったか, 値) を返す"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at is None or expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        """値を保存し、上限を超えたら最も古く使われたものから追い出す"""
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        size = _sizeof(key) + sys.getsizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self.bytes += size
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        """キャッシュと統計をクリア"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+            self.bytes = 0
+
+    def stats(self):
+        """ヒット率・追い出し数・おおよそのバイト数などを返す"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self.bytes,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _sizeof(key):
+    size = sys.getsizeof(key)
+    for part in key:
+        size += sys.getsizeof(part)
+        if isinstance(part, tuple):
+            size += sys.getsizeof(part[1])
+    return size
+
+
+class CachedCalculator(Calculator):
+    """演算結果をキャッシュする電卓
+
+    キャッシュにヒットした場合も last_result は通常の計算と同じように更新される。
+    例外になった計算（ゼロ除算など）はキャッシュしない。
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, cache=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache if cache is not None else ResultCache(maxsize, ttl)
+
+    def add(self, a, b):
+        """足し算"""
+        return self._cached("add", super().add, a, b)
+
+    def subtract(self, a, b):
+        """引き算"""
+        return self._cached("subtract", super().subtract, a, b)
+
+    def multiply(self, a, b):
+        """掛け算"""
+        return self._cached("multiply", super().multiply, a, b)
+
+    def divide(self, a, b):
+        """割り算"""
+        return self._cached("divide", super().divide, a, b)
+
+    def power(self, a, b, modulus=None):
+        """累乗（上限設定もキーに含める）"""
+        key = (
+            "power",
+            freeze(a),
+            freeze(b),
+            freeze(modulus),
+            self.power_max_bits,
+            self.power_overflow,
+        )
+        return self._lookup(key, super().power, a, b, modulus)
+
+    def _cached(self, name, compute, a, b):
+        return self._lookup((name, freeze(a), freeze(b)), compute, a, b)
+
+    def _lookup(self, key, compute, *args):
+        try:
+            found, value = self.cache.get(key)
+        except TypeError:
+            # ハッシュできない値はキャッシュせずに計算する
+            return compute(*args)
+        if found:
+            self.last_result = value
+            return value
+        value = compute(*args)
+        self.cache.put(key, value)
+        return value
+
+    def cache_stats(self):
+        """キャッシュの統計を返す"""
+        return self.cache.stats()
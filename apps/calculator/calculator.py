@@ -1,12 +1,52 @@
 #!/usr/bin/env python3
 
+from . import batch, dag, expression, reduction
+from .history import ResultHistory
+from .power import DEFAULT_MAX_BITS, bounded_power, validate_overflow
+
 
 class Calculator:
     """シンプルな電卓クラス"""
 
-    def __init__(self):
-        self.memory = 0
-        self.last_result = 0
+    def __init__(
+        self,
+        power_max_bits=DEFAULT_MAX_BITS,
+        power_overflow="raise",
+        memory_slots=10,
+        history_size=256,
+    ):
+        if memory_slots < 1:
+            raise ValueError("memory_slots は1以上を指定してください")
+        # 番号付きのメモリレジスタ（0番が従来のメモリ）と名前付きのレジスタ
+        self.registers = [0] * memory_slots
+        self.named_registers = {}
+        # 計算結果の履歴（last_result を更新するたびに追加される）
+        self.history = ResultHistory(history_size)
+        self._last_result = 0
+        # 累乗の結果サイズの上限と、超えた場合の扱い（"raise" / "float" / 例外クラス）
+        self.power_max_bits = power_max_bits
+        self.power_overflow = validate_overflow(power_overflow)
+        # 演算メトリクスの記録先（enable_metrics で有効化）
+        self.metrics = None
+
+    @property
+    def last_result(self):
+        """直前の計算結果"""
+        return self._last_result
+
+    @last_result.setter
+    def last_result(self, value):
+        self._last_result = value
+        self.history.append(value)
+
+    @property
+    def memory(self):
+        """メモリ（0番のレジスタ）"""
+        return self.registers[0]
+
+    @memory.setter
+    def memory(self, value):
+        self.registers[0] = value
 
     def add(self, a, b):
         """足し算"""
@@ -34,27 +74,170 @@ class Calculator:
         self.last_result = result
         return result
 
-    def power(self, a, b):
-        """累乗"""
-        result = a**b
+    def power(self, a, b, modulus=None):
+        """累乗（modulus を指定するとべき剰余）"""
+        result = self._power(a, b, modulus)
+        self.last_result = result
+        return result
+
+    def add_many(self, a, b):
+        """足し算（一括）"""
+        return self._apply_many("add", a, b)
+
+    def subtract_many(self, a, b):
+        """引き算（一括）"""
+        return self._apply_many("subtract", a, b)
+
+    def multiply_many(self, a, b):
+        """掛け算（一括）"""
+        return self._apply_many("multiply", a, b)
+
+    def divide_many(self, a, b, errors="raise"):
+        """割り算（一括）
+
+        errors="raise" ならゼロ除算の要素があるとZeroDivisionErrorを送出する。
+        errors="mask" なら (結果, ゼロ除算マスク) を返し、該当要素はNaNになる。
+        """
+        return self._apply_many("divide", a, b, errors)
+
+    def power_many(self, a, b):
+        """累乗（一括）"""
+        return self._apply_many("power", a, b)
+
+    def sum(self, values):
+        """総和（浮動小数点数は誤差なく足して最後に1回だけ丸める）
+
+        values はイテレータ・ジェネレータ・バッファでもよく、チャンクごとに
+        読むためメモリ使用量は要素数によらない。last_result は最後に1回だけ
+        更新する（以下の集約メソッドも同様）。
+        """
+        result = reduction.total(values)
+        self.last_result = result
+        return result
+
+    def product(self, values):
+        """総乗（途中でオーバーフロー・アンダーフローしない）"""
+        result = reduction.product(values)
+        self.last_result = result
+        return result
+
+    def mean(self, values):
+        """平均（値がなければValueError）"""
+        result = reduction.mean(values)
+        self.last_result = result
+        return result
+
+    def variance(self, values, ddof=0):
+        """分散（ddof=0 で母分散、ddof=1 で不偏分散）"""
+        result = reduction.variance(values, ddof)
+        self.last_result = result
+        return result
+
+    def _power(self, a, b, modulus=None):
+        """この電卓の上限設定で累乗を計算"""
+        return bounded_power(
+            a, b, modulus, max_bits=self.power_max_bits, overflow=self.power_overflow
+        )
+
+    def _apply_many(self, name, a, b, errors="raise"):
+        """一括演算を実行し、最終要素を last_result に反映する"""
+        result = batch.apply(
+            name,
+            a,
+            b,
+            errors,
+            power_max_bits=self.power_max_bits,
+            power_overflow=self.power_overflow,
+        )
+        values, mask = result if errors == "mask" else (result, None)
+        last = batch.last_value(values, mask)
+        if not batch.is_missing(last):
+            self.last_result = last
+        return result
+
+    def evaluate(self, text, variables=None, **bindings):
+        """数式を評価（例: "(a + b) * c ^ 2"）"""
+        env = dict(variables, **bindings) if variables else bindings
+        result = expression.default_cache.get(text).run(env, power=self._power)
         self.last_result = result
         return result
 
+    def evaluate_batch(self, texts, variables=None, **bindings):
+        """複数の数式を共通部分式を共有して評価（dag.BatchResult を返す）
+
+        texts には数式の列か、構築済みの dag.ExpressionGraph を渡す。
+        数式ごとのエラーは送出せずに BatchResult.errors に入れて返す。
+        last_result は最後の数式がエラーでなければその値で1回だけ更新する。
+        """
+        graph = texts
+        if not isinstance(graph, dag.ExpressionGraph):
+            graph = dag.ExpressionGraph(texts)
+        env = dict(variables, **bindings) if variables else bindings
+        result = graph.run(env, power=self._power)
+        if result.errors and result.errors[-1] is None:
+            self.last_result = result.values[-1]
+        return result
+
+    def enable_metrics(self, recorder=None):
+        """演算ごとの呼び出し数・エラー数・レイテンシの計測を有効化"""
+        # 計測を使わないプロセスでは metrics（とjson）を読み込まない
+        from . import metrics
+
+        if self.metrics is not None:
+            self.disable_metrics()
+        self.metrics = recorder if recorder is not None else metrics.default_metrics
+        metrics.instrument(self, self.metrics)
+        return self.metrics
+
+    def disable_metrics(self):
+        """計測を無効化（記録済みの統計は残る）"""
+        from . import metrics
+
+        metrics.uninstrument(self)
+        self.metrics = None
+
     def clear(self):
         """クリア（リセット）"""
-        self.last_result = 0
+        # クリアは計算結果ではないので履歴には残さない
+        self._last_result = 0
         return 0
 
-    def memory_store(self):
-        """現在の結果をメモリに保存"""
-        self.memory = self.last_result
-        return self.memory
+    def _check_slot(self, slot):
+        """レジスタの番号（int）または名前（str）を確認"""
+        if isinstance(slot, str):
+            return
+        if isinstance(slot, bool) or not isinstance(slot, int):
+            raise TypeError("メモリのスロットは番号か名前で指定してください")
+        if not 0 <= slot < len(self.registers):
+            raise IndexError(f"メモリのスロットは0〜{len(self.registers) - 1}です")
+
+    def memory_store(self, slot=0):
+        """現在の結果をメモリに保存（slot で番号か名前を指定）"""
+        self._check_slot(slot)
+        if isinstance(slot, str):
+            self.named_registers[slot] = self.last_result
+        else:
+            self.registers[slot] = self.last_result
+        return self.last_result
 
-    def memory_recall(self):
+    def memory_recall(self, slot=0):
         """メモリから値を呼び出し"""
-        return self.memory
+        self._check_slot(slot)
+        if isinstance(slot, str):
+            return self.named_registers.get(slot, 0)
+        return self.registers[slot]
 
-    def memory_clear(self):
+    def memory_clear(self, slot=0):
         """メモリをクリア"""
-        self.memory = 0
+        self._check_slot(slot)
+        if isinstance(slot, str):
+            self.named_registers.pop(slot, None)
+        else:
+            self.registers[slot] = 0
+        return 0
+
+    def memory_clear_all(self):
+        """すべてのメモリをクリア"""
+        self.registers = [0] * len(self.registers)
+        self.named_registers.clear()
         return 0
@@ -1,16 +1,79 @@
 #!/usr/bin/env python3
 
 # Standard library imports
+import argparse
+import re
 import tkinter as tk
+from functools import partial
 from tkinter import ttk
 
 from .calculator import Calculator
+from .power import bounded_power, estimate_bits, is_exact_integer
+from .preview import IncrementalNumber, format_preview, preview_result
+from .trace import TraceRecorder
+from .worker import BackgroundEvaluator
+
+# バックグラウンド計算の結果を確認する間隔（約1フレーム）
+POLL_INTERVAL_MS = 16
+
+# 結果がこのビット数を超えそうな整数の累乗だけをワーカーで計算する
+BACKGROUND_POWER_BITS = 1 << 16
+
+# 貼り付け・一括入力で受け付ける文字（空白は無視する）
+FEED_VALID_RE = re.compile(r"[0-9.+\-*/×÷^=\s]*")
+FEED_TOKEN_RE = re.compile(r"[0-9.]+|[+\-*/×÷^]|[=\n]")
+FEED_OPERATORS = {"*": "×", "/": "÷"}
+
+
+def _is_heavy_power(a, b):
+    """ワーカーで計算すべき累乗か（浮動小数点の累乗はCのpowで定数時間）"""
+    if not (is_exact_integer(a) and is_exact_integer(b)) or b <= 0:
+        return False
+    return estimate_bits(a, b) > BACKGROUND_POWER_BITS
+
+
+def _parse_input(text):
+    """入力文字列の数値（小数点も指数もない整数は誤差のない int にする）"""
+    if not (text[1:] if text.startswith("-") else text).isdigit():
+        return float(text)
+    try:
+        return int(text)
+    except ValueError:
+        # 整数と文字列の変換の桁数の上限（Python 3.11 以降）を超える場合
+        # Standard library imports
+        from decimal import Decimal
+
+        return int(Decimal(text))
+
+
+def _format_number(value):
+    """数値の表示用の文字列（整数値は整数として表示する）"""
+    if value != int(value):
+        return str(value)
+    value = int(value)
+    try:
+        return str(value)
+    except ValueError:
+        # 整数と文字列の変換の桁数の上限（Python 3.11 以降）を超える場合
+        # Standard library imports
+        from decimal import Decimal
+
+        return str(Decimal(value))
+
+
+def _background_power(a, b, max_bits, overflow):
+    """ワーカーで累乗を計算して (結果, 表示用の文字列) を返す
+
+    巨大な整数は文字列への変換も重いため、ワーカーでまとめて行う。
+    """
+    value = bounded_power(a, b, max_bits=max_bits, overflow=overflow)
+    return value, _format_number(value)
 
 
 class CalculatorGUI:
     """GUI付き電卓アプリケーション"""
 
-    def __init__(self, root):
+    def __init__(self, root, background_mode="thread", recorder=None):
         self.root = root
         self.root.title("🧮 Python電卓")
         self.root.geometry("350x500")
@@ -19,10 +82,33 @@ class CalculatorGUI:
         # 電卓のインスタンス
         self.calc = Calculator()
 
-        # 現在の入力と演算子を保持
-        self.current_input = ""
+        # 現在の入力と演算子を保持（入力中の数値は1文字ごとに差分更新する）
+        self.input_number = IncrementalNumber()
         self.pending_value = None
         self.pending_operation = None
+        # 表示中の計算結果の (文字列, 値)（巨大な整数を文字列から変換し直さない）
+        self.shown_result = None
+
+        # MS/MR/MCの対象となるメモリのスロット（Ctrl+数字で切り替え）
+        self.memory_slot = 0
+
+        # 重い計算はワーカーで実行し、root.after で結果を受け取る
+        self.evaluator = BackgroundEvaluator(background_mode)
+        self.poll_id = None
+        # 計算中に押された演算子（結果が届いたら続けて適用する）
+        self.queued_operation = None
+        # 計算中に残った一括入力（結果が届いたら続きを処理する）
+        self.pending_feed = ""
+
+        # ディスプレイの更新はアイドル時に1回にまとめる
+        self.display_value = "0"
+        self.display_pending = False
+        self.preview_text = ""
+
+        # キー入力を記録する場合は、ボタンにハンドラを渡す前にラップする
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.attach(self)
 
         # UIを構築
         self.create_widgets()
@@ -49,7 +135,18 @@ class CalculatorGUI:
             justify="right",
             state="readonly",
         )
-        display.grid(row=0, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(0, 10))
+        display.grid(row=0, column=0, columnspan=4, sticky=(tk.W, tk.E))
+
+        # 入力中の式の計算結果のプレビュー
+        self.preview_var = tk.StringVar(value="")
+        preview = ttk.Label(
+            main_frame,
+            textvariable=self.preview_var,
+            font=("Arial", 12),
+            anchor="e",
+            foreground="#888888",
+        )
+        preview.grid(row=1, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(0, 10))
 
         # ボタンのレイアウト
         buttons = [
@@ -88,7 +185,7 @@ class CalculatorGUI:
                 bg="#f0f0f0",
                 activebackground="#e0e0e0",
             )
-            btn.grid(row=row, column=col, padx=2, pady=2)
+            btn.grid(row=row + 1, column=col, padx=2, pady=2)
 
             # ボタンのクリックイベントをバインド
             if text.isdigit() or text == ".":
@@ -127,13 +224,19 @@ class CalculatorGUI:
         self.root.bind("<Return>", lambda e: self.on_equals())
         self.root.bind("<BackSpace>", lambda e: self.on_backspace())
         self.root.bind("<Escape>", lambda e: self.on_clear())
+        self.root.bind("<Control-v>", lambda e: self.on_paste())
+        self.root.bind("<<Paste>>", lambda e: self.on_paste())
+        for slot in range(min(10, len(self.calc.registers))):
+            self.root.bind(
+                f"<Control-Key-{slot}>", lambda e, s=slot: self.on_memory_slot(s)
+            )
 
     def on_key_press(self, event):
         """キーボード入力を処理"""
         key = event.char
         if key.isdigit() or key == ".":
             self.on_digit(key)
-        elif key in ["+", "-", "*", "/"]:
+        elif key in ["+", "-", "*", "/", "^"]:
             # キーボードの記号を電卓の記号に変換
             if key == "*":
                 self.on_operation("×")
@@ -142,32 +245,98 @@ class CalculatorGUI:
             else:
                 self.on_operation(key)
 
+    @property
+    def current_input(self):
+        """現在の入力文字列"""
+        return self.input_number.text
+
+    @current_input.setter
+    def current_input(self, text):
+        self.input_number.reset(text)
+
     def on_digit(self, digit):
         """数字または小数点が押されたときの処理"""
-        if self.current_input == "0" and digit != ".":
-            self.current_input = digit
-        elif digit == "." and "." not in self.current_input:
-            if self.current_input == "":
-                self.current_input = "0."
-            else:
-                self.current_input += digit
-        elif digit != ".":
-            self.current_input += digit
+        if self.evaluator.busy:
+            # 計算中の入力は捨てずに結果が届いてから処理する
+            self.pending_feed += digit
+            return
+        # 先頭の0の置き換えや小数点の重複は IncrementalNumber.push が処理する
+        self.input_number.push(digit)
+
+        self.update_display(self.current_input)
 
+    def on_paste(self):
+        """クリップボードの内容を一括入力"""
+        try:
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            return False
+        return self.feed(text)
+
+    def feed(self, text):
+        """文字列を一括入力（例: "12+34="）
+
+        全体を先に検証し、不正な文字があれば何もせずFalseを返す。
+        数字の連続は1文字ずつではなくまとめて入力する。
+        """
+        if not isinstance(text, str) or not FEED_VALID_RE.fullmatch(text):
+            return False
+        if self.evaluator.busy:
+            self.pending_feed += text
+            return True
+
+        for match in FEED_TOKEN_RE.finditer(text):
+            token = match.group()
+            if token[0] in "0123456789.":
+                self.append_digits(token)
+            elif token in "=\n":
+                self.on_equals()
+            else:
+                self.on_operation(FEED_OPERATORS.get(token, token))
+            if self.evaluator.busy:
+                # 累乗の結果を待ってから残りを処理する
+                self.pending_feed = text[match.end() :]
+                break
+        return True
+
+    def append_digits(self, digits):
+        """数字と小数点の並びを on_digit と同じ規則でまとめて入力"""
+        if self.evaluator.busy:
+            self.pending_feed += digits
+            return
+        push = self.input_number.push
+        for digit in digits:
+            push(digit)
         self.update_display(self.current_input)
 
     def on_operation(self, operation):
         """演算子が押されたときの処理"""
+        if self.evaluator.busy:
+            self.pending_feed += operation
+            return
         if self.current_input:
             if self.pending_operation and self.pending_value is not None:
                 # 連続計算の処理
                 self.calculate()
-            self.pending_value = float(self.current_input)
+                if self.evaluator.busy:
+                    self.queued_operation = operation
+                    return
+                if not self.current_input:
+                    # エラー（ゼロ除算など）になった場合は演算子を受け付けない
+                    self.pending_value = None
+                    self.pending_operation = None
+                    return
+            self.pending_value = self.input_value()
             self.pending_operation = operation
             self.current_input = ""
+            # 表示は変わらないがプレビューは消える
+            self.schedule_flush()
 
     def on_equals(self):
         """=が押されたときの処理"""
+        if self.evaluator.busy:
+            self.pending_feed += "="
+            return
         if (
             self.pending_operation
             and self.pending_value is not None
@@ -176,11 +345,12 @@ class CalculatorGUI:
             self.calculate()
             self.pending_operation = None
             self.pending_value = None
+            self.schedule_flush()
 
     def calculate(self):
         """計算を実行"""
         try:
-            current_value = float(self.current_input)
+            current_value = self.input_value()
 
             if self.pending_operation == "+":
                 result = self.calc.add(self.pending_value, current_value)
@@ -190,24 +360,107 @@ class CalculatorGUI:
                 result = self.calc.multiply(self.pending_value, current_value)
             elif self.pending_operation == "÷":
                 result = self.calc.divide(self.pending_value, current_value)
-
-            # 整数の場合は整数として表示
-            if result == int(result):
-                self.current_input = str(int(result))
-            else:
-                self.current_input = str(result)
-
-            self.update_display(self.current_input)
+            elif self.pending_operation == "^":
+                if not _is_heavy_power(self.pending_value, current_value):
+                    result = self.calc.power(self.pending_value, current_value)
+                else:
+                    # 巨大な整数の累乗はワーカーで計算する
+                    # （Calculator.power と同じ上限により大きすぎる結果はエラーになる）
+                    power = partial(
+                        _background_power,
+                        max_bits=self.calc.power_max_bits,
+                        overflow=self.calc.power_overflow,
+                    )
+                    self.start_background(power, self.pending_value, current_value)
+                    return
+
+            self.show_result(result)
 
         except ZeroDivisionError:
-            self.update_display("エラー")
-            self.current_input = ""
+            self.show_error()
         except Exception:
-            self.update_display("エラー")
+            self.show_error()
+
+    def input_value(self):
+        """入力中の数値（表示中の計算結果ならその値をそのまま使う）"""
+        text = self.current_input
+        if self.shown_result is not None and self.shown_result[0] == text:
+            return self.shown_result[1]
+        return _parse_input(text)
+
+    def show_result(self, result, text=None):
+        """計算結果を表示（text はワーカーで作った表示用の文字列）"""
+        if text is None:
+            text = _format_number(result)
+        self.current_input = text
+        self.shown_result = (text, result)
+        self.update_display(self.current_input)
+
+    def show_error(self):
+        """エラーを表示"""
+        self.current_input = ""
+        self.update_display("エラー")
+
+    def start_background(self, func, *args):
+        """計算をワーカーで開始し、計算中の表示にする"""
+        self.evaluator.submit(func, *args)
+        self.set_busy(True)
+        self.poll_id = self.root.after(POLL_INTERVAL_MS, self.poll_background)
+
+    def poll_background(self):
+        """ワーカーの計算が終わっていれば結果を反映（root.after から呼ばれる）"""
+        self.poll_id = None
+        job = self.evaluator.poll()
+        if job is None:
+            if self.evaluator.busy:
+                self.poll_id = self.root.after(POLL_INTERVAL_MS, self.poll_background)
+            return
+
+        self.set_busy(False)
+        operation, self.queued_operation = self.queued_operation, None
+        try:
+            if job.error is not None:
+                raise job.error
+            value, text = job.value
+            self.calc.last_result = value
+            self.show_result(value, text)
+        except Exception:
+            # エラーになったら残りの一括入力も捨てる
+            self.pending_feed = ""
+            self.show_error()
+            return
+
+        if operation is not None:
+            # 計算中に押された演算子を適用
+            self.pending_value = self.input_value()
+            self.pending_operation = operation
             self.current_input = ""
+            self.schedule_flush()
+
+        if self.pending_feed:
+            text, self.pending_feed = self.pending_feed, ""
+            self.feed(text)
+
+    def set_busy(self, busy):
+        """計算中の表示を切り替え"""
+        if busy:
+            self.update_display("計算中…")
+        self.root.config(cursor="watch" if busy else "")
+
+    def cancel_background(self):
+        """ワーカーの計算をキャンセル"""
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        if self.evaluator.busy:
+            self.evaluator.cancel()
+            self.set_busy(False)
+        self.queued_operation = None
+        self.pending_feed = ""
 
     def on_clear(self):
         """クリアボタンが押されたときの処理"""
+        self.cancel_background()
         self.current_input = ""
         self.pending_value = None
         self.pending_operation = None
@@ -216,42 +469,83 @@ class CalculatorGUI:
 
     def on_backspace(self):
         """バックスペースキーが押されたときの処理"""
-        if self.current_input:
-            self.current_input = self.current_input[:-1]
+        if self.current_input and not self.evaluator.busy:
+            # プレビュー用の数値も末尾の1文字分だけ戻す
+            self.input_number.pop()
             if not self.current_input:
                 self.update_display("0")
             else:
                 self.update_display(self.current_input)
 
+    def on_memory_slot(self, slot):
+        """MS/MR/MCの対象スロットを切り替え"""
+        self.memory_slot = slot
+        self.root.title(f"🧮 Python電卓 [M{slot}]")
+
     def on_memory_store(self):
         """メモリに保存"""
-        if self.current_input:
-            self.calc.last_result = float(self.current_input)
-            self.calc.memory_store()
+        if self.current_input and not self.evaluator.busy:
+            self.calc.last_result = self.input_value()
+            self.calc.memory_store(self.memory_slot)
 
     def on_memory_recall(self):
         """メモリから呼び出し"""
-        value = self.calc.memory_recall()
-        if value == int(value):
-            self.current_input = str(int(value))
-        else:
-            self.current_input = str(value)
-        self.update_display(self.current_input)
+        if self.evaluator.busy:
+            return
+        self.show_result(self.calc.memory_recall(self.memory_slot))
 
     def on_memory_clear(self):
         """メモリをクリア"""
-        self.calc.memory_clear()
+        self.calc.memory_clear(self.memory_slot)
 
     def update_display(self, value):
-        """ディスプレイを更新"""
-        self.display_var.set(value)
+        """ディスプレイを更新
+
+        連続した入力ごとに表示を書き換えないよう、値だけ記録して
+        次のアイドル時に flush_display で1回だけ反映する。
+        """
+        self.display_value = value
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        """次のアイドル時の flush_display を予約（予約済みなら何もしない）"""
+        if not self.display_pending:
+            self.display_pending = True
+            self.root.after_idle(self.flush_display)
+
+    def flush_display(self):
+        """記録しておいた最新の値とプレビューをディスプレイに反映"""
+        self.display_pending = False
+        preview_text = self.compute_preview()
+        if preview_text != self.preview_text:
+            self.preview_text = preview_text
+            self.preview_var.set(preview_text)
+        self.display_var.set(self.display_value)
+
+    def compute_preview(self):
+        """保留中の演算と入力中の数値からプレビューを計算（O(1)）"""
+        if self.evaluator.busy:
+            return ""
+        result = preview_result(
+            self.pending_value, self.pending_operation, self.input_number.value
+        )
+        return format_preview(result)
 
 
-def main():
+def main(argv=None):
     """メイン関数"""
+    parser = argparse.ArgumentParser(description="GUI電卓")
+    parser.add_argument(
+        "--record", metavar="PATH", help="キー入力をトレースとして記録するファイル"
+    )
+    args = parser.parse_args(argv)
+
+    recorder = TraceRecorder() if args.record else None
     root = tk.Tk()
-    CalculatorGUI(root)
+    CalculatorGUI(root, recorder=recorder)
     root.mainloop()
+    if recorder is not None:
+        recorder.save(args.record)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""コマンドラインエントリポイント（python -m apps.calculator）
+
+起動を速く保つため、tkinter・プロセスプール・argparse は必要になるまで
+読み込まない。"--headless" だけを指定した場合は引数の解析も省略する。
+"""
+
+# Standard library imports
+import os
+import re
+import sys
+
+from . import bulk
+from .calculator import Calculator
+
+# REPLの代入文（例: "x = 1 + 2"）
+ASSIGNMENT_RE = re.compile(r"\s*([A-Za-z_][A-Za-z_0-9]*)\s*=(.*)")
+REPL_EXIT_COMMANDS = ("exit", "quit")
+
+
+def build_parser():
+    """引数パーサを作成"""
+    # Standard library imports
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m apps.calculator",
+        description="数式またはCSVの行を一括評価して1行ずつ結果を出力します",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="入力ファイル（省略時または - で標準入力）",
+    )
+    parser.add_argument(
+        "--format",
+        choices=bulk.FORMATS,
+        default="expr",
+        help="expr: 1行1数式 / csv: 'op,a,b' の行（既定: expr）",
+    )
+    parser.add_argument(
+        "--op",
+        choices=sorted(bulk.OPERATIONS),
+        help="CSVの全行に適用する演算（指定時は行を 'a,b' として読む）",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="1チャンクあたりの行数（既定: 1000）",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="プロセス数（0で全コア、既定: 1）",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--headless",
+        action="store_true",
+        help="対話モード（1行ずつ数式を評価、ans で直前の結果を参照）",
+    )
+    mode.add_argument("--gui", action="store_true", help="GUI版を起動")
+    return parser
+
+
+def run_batch(args, stdout):
+    """一括評価を実行して結果を書き出す"""
+    workers = args.workers or os.cpu_count() or 1
+    if args.input == "-":
+        source = sys.stdin
+    else:
+        source = open(args.input, "r", encoding="utf-8", newline="")
+    try:
+        for results in bulk.evaluate_stream(
+            source,
+            fmt=args.format,
+            op=args.op,
+            chunk_size=args.chunk_size,
+            workers=workers,
+        ):
+            stdout.write("\n".join(results) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def run_repl(stdin, stdout, prompt="> "):
+    """1行ずつ数式を評価して結果を書き出す
+
+    "x = 式" で変数に代入でき、ans は直前の結果を表す。
+    exit / quit または入力の終わりで終了する。
+    """
+    calc = Calculator()
+    variables = {}
+    while True:
+        if prompt:
+            stdout.write(prompt)
+            stdout.flush()
+        line = stdin.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        if line in REPL_EXIT_COMMANDS:
+            break
+        match = ASSIGNMENT_RE.fullmatch(line)
+        name, text = match.groups() if match else (None, line)
+        try:
+            result = calc.evaluate(text, variables, ans=calc.last_result)
+        except (ArithmeticError, ValueError, NameError, RecursionError) as e:
+            stdout.write(f"エラー: {e}\n")
+            continue
+        if name is not None:
+            variables[name] = result
+        stdout.write(bulk.format_result(result) + "\n")
+    if prompt:
+        stdout.write("\n")
+
+
+def run_headless():
+    """標準入出力で対話モードを実行"""
+    run_repl(sys.stdin, sys.stdout, prompt="> " if sys.stdin.isatty() else "")
+    return 0
+
+
+def main(argv=None):
+    """メイン関数"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv == ["--headless"]:
+        # よく使う形なので argparse を読み込まずにすぐ開始する
+        return run_headless()
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1 or args.workers < 0:
+        parser.error("--chunk-size は1以上、--workers は0以上を指定してください")
+    if args.gui:
+        # tkinter はGUIを起動するときだけ読み込む
+        from .calculator_gui import main as gui_main
+
+        gui_main([])
+        return 0
+    if args.headless:
+        return run_headless()
+    if args.input != "-" and not os.path.isfile(args.input):
+        parser.error(f"ファイルが見つかりません: {args.input}")
+
+    try:
+        run_batch(args, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # 出力先が閉じられた場合（head へのパイプなど）は静かに終了
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    return 0
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""計算サーバーのクライアントと負荷生成ツール
+
+    python -m apps.calculator.client --port 8765 --connections 1000 --requests 100
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from collections import deque
+
+
+class ServerError(Exception):
+    """サーバーがエラー応答を返した"""
+
+    def __init__(self, error_type, message):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+        self.message = message
+
+
+class CalculatorClient:
+    """パイプライン対応の非同期クライアント
+
+    call() は応答を待たずに並行して呼び出せる。応答は送信順に返るため、
+    送信済みリクエストのFutureをキューに積んで順に解決する。
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending = deque()
+        self._reader_task = asyncio.ensure_future(self._read_responses())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        """TCPで接続"""
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    @classmethod
+    async def connect_unix(cls, path):
+        """Unixソケットで接続"""
+        reader, writer = await asyncio.open_unix_connection(path)
+        return cls(reader, writer)
+
+    async def call(self, op, *args):
+        """演算を呼び出して結果を返す"""
+        future = self.send(op, *args)
+        await self._writer.drain()
+        return await future
+
+    def send(self, op, *args):
+        """リクエストを送信して応答のFutureを返す（drainは呼び出し側で行う）"""
+        request = {"id": next(self._ids), "op": op, "args": list(args)}
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        self._writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        return future
+
+    async def drain(self):
+        """送信バッファが空くまで待つ"""
+        await self._writer.drain()
+
+    async def _read_responses(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                future = self._pending.popleft()
+                response = json.loads(line)
+                if future.cancelled():
+                    continue
+                error = response.get("error")
+                if error is not None:
+                    future.set_exception(ServerError(error["type"], error["message"]))
+                else:
+                    future.set_result(response.get("result"))
+        finally:
+            while self._pending:
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_exception(ConnectionError("接続が閉じられました"))
+
+    async def close(self):
+        """接続を閉じる"""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._reader_task
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def _random_request(rng):
+    op = rng.choice(["add", "subtract", "multiply", "divide", "power"])
+    a = rng.randint(-1000, 1000)
+    b = rng.randint(0, 8) if op == "power" else rng.randint(1, 1000)
+    return op, a, b
+
+
+async def _run_connection(connect, requests, depth, latencies, seed):
+    rng = random.Random(seed)
+    errors = 0
+    async with await connect() as client:
+        remaining = requests
+        while remaining > 0:
+            batch = min(depth, remaining)
+            started = time.perf_counter()
+            futures = [client.send(*_random_request(rng)) for _ in range(batch)]
+            await client.drain()
+            results = await asyncio.gather(*futures, return_exceptions=True)
+            elapsed = time.perf_counter() - started
+            latencies.extend([elapsed] * batch)
+            errors += sum(isinstance(r, Exception) for r in results)
+            remaining -= batch
+    return errors
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_load(connect, connections=100, requests=100, depth=16):
+    """負荷をかけて統計の辞書を返す
+
+    connections 本の接続から、それぞれ requests 件のリクエストを
+    depth 件ずつパイプラインで送信する。
+    """
+    latencies = []
+    started = time.perf_counter()
+    errors = await asyncio.gather(
+        *(
+            _run_connection(connect, requests, depth, latencies, seed)
+            for seed in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    total = connections * requests
+    return {
+        "connections": connections,
+        "requests": total,
+        "errors": sum(errors),
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed if elapsed else 0.0,
+        "latency_p50_ms": _percentile(latencies, 0.50) * 1000,
+        "latency_p99_ms": _percentile(latencies, 0.99) * 1000,
+        "latency_max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="計算サーバーの負荷生成ツール")
+    parser.add_argument("--host", default="127.0.0.1", help="接続先アドレス")
+    parser.add_argument("--port", type=int, default=8765, help="接続先ポート")
+    parser.add_argument("--unix", help="Unixソケットのパス")
+    parser.add_argument("--connections", type=int, default=100, help="同時接続数")
+    parser.add_argument("--requests", type=int, default=100, help="接続あたりの件数")
+    parser.add_argument("--depth", type=int, default=16, help="パイプラインの深さ")
+    args = parser.parse_args(argv)
+
+    if args.unix:
+
+        def connect():
+            return CalculatorClient.connect_unix(args.unix)
+
+    else:
+
+        def connect():
+            return CalculatorClient.connect(args.host, args.port)
+
+    stats = asyncio.run(
+        run_load(connect, args.connections, args.requests, max(1, args.depth))
+    )
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""共通部分式を共有した数式の一括評価
+
+ExpressionGraph は複数の数式を1つの有向非巡回グラフ（DAG）にまとめる。
+ノードは (演算, 子ノードの番号) をキーにハッシュコンシングするため、
+バッチ内のどの数式に現れる同じ部分式も1つのノードになる。評価では
+ノードを作った順（子が必ず親より先）に各ノードを1回だけ計算する。
+
+共有するのは構造が同じ部分式だけで、a + b と b + a のような書き換えはしない。
+数値リテラルは型も区別する（1 と 1.0 は別のノード）。
+
+ノードの計算で送出された例外はそのノードの値として記録し、そのノードを
+使うノードには計算せずに伝播する。左のオペランドのエラーを右より優先する
+ため、各数式のエラーは Calculator.evaluate() で1つずつ評価した場合と同じになる。
+"""
+
+# Standard library imports
+import operator
+from collections import namedtuple
+
+from .expression import ExpressionError, _div, _Parser, tokenize
+from .power import bounded_power
+
+# 葉のノードの種類
+_CONSTANT = "const"
+_VARIABLE = "var"
+
+# 演算のノードの種類と計算（累乗は評価のたびに渡された実装を使う）
+_UNARY = {"neg": operator.neg, "pos": operator.pos}
+_BINARY = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": _div}
+
+
+def _variable(env, name):
+    """変数のノードの (値, エラー)"""
+    try:
+        return env[name], None
+    except KeyError:
+        return None, NameError(f"未定義の変数です: {name}")
+
+
+def _operate(kind, a, b, values, errors, power):
+    """演算のノードの (値, エラー)
+
+    オペランドがエラーなら計算せずにそのエラー（左を優先）を伝播する。
+    """
+    error = errors[a]
+    if error is None and b is not None:
+        error = errors[b]
+    if error is not None:
+        return None, error
+    try:
+        if b is None:
+            return _UNARY[kind](values[a]), None
+        if kind == "^":
+            return power(values[a], values[b]), None
+        return _BINARY[kind](values[a], values[b]), None
+    except Exception as e:
+        return None, e
+
+
+class BatchResult(
+    namedtuple("BatchResult", ["values", "errors", "operations", "distinct_operations"])
+):
+    """一括評価の結果
+
+    values と errors は入力と同じ順序で、エラーになった数式は値が None、
+    成功した数式はエラーが None になる。operations は数式を1つずつ評価した
+    場合の演算の回数、distinct_operations は共有後の演算ノードの数。
+    """
+
+    __slots__ = ()
+
+    @property
+    def saved_operations(self):
+        """共通部分式の共有で省けた演算の回数"""
+        return self.operations - self.distinct_operations
+
+
+class _GraphParser(_Parser):
+    """ExpressionGraph にノードを追加しながら解析するパーサ"""
+
+    def __init__(self, tokens, graph):
+        super().__init__(tokens)
+        self.graph = graph
+        # 共有しなかった場合の演算の回数
+        self.operations = 0
+
+    def emit_binary(self, op, left, right):
+        self.operations += 1
+        return self.graph._node((op, left, right))
+
+    def emit_unary(self, op, operand):
+        self.operations += 1
+        return self.graph._node(("neg" if op == "-" else "pos", operand, None))
+
+    def emit_number(self, value):
+        return self.graph._node((_CONSTANT, value, type(value)))
+
+    def emit_name(self, name):
+        return self.graph._node((_VARIABLE, name, None))
+
+
+class ExpressionGraph:
+    """共通部分式を共有した数式の集まり
+
+    一度構築すれば、変数の値を変えながら何度でも run() で評価できる。
+    """
+
+    def __init__(self, texts=()):
+        # ノードのキー (種類, 引数, 引数) の列と、キーからノードの番号への対応
+        self._nodes = []
+        self._ids = {}
+        # 数式ごとの根のノードの番号（構文エラーなら ExpressionError）
+        self._roots = []
+        # 追加済みの数式の (根, 演算の回数)（同じ数式は解析し直さない）
+        self._parsed = {}
+        self.operations = 0
+        for text in texts:
+            self.add(text)
+
+    def _node(self, key):
+        index = self._ids.get(key)
+        if index is None:
+            index = self._ids[key] = len(self._nodes)
+            self._nodes.append(key)
+        return index
+
+    def add(self, text):
+        """数式を追加して、その番号を返す
+
+        構文エラーの数式も追加し、評価の結果でエラーとして返す。
+        """
+        parsed = self._parsed.get(text)
+        if parsed is None:
+            parsed = self._parsed[text] = self._parse(text)
+        root, operations = parsed
+        self.operations += operations
+        self._roots.append(root)
+        return len(self._roots) - 1
+
+    def _parse(self, text):
+        """数式のノードを追加して (根, 演算の回数) を返す"""
+        mark = len(self._nodes)
+        try:
+            parser = _GraphParser(tokenize(text), self)
+            return parser.parse(), parser.operations
+        except ExpressionError as e:
+            # 途中まで追加したノードを取り除く
+            for key in self._nodes[mark:]:
+                del self._ids[key]
+            del self._nodes[mark:]
+            return e, 0
+
+    @property
+    def distinct_operations(self):
+        """共有後の演算ノードの数"""
+        leaves = (_CONSTANT, _VARIABLE)
+        return sum(1 for kind, _, _ in self._nodes if kind not in leaves)
+
+    def __len__(self):
+        return len(self._roots)
+
+    def evaluate(self, variables=None, **bindings):
+        """変数の値を束縛して評価"""
+        env = dict(variables, **bindings) if variables else bindings
+        return self.run(env)
+
+    def run(self, env, power=None):
+        """変数の辞書 env で評価して BatchResult を返す
+
+        power で累乗の実装を差し替えられる（Expression.run() と同じ）。
+        """
+        power = bounded_power if power is None else power
+        nodes = self._nodes
+        values = [None] * len(nodes)
+        errors = [None] * len(nodes)
+        for i, (kind, a, b) in enumerate(nodes):
+            if kind == _CONSTANT:
+                values[i] = a
+            elif kind == _VARIABLE:
+                values[i], errors[i] = _variable(env, a)
+            else:
+                values[i], errors[i] = _operate(kind, a, b, values, errors, power)
+
+        result_values = []
+        result_errors = []
+        for root in self._roots:
+            if isinstance(root, ExpressionError):
+                result_values.append(None)
+                result_errors.append(root)
+            else:
+                result_values.append(values[root])
+                result_errors.append(errors[root])
+        return BatchResult(
+            result_values, result_errors, self.operations, self.distinct_operations
+        )
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""数式エンジン
+
+"(a + b) * c ^ 2" のような中置記法の数式を一度だけ解析してPythonの
+コードオブジェクトにコンパイルし、変数の値を変えながら何度でも高速に評価する。
+コンパイル結果は件数上限付きのLRUキャッシュに保持する。
+"""
+
+# Standard library imports
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from .power import bounded_power
+
+# GUIと同じ演算子（キーボードの * と / も受け付ける）
+_BINARY_OPERATORS = {
+    "+": "+",
+    "-": "-",
+    "×": "*",
+    "*": "*",
+    "÷": "/",
+    "/": "/",
+    "^": "^",
+}
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<name>[A-Za-z_]\w*)"
+    r"|(?P<op>[-+×*÷/^()])"
+    r")",
+    re.ASCII,
+)
+
+# 括弧・単項符号・累乗の入れ子の深さの上限（RecursionErrorになる前に拒否する）
+MAX_NESTING = 100
+
+# 整数リテラルの最大桁数（Python 3.11 以降の整数と文字列の変換の既定の上限と同じ）
+MAX_LITERAL_DIGITS = 4300
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class ExpressionError(ValueError):
+    """数式の構文エラー"""
+
+
+def _div(a, b):
+    """割り算（Calculator.divide と同じエラーメッセージ）"""
+    if b == 0:
+        raise ZeroDivisionError("ゼロで割ることはできません")
+    return a / b
+
+
+_GLOBALS = {
+    "__builtins__": {},
+    "_div": _div,
+    "_pow": bounded_power,
+    "_INF": float("inf"),
+}
+
+
+def _number(text):
+    """数値リテラルの値（整数が MAX_LITERAL_DIGITS 桁を超えたら ExpressionError）"""
+    if any(c in text for c in ".eE"):
+        return float(text)
+    if len(text) > MAX_LITERAL_DIGITS:
+        raise ExpressionError(f"整数が長すぎます（{MAX_LITERAL_DIGITS} 桁まで）")
+    try:
+        return int(text)
+    except ValueError as e:
+        # sys.set_int_max_str_digits() で上限が下げられている場合
+        raise ExpressionError(f"整数が長すぎます: {e}") from e
+
+
+def tokenize(text):
+    """数式をトークン (種類, 値) の列に分解"""
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ExpressionError(f"不正な文字があります: {text[pos:].strip()[:1]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "number":
+            value = _number(value)
+        elif kind == "op":
+            value = _BINARY_OPERATORS.get(value, value)
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """再帰下降パーサ（トークン列からPythonの式ソースを生成する）
+
+    優先順位は低い順に 加減算 < 乗除算 < 単項符号 < 累乗。
+    累乗は右結合で、-2^2 は -(2^2) になる。
+    入れ子（再帰）の深さが MAX_NESTING を超える数式は ExpressionError にする。
+    出力は emit_*() で組み立てるため、サブクラスで別の表現にできる。
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.variables = []
+        self.depth = 0
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def take_op(self, *ops):
+        kind, value = self.peek()
+        if kind == "op" and value in ops:
+            self.pos += 1
+            return value
+        return None
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("数式が空です")
+        source = self.expr()
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"予期しないトークンです: {self.peek()[1]!r}")
+        return source
+
+    def expr(self):
+        left = self.term()
+        while True:
+            op = self.take_op("+", "-")
+            if op is None:
+                return left
+            left = self.emit_binary(op, left, self.term())
+
+    def term(self):
+        left = self.unary()
+        while True:
+            op = self.take_op("*", "/")
+            if op is None:
+                return left
+            left = self.emit_binary(op, left, self.unary())
+
+    def unary(self):
+        # 括弧・単項符号・累乗の再帰はすべてここを通る
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise ExpressionError(f"数式の入れ子が深すぎます（上限 {MAX_NESTING}）")
+        op = self.take_op("+", "-")
+        if op is not None:
+            result = self.emit_unary(op, self.unary())
+        else:
+            result = self.power()
+        self.depth -= 1
+        return result
+
+    def power(self):
+        base = self.atom()
+        if self.take_op("^") is not None:
+            return self.emit_binary("^", base, self.unary())
+        return base
+
+    def atom(self):
+        kind, value = self.peek()
+        if kind is None:
+            raise ExpressionError("数式が途中で終わっています")
+        self.pos += 1
+        if kind == "number":
+            return self.emit_number(value)
+        if kind == "name":
+            if value not in self.variables:
+                self.variables.append(value)
+            return self.emit_name(value)
+        if value == "(":
+            inner = self.expr()
+            if self.take_op(")") is None:
+                raise ExpressionError("閉じ括弧がありません")
+            return inner
+        raise ExpressionError(f"予期しないトークンです: {value!r}")
+
+    def emit_binary(self, op, left, right):
+        """二項演算（op は + - * / ^ のいずれか）"""
+        if op == "/":
+            return f"_div({left}, {right})"
+        if op == "^":
+            return f"_pow({left}, {right})"
+        return f"({left} {op} {right})"
+
+    def emit_unary(self, op, operand):
+        """単項符号（op は + か -）"""
+        return f"({op}{operand})"
+
+    def emit_number(self, value):
+        """数値リテラル"""
+        # 1e999 のような桁あふれはreprが "inf" になるため定数で表す
+        return "_INF" if value == float("inf") else repr(value)
+
+    def emit_name(self, name):
+        """変数の参照"""
+        return f"_env[{name!r}]"
+
+
+class Expression:
+    """コンパイル済みの数式"""
+
+    __slots__ = ("source", "variables", "_code")
+
+    def __init__(self, source, variables, code):
+        self.source = source
+        self.variables = variables
+        self._code = code
+
+    def evaluate(self, variables=None, **bindings):
+        """変数の値を束縛して評価"""
+        env = dict(variables, **bindings) if variables else bindings
+        return self.run(env)
+
+    __call__ = evaluate
+
+    def run(self, env, power=None):
+        """変数の辞書 env で評価（power で累乗の実装を差し替えられる）"""
+        local_names = {"_env": env}
+        if power is not None:
+            local_names["_pow"] = power
+        try:
+            return eval(self._code, _GLOBALS, local_names)  # nosec B307
+        except KeyError as e:
+            if e.args and e.args[0] in self.variables and e.args[0] not in env:
+                raise NameError(f"未定義の変数です: {e.args[0]}") from None
+            raise
+
+    def __repr__(self):
+        return f"Expression({self.source!r})"
+
+
+def compile_expression(text):
+    """数式を解析してコンパイルする（キャッシュなし）"""
+    parser = _Parser(tokenize(text))
+    python_source = parser.parse()
+    # 検証済みのトークンから生成したソースのみをコンパイルする
+    try:
+        code = compile(python_source, "<expression>", "eval")
+    except (SyntaxError, RecursionError, MemoryError):
+        # 非常に長い演算の連鎖は括弧の入れ子やコンパイラの再帰の上限を超える
+        raise ExpressionError("数式が複雑すぎます") from None
+    return Expression(text, tuple(parser.variables), code)
+
+
+class ExpressionCache:
+    """コンパイル済み数式のLRUキャッシュ"""
+
+    def __init__(self, maxsize=4096):
+        if maxsize < 1:
+            raise ValueError("maxsize は1以上を指定してください")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text):
+        """数式をコンパイル済みの形で返す（キャッシュ済みなら再利用）"""
+        with self._lock:
+            compiled = self._entries.get(text)
+            if compiled is not None:
+                self._entries.move_to_end(text)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = compile_expression(text)
+        with self._lock:
+            self._entries[text] = compiled
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def cache_info(self):
+        """ヒット数・ミス数・上限・現在の件数を返す"""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        """キャッシュと統計をクリア"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+default_cache = ExpressionCache()
+
+
+def evaluate(text, variables=None, **bindings):
+    """数式を評価（デフォルトのキャッシュを使用）"""
+    return default_cache.get(text).evaluate(variables, **bindings)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""計算結果の履歴（固定長のリングバッファ）
+
+履歴は事前に確保した array('d') に保存するため、件数が増えてもメモリ使用量は
+一定で、追加は O(1) で行える。容量を超えると古い結果から上書きされる。
+"""
+
+# Standard library imports
+import math
+from array import array
+
+
+def _to_float(value):
+    """array('d') に入れられる値に変換（大きすぎる整数は±inf、数値以外はNaN）"""
+    try:
+        return float(value)
+    except OverflowError:
+        return math.inf if value > 0 else -math.inf
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class ResultHistory:
+    """直近 capacity 件の結果を保持するリングバッファ"""
+
+    __slots__ = ("capacity", "_buffer", "_next", "_count")
+
+    def __init__(self, capacity=256):
+        if capacity < 1:
+            raise ValueError("capacity は1以上を指定してください")
+        self.capacity = capacity
+        self._buffer = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def append(self, value):
+        """結果を追加（満杯なら最も古い結果を上書き）"""
+        self._buffer[self._next] = _to_float(value)
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def clear(self):
+        """履歴をクリア"""
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _start(self):
+        return (self._next - self._count) % self.capacity
+
+    def to_array(self):
+        """古い順に並べた array('d') のコピーを返す"""
+        start = self._start()
+        end = start + self._count
+        if end <= self.capacity:
+            return self._buffer[start:end]
+        return self._buffer[start:] + self._buffer[: end - self.capacity]
+
+    def __getitem__(self, index):
+        """古い順のインデックスで取得（負のインデックスとスライスに対応）"""
+        if isinstance(index, slice):
+            return self.to_array()[index]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("履歴の範囲外です")
+        return self._buffer[(self._start() + index) % self.capacity]
+
+    def __iter__(self):
+        return iter(self.to_array())
+
+    def recent(self, n):
+        """新しい順に最大 n 件を返す"""
+        n = min(n, self._count)
+        if n <= 0:
+            return array("d")
+        recent = self[-n:]
+        recent.reverse()
+        return recent
+
+    def replay(self, func):
+        """古い順に結果を func に渡す"""
+        for value in self.to_array():
+            func(value)
+
+    def __repr__(self):
+        return f"ResultHistory({list(self)!r}, capacity={self.capacity})"
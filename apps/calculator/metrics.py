@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""演算ごとのメトリクス（呼び出し数・エラー数・レイテンシのヒストグラム）
+
+Calculator.enable_metrics() で有効にすると、演算メソッドを計測用のラッパーで
+置き換える。無効のときはラッパーがないため計測のコストはかからない。
+カウンタはスレッドごとに持ち、集計は snapshot() の時点で行うため、
+計測中にスレッド間でロックを取り合うことはない。
+"""
+
+# Standard library imports
+import json
+import threading
+import time
+from bisect import bisect_left
+
+# レイテンシのヒストグラムの上限値（秒）
+LATENCY_BUCKETS = (
+    1e-6,
+    2.5e-6,
+    5e-6,
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    1e-2,
+    1e-1,
+    1.0,
+)
+
+INSTRUMENTED_METHODS = (
+    "add",
+    "subtract",
+    "multiply",
+    "divide",
+    "power",
+    "add_many",
+    "subtract_many",
+    "multiply_many",
+    "divide_many",
+    "power_many",
+    "sum",
+    "product",
+    "mean",
+    "variance",
+    "evaluate",
+    "evaluate_batch",
+    "clear",
+    "memory_store",
+    "memory_recall",
+    "memory_clear",
+    "memory_clear_all",
+)
+
+
+class OperationStats:
+    """1スレッド・1演算分の統計"""
+
+    __slots__ = ("count", "total_seconds", "buckets", "errors")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.errors = {}
+
+    def observe(self, seconds):
+        """1回分のレイテンシを記録"""
+        self.count += 1
+        self.total_seconds += seconds
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def record_error(self, error_type):
+        """エラーを記録"""
+        self.errors[error_type] = self.errors.get(error_type, 0) + 1
+
+    def merge(self, other):
+        """他の統計を足し合わせる"""
+        self.count += other.count
+        self.total_seconds += other.total_seconds
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        for error_type, n in list(other.errors.items()):
+            self.errors[error_type] = self.errors.get(error_type, 0) + n
+
+
+class Metrics:
+    """演算メトリクスの記録先（複数の Calculator で共有できる）"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._per_thread = []
+        self._lock = threading.Lock()
+
+    def _operation_stats(self, name):
+        try:
+            return self._local.stats[name]
+        except AttributeError:
+            stats = self._local.stats = {}
+            # ロックを取るのはスレッドごとに最初の1回だけ
+            with self._lock:
+                self._per_thread.append(stats)
+        except KeyError:
+            stats = self._local.stats
+        op_stats = stats[name] = OperationStats()
+        return op_stats
+
+    def wrap(self, name, method):
+        """method の呼び出しを計測するラッパーを返す"""
+        perf_counter = time.perf_counter
+        operation_stats = self._operation_stats
+
+        def instrumented(*args, **kwargs):
+            stats = operation_stats(name)
+            started = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                stats.record_error(type(e).__name__)
+                raise
+            finally:
+                stats.observe(perf_counter() - started)
+
+        instrumented.__name__ = name
+        instrumented.__doc__ = method.__doc__
+        instrumented.__wrapped__ = method
+        return instrumented
+
+    def snapshot(self):
+        """全スレッドの統計を演算ごとに集計して返す"""
+        with self._lock:
+            per_thread = list(self._per_thread)
+        merged = {}
+        for stats in per_thread:
+            for name, op_stats in list(stats.items()):
+                merged.setdefault(name, OperationStats()).merge(op_stats)
+        return dict(sorted(merged.items()))
+
+    def reset(self):
+        """統計をクリア（以降の呼び出しから数え直す）"""
+        with self._lock:
+            for stats in self._per_thread:
+                stats.clear()
+
+    def to_dict(self):
+        """JSONにできる形式のスナップショット"""
+        result = {}
+        for name, stats in self.snapshot().items():
+            result[name] = {
+                "count": stats.count,
+                "errors": dict(stats.errors),
+                "sum_seconds": stats.total_seconds,
+                "buckets": dict(zip(_bucket_labels(), _cumulative(stats.buckets))),
+            }
+        return result
+
+    def to_json(self, indent=None):
+        """JSON形式のスナップショット"""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix="calculator"):
+        """Prometheusのテキスト形式"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_calls_total 演算の呼び出し回数",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        for name, stats in snapshot.items():
+            lines.append(f'{prefix}_calls_total{{op="{name}"}} {stats.count}')
+
+        lines += [
+            f"# HELP {prefix}_errors_total 演算で発生したエラーの回数",
+            f"# TYPE {prefix}_errors_total counter",
+        ]
+        for name, stats in snapshot.items():
+            for error_type, n in sorted(stats.errors.items()):
+                lines.append(
+                    f'{prefix}_errors_total{{op="{name}",error="{error_type}"}} {n}'
+                )
+
+        lines += [
+            f"# HELP {prefix}_latency_seconds 演算のレイテンシ",
+            f"# TYPE {prefix}_latency_seconds histogram",
+        ]
+        for name, stats in snapshot.items():
+            for label, n in zip(_bucket_labels(), _cumulative(stats.buckets)):
+                lines.append(
+                    f'{prefix}_latency_seconds_bucket{{op="{name}",le="{label}"}} {n}'
+                )
+            lines.append(
+                f'{prefix}_latency_seconds_sum{{op="{name}"}} {stats.total_seconds!r}'
+            )
+            lines.append(f'{prefix}_latency_seconds_count{{op="{name}"}} {stats.count}')
+        return "\n".join(lines) + "\n"
+
+
+def _bucket_labels():
+    return [repr(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+
+
+def _cumulative(buckets):
+    total = 0
+    result = []
+    for n in buckets:
+        total += n
+        result.append(total)
+    return result
+
+
+default_metrics = Metrics()
+
+
+def instrument(calc, metrics):
+    """calc の演算メソッドを計測用のラッパーに置き換える"""
+    for name in INSTRUMENTED_METHODS:
+        method = getattr(type(calc), name).__get__(calc)
+        setattr(calc, name, metrics.wrap(name, method))
+
+
+def uninstrument(calc):
+    """計測用のラッパーを外す"""
+    for name in INSTRUMENTED_METHODS:
+        calc.__dict__.pop(name, None)
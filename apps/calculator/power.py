@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""コスト上限付きの累乗
+
+整数の累乗は結果の桁数に比例して時間とメモリを消費するため、
+計算前に結果のビット数を見積もり、上限を超える場合は拒否するか
+浮動小数点に落として計算する。
+"""
+
+# Standard library imports
+import math
+
+# 結果のビット数の既定上限（約31万桁）
+DEFAULT_MAX_BITS = 1 << 20
+
+OVERFLOW_MODES = ("raise", "float")
+
+
+class PowerLimitError(OverflowError):
+    """累乗の結果が上限を超える"""
+
+
+def validate_overflow(overflow):
+    """overflow の指定が正しいか確認"""
+    if overflow in OVERFLOW_MODES:
+        return overflow
+    if isinstance(overflow, type) and issubclass(overflow, Exception):
+        return overflow
+    raise ValueError(
+        f"overflow は {OVERFLOW_MODES} のいずれかか例外クラスを指定してください"
+    )
+
+
+def estimate_bits(a, b):
+    """整数 a ** b の結果のおおよそのビット数を返す（b >= 0）"""
+    magnitude = abs(a)
+    if magnitude <= 1 or b == 0:
+        return 1
+    try:
+        return b * math.log2(magnitude)
+    except OverflowError:
+        # 指数が float に収まらないほど大きい（結果はどの上限も超える）
+        return math.inf
+
+
+def is_exact_integer(value):
+    """int（boolを含む）かどうか"""
+    return isinstance(value, int)
+
+
+def bounded_power(a, b, modulus=None, max_bits=DEFAULT_MAX_BITS, overflow="raise"):
+    """累乗（コスト上限付き）
+
+    modulus を指定すると高速なべき剰余 pow(a, b, modulus) を計算する。
+    整数同士の累乗で結果が max_bits を超える見込みの場合、overflow が
+    "raise" なら PowerLimitError を、例外クラスならその例外を送出し、
+    "float" なら浮動小数点で計算する（表現できなければ±inf）。
+    """
+    if modulus is not None:
+        if not (is_exact_integer(a) and is_exact_integer(b)):
+            raise TypeError("べき剰余は整数でのみ計算できます")
+        return pow(a, b, modulus)
+
+    # 浮動小数点や負の指数はCのpowで定数時間に計算できる
+    if not (is_exact_integer(a) and is_exact_integer(b)) or b < 0:
+        return a**b
+
+    if estimate_bits(a, b) <= max_bits:
+        return a**b
+
+    if overflow == "float":
+        return _float_power(a, b)
+    error = PowerLimitError if overflow == "raise" else overflow
+    raise error(f"累乗の結果が大きすぎます（上限 {max_bits} ビット）")
+
+
+def _float_power(a, b):
+    try:
+        return float(a) ** b
+    except OverflowError:
+        negative = a < 0 and b % 2 == 1
+        return -math.inf if negative else math.inf
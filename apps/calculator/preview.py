@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""入力中の数値と計算結果のプレビュー
+
+GUIの入力欄の文字列と、その数値（仮数と10のべき）を一緒に保持し、
+1文字の追加・削除ごとに O(1) で数値を更新する。プレビューのたびに
+入力全体を float() し直す必要はない。
+"""
+
+# Standard library imports
+import math
+import operator
+
+from .power import bounded_power
+
+# プレビューで使う累乗の上限（入力中の数値は浮動小数点なので通常は関係しない）
+PREVIEW_MAX_BITS = 1 << 16
+
+_PREVIEW_OPERATIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "×": operator.mul,
+    "÷": operator.truediv,
+    "^": lambda a, b: bounded_power(a, b, max_bits=PREVIEW_MAX_BITS),
+}
+
+
+class IncrementalNumber:
+    """入力中の数値文字列
+
+    push() は CalculatorGUI.on_digit と同じ規則で1文字追加し、pop() は
+    末尾の1文字を削除する。どちらも数値を作り直さずに差分だけ更新する。
+    "1.5e-07" のように計算結果として入る指数表記と、Pythonの整数と文字列の
+    変換の上限を超える桁数の計算結果だけは差分更新できないため、その場合は
+    毎回 float() で変換する。
+    """
+
+    __slots__ = ("text", "_sign", "_mantissa", "_divisor", "_has_dot", "_opaque")
+
+    def __init__(self, text=""):
+        self.reset(text)
+
+    def reset(self, text):
+        """文字列全体から状態を作り直す"""
+        self.text = text
+        body = text[1:] if text.startswith("-") else text
+        self._sign = -1 if text.startswith("-") else 1
+        self._has_dot = "." in body
+        integer, _, fraction = body.partition(".")
+        self._opaque = not (integer + fraction).isdigit() and body not in ("", ".")
+        if self._opaque:
+            return
+        digits = integer + fraction
+        try:
+            self._mantissa = int(digits) if digits else 0
+        except ValueError:
+            # 整数と文字列の変換の桁数の上限を超える計算結果は float() で変換する
+            self._opaque = True
+            return
+        self._divisor = 10 ** len(fraction)
+
+    def push(self, digit):
+        """数字または小数点を1文字追加"""
+        if self.text == "0" and digit != ".":
+            self.reset(digit)
+        elif digit == ".":
+            if self._has_dot:
+                return
+            self._has_dot = True
+            self.text = "0." if self.text == "" else self.text + "."
+        elif self._opaque:
+            self.reset(self.text + digit)
+        else:
+            self.text += digit
+            self._mantissa = self._mantissa * 10 + int(digit)
+            if self._has_dot:
+                self._divisor *= 10
+
+    def pop(self):
+        """末尾の1文字を削除"""
+        if not self.text:
+            return
+        last = self.text[-1]
+        if self._opaque or not (last.isdigit() or last == "."):
+            self.reset(self.text[:-1])
+            return
+        self.text = self.text[:-1]
+        if last == ".":
+            self._has_dot = False
+        else:
+            self._mantissa //= 10
+            if self._has_dot:
+                self._divisor //= 10
+
+    @property
+    def value(self):
+        """数値（入力が空か数値でなければNone）"""
+        if self._opaque:
+            try:
+                return float(self.text)
+            except ValueError:
+                return None
+        if self.text in ("", "-"):
+            return None
+        # int同士の割り算は正しく丸められるため float(self.text) と一致する
+        try:
+            return self._sign * self._mantissa / self._divisor
+        except OverflowError:
+            # float(self.text) と同じく、floatに収まらない桁数は±inf
+            return self._sign * math.inf
+
+    def __bool__(self):
+        return bool(self.text)
+
+
+def preview_result(pending_value, operation, value):
+    """pending_value operation value の結果（計算できなければNone）"""
+    func = _PREVIEW_OPERATIONS.get(operation)
+    if func is None or pending_value is None or value is None:
+        return None
+    try:
+        return func(pending_value, value)
+    except (ArithmeticError, ValueError, TypeError):
+        return None
+
+
+def format_preview(result):
+    """プレビューの表示文字列（整数は整数として表示、計算できなければ空）"""
+    if result is None or isinstance(result, complex) or not math.isfinite(result):
+        return ""
+    if result == int(result):
+        return str(int(result))
+    return str(result)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""ストリームの集約（総和・総乗・平均・分散）
+
+値の列（イテレータ・ジェネレータ・バッファプロトコル対応オブジェクト）を
+CHUNK_SIZE 要素ずつ読み、チャンクごとに C 実装の関数でまとめて計算する。
+読み終えたチャンクは捨てるため、メモリ使用量は列の長さによらない。
+
+- total: 浮動小数点数は math.fsum で誤差なく足し、チャンクをまたぐ和も
+  (上位, 下位) の2つの float で持つため、最後に1回丸めるだけになる。
+  整数だけのチャンクは整数のまま正確に足す。
+- product: 浮動小数点数は仮数と指数に分けて掛けるため、途中でオーバーフロー・
+  アンダーフローせず、最終結果が表せる範囲なら正しく求まる。
+- mean / variance: チャンクごとの (件数, 平均, 偏差平方和) を Chan らの方法で
+  合わせる（1要素ずつの Welford 法より誤差が小さく、ループは C 実装に任せる）。
+
+int / float（とそのサブクラス）以外の値（Fraction、Decimal、complex など）は
+通常の + / * で計算する。
+"""
+
+# Standard library imports
+import math
+import operator
+from functools import reduce
+from itertools import islice
+
+from .batch import iter_values
+
+# 一度に読む要素数
+CHUNK_SIZE = 4096
+
+# 仮数をまとめて掛ける要素数（0.5 ** 512 でもアンダーフローしない）
+_MANTISSA_GROUP = 512
+
+# まとめて掛けた積の指数の上限（float の指数の範囲に余裕を持たせる）
+_SAFE_EXPONENT = 1000
+
+# まとめて掛ける要素数がこれより少なくなるなら1つずつ仮数と指数に分ける
+_MIN_GROUP = 16
+
+
+def chunks(values, size=CHUNK_SIZE):
+    """値の列を size 要素ずつのリストに分けて返す"""
+    values = iter_values(values)
+    while True:
+        chunk = list(islice(values, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _kind(chunk):
+    """チャンクの値の種類（"int" / "real" / "other"）"""
+    types = set(map(type, chunk))
+    if all(issubclass(t, int) for t in types):
+        return "int"
+    if all(issubclass(t, (int, float)) for t in types):
+        return "real"
+    return "other"
+
+
+def _fsum(values):
+    """math.fsum（inf - inf や途中のオーバーフローは通常の + と同じ結果にする）"""
+    try:
+        return math.fsum(values)
+    except (OverflowError, ValueError):
+        return sum(values, 0.0)
+
+
+def total(values):
+    """総和（整数だけなら整数、浮動小数点数を含めば正しく丸めた float）"""
+    integer = 0
+    # 浮動小数点数の部分の和（hi + lo がほぼ正確な和）
+    hi = lo = 0.0
+    real = False
+    other = None
+    for chunk in chunks(values):
+        kind = _kind(chunk)
+        if kind == "int":
+            integer += sum(chunk)
+        elif kind == "real":
+            real = True
+            chunk += (hi, lo)
+            hi = _fsum(chunk)
+            if math.isfinite(hi):
+                chunk.append(-hi)
+                lo = _fsum(chunk)
+            else:
+                lo = 0.0
+        else:
+            other = sum(chunk) if other is None else sum(chunk, other)
+    result = _fsum([hi, lo, integer]) if real else integer
+    return result if other is None else other + result
+
+
+def _split(value):
+    """値を (仮数, 指数) に分ける（float に変換できない大きな整数も扱う）"""
+    if isinstance(value, int):
+        shift = max(abs(value).bit_length() - 64, 0)
+        mantissa, exponent = math.frexp(
+            value >> shift if value >= 0 else -(-value >> shift)
+        )
+        return mantissa, exponent + shift
+    return math.frexp(value)
+
+
+def _multiply_chunk(chunk, mantissa, exponent):
+    """chunk の積を掛けた (仮数, 指数) を返す"""
+    try:
+        largest = max(map(abs, chunk))
+        smallest = min(map(abs, chunk))
+        if smallest > 0 and math.isfinite(largest):
+            # どの値も 2 ** -bits 以上 2 ** bits 以下なので、group 個までの積は
+            # オーバーフローもアンダーフローもしない
+            bits = max(math.frexp(largest)[1], 1 - math.frexp(smallest)[1], 1)
+            group = _SAFE_EXPONENT // bits
+            if group >= _MIN_GROUP:
+                for start in range(0, len(chunk), group):
+                    part, shift = math.frexp(math.prod(chunk[start : start + group]))
+                    mantissa, extra = math.frexp(mantissa * part)
+                    exponent += shift + extra
+                return mantissa, exponent
+        mantissas, exponents = zip(*map(math.frexp, chunk))
+    except OverflowError:
+        # float に変換できない大きな整数を含む
+        mantissas, exponents = zip(*map(_split, chunk))
+    # 0・inf・NaN や桁の大きく異なる値を含む場合は、1つずつ仮数と指数に分ける
+    exponent += sum(exponents)
+    for start in range(0, len(mantissas), _MANTISSA_GROUP):
+        part = math.prod(mantissas[start : start + _MANTISSA_GROUP])
+        mantissa, shift = math.frexp(mantissa * part)
+        exponent += shift
+    return mantissa, exponent
+
+
+def product(values):
+    """総乗（整数だけなら整数、浮動小数点数を含めば途中で桁あふれしない float）"""
+    integer = 1
+    # 浮動小数点数の部分の積（mantissa * 2 ** exponent）
+    mantissa = 1.0
+    exponent = 0
+    real = False
+    other = None
+    for chunk in chunks(values):
+        kind = _kind(chunk)
+        if kind == "int":
+            integer *= math.prod(chunk)
+        elif kind == "real":
+            real = True
+            mantissa, exponent = _multiply_chunk(chunk, mantissa, exponent)
+        else:
+            part = reduce(operator.mul, chunk)
+            other = part if other is None else other * part
+    if real:
+        if integer != 1:
+            factor, shift = _split(integer)
+            mantissa, extra = math.frexp(mantissa * factor)
+            exponent += shift + extra
+        try:
+            result = math.ldexp(mantissa, exponent)
+        except OverflowError:
+            result = math.copysign(math.inf, mantissa)
+    else:
+        result = integer
+    return result if other is None else other * result
+
+
+def moments(values):
+    """(件数, 平均, 偏差平方和) を返す（空なら (0, nan, nan)）"""
+    count = 0
+    mean = m2 = math.nan
+    for chunk in chunks(values):
+        chunk = list(map(float, chunk))
+        n = len(chunk)
+        chunk_mean = _fsum(chunk) / n
+        chunk_m2 = _fsum([(x - chunk_mean) ** 2 for x in chunk])
+        if not count:
+            count, mean, m2 = n, chunk_mean, chunk_m2
+            continue
+        # Chan らの方法で2つの (件数, 平均, 偏差平方和) を合わせる
+        delta = chunk_mean - mean
+        combined = count + n
+        mean += delta * n / combined
+        m2 += chunk_m2 + delta * delta * count * n / combined
+        count = combined
+    return count, mean, m2
+
+
+def mean(values):
+    """平均（float）"""
+    count, result, _ = moments(values)
+    if not count:
+        raise ValueError("平均を求める値がありません")
+    return result
+
+
+def variance(values, ddof=0):
+    """分散（ddof=0 で母分散、ddof=1 で不偏分散）"""
+    count, _, m2 = moments(values)
+    if count - ddof <= 0:
+        raise ValueError(f"分散を求めるには {ddof + 1} 個以上の値が必要です")
+    return m2 / (count - ddof)
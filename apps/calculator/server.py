@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""asyncio 計算サーバー
+
+改行区切りJSONのプロトコルで Calculator の演算とメモリ機能を提供する。
+接続ごとに Calculator のインスタンスを持つため、last_result と memory は
+セッション単位になる。
+
+リクエスト: {"id": 1, "op": "add", "args": [1, 2]}
+レスポンス: {"id": 1, "result": 3}
+エラー:     {"id": 1, "error": {"type": "ZeroDivisionError", "message": "..."}}
+
+結果は常にJSONの数値で返す。JSONで表せない結果（複素数、NaN や無限大、
+MAX_RESULT_DIGITS 桁を超える整数）は ResultError のエラー応答にする。
+
+クライアントは応答を待たずに複数のリクエストを送ってよく（パイプライン）、
+応答はリクエストと同じ順序で返る。クライアントが応答を読まなくなった場合は
+書き込みバッファが空くまでそのクライアントからの読み込みを止める。
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import json
+import math
+import sys
+
+from .calculator import Calculator
+
+# 1リクエスト（1行）の最大バイト数
+MAX_LINE_BYTES = 1 << 20
+
+# 書き込みバッファがこのバイト数を超えたら読み込みを止める
+WRITE_HIGH_WATER = 1 << 16
+
+# 応答で返せる整数の最大桁数（Pythonの整数と文字列の変換の既定の上限）
+MAX_RESULT_DIGITS = 4300
+_RESULT_LIMIT = 10**MAX_RESULT_DIGITS
+
+OPERATIONS = {
+    "add": 2,
+    "subtract": 2,
+    "multiply": 2,
+    "divide": 2,
+    "power": (2, 3),
+    "evaluate": (1, 2),
+    "clear": 0,
+    "memory_store": (0, 1),
+    "memory_recall": (0, 1),
+    "memory_clear": (0, 1),
+    "memory_clear_all": 0,
+}
+
+
+class RequestError(ValueError):
+    """不正なリクエスト"""
+
+
+class ResultError(ValueError):
+    """JSONの数値として返せない計算結果"""
+
+
+_ARITHMETIC = frozenset(["add", "subtract", "multiply", "divide", "power"])
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_args(op, args):
+    expected = OPERATIONS[op]
+    low, high = expected if isinstance(expected, tuple) else (expected, expected)
+    if not low <= len(args) <= high:
+        raise RequestError(f"{op} の引数の数が正しくありません: {len(args)}")
+    if op in _ARITHMETIC:
+        for value in args:
+            if not _is_number(value):
+                raise RequestError(f"数値を指定してください: {value!r}")
+    elif op == "evaluate":
+        _check_evaluate_args(*args)
+
+
+def _check_evaluate_args(text, variables=None):
+    """evaluate の引数（数式の文字列と、変数名から数値への辞書）を確認"""
+    if not isinstance(text, str):
+        raise RequestError(f"数式は文字列で指定してください: {text!r}")
+    if variables is None:
+        return
+    if not isinstance(variables, dict):
+        raise RequestError("変数はオブジェクトで指定してください")
+    for name, value in variables.items():
+        if not _is_number(value):
+            raise RequestError(f"変数 {name} には数値を指定してください: {value!r}")
+
+
+def _check_result(value):
+    """計算結果がJSONの数値として返せるか確認"""
+    if isinstance(value, complex):
+        raise ResultError(f"複素数の結果は返せません: {value}")
+    if not _is_number(value):
+        raise ResultError(f"数値でない結果は返せません: {value!r}")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ResultError(f"NaN や無限大の結果は返せません: {value}")
+    if isinstance(value, int) and abs(value) >= _RESULT_LIMIT:
+        raise ResultError(f"結果の整数が大きすぎます（{MAX_RESULT_DIGITS} 桁まで）")
+
+
+def error_response(request_id, error):
+    """例外からエラー応答の辞書を作る"""
+    return {
+        "id": request_id,
+        "error": {"type": type(error).__name__, "message": str(error)},
+    }
+
+
+def dispatch(calc, request):
+    """1件のリクエストを処理してレスポンスの辞書を返す"""
+    request_id = request.get("id") if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict):
+            raise RequestError("リクエストはJSONオブジェクトで指定してください")
+        op = request.get("op")
+        if op not in OPERATIONS:
+            raise RequestError(f"未対応の演算です: {op}")
+        args = request.get("args", [])
+        if not isinstance(args, list):
+            raise RequestError("args は配列で指定してください")
+        _check_args(op, args)
+        result = getattr(calc, op)(*args)
+        _check_result(result)
+    except (
+        ArithmeticError,
+        LookupError,
+        ValueError,
+        TypeError,
+        NameError,
+        RecursionError,
+    ) as e:
+        return error_response(request_id, e)
+    return {"id": request_id, "result": result}
+
+
+def encode_response(response):
+    """応答の辞書を1行のバイト列にする（NaN や無限大はValueError）"""
+    line = json.dumps(response, ensure_ascii=False, allow_nan=False)
+    return line.encode("utf-8") + b"\n"
+
+
+def handle_line(calc, line):
+    """1行のJSONを処理して応答の1行（バイト列）を返す
+
+    どんなリクエストにも1行の応答を返し、例外で接続を切らない。
+    """
+    try:
+        request = json.loads(line)
+    except (ValueError, RecursionError) as e:
+        return encode_response(error_response(None, RequestError(str(e))))
+    try:
+        return encode_response(dispatch(calc, request))
+    except (ValueError, TypeError, RecursionError) as e:
+        # 結果は確認済みなので、id がJSONで表せない場合など
+        error = RequestError(f"応答を作成できません: {e}")
+        return encode_response(error_response(None, error))
+
+
+class CalculatorServer:
+    """接続ごとに Calculator を持つ計算サーバー"""
+
+    def __init__(self, calculator_factory=Calculator):
+        self.calculator_factory = calculator_factory
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+
+    async def handle_client(self, reader, writer):
+        """1接続分のリクエストを順に処理"""
+        calc = self.calculator_factory()
+        writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # 1行が MAX_LINE_BYTES を超えた場合は応答を返して切断する
+                    error = RequestError("リクエストが長すぎます")
+                    writer.write(encode_response(error_response(None, error)))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                self.requests += 1
+                writer.write(handle_line(calc, line))
+                # 相手が読まずに書き込みバッファが溜まったらここで待つ
+                await writer.drain()
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host="127.0.0.1", port=8765, unix_path=None, backlog=1024):
+        """サーバーを起動（unix_path を指定するとUnixソケット）"""
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(
+                self.handle_client, unix_path, limit=MAX_LINE_BYTES, backlog=backlog
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self.handle_client, host, port, limit=MAX_LINE_BYTES, backlog=backlog
+            )
+        return self._server
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server is not None else ()
+
+    async def serve_forever(self):
+        """停止されるまで接続を受け付ける"""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """サーバーを停止"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+async def _serve(args):
+    server = CalculatorServer()
+    await server.start(args.host, args.port, args.unix)
+    for sock in server.sockets:
+        print(f"🧮 計算サーバーを起動しました: {sock.getsockname()}", file=sys.stderr)
+    await server.serve_forever()
+
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Calculator の計算サーバー")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=8765, help="待ち受けポート")
+    parser.add_argument("--unix", help="Unixソケットのパス（指定時はTCPを使わない）")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
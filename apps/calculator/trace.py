@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""GUIのキー入力の記録と再生
+
+CalculatorGUI のイベントハンドラの呼び出しを、前のイベントからの経過時間
+（マイクロ秒）と一緒にコンパクトなテキスト形式で記録する。記録したトレースを
+別の CalculatorGUI に再生すると、ハンドラごとのレイテンシ（p50/p99/最大）と
+最終状態のチェックサムが得られる。チェックサムが変われば動作が、
+レイテンシが変われば性能が変わったことがわかる。
+
+トレースの形式（UTF-8、1行1イベント）:
+
+    # calculator-trace 1
+    0 d 1
+    153021 o +
+    98211 =
+
+各行は「経過時間 イベント [引数]」。イベントの記号は EVENTS を参照。
+"""
+
+# Standard library imports
+import hashlib
+import math
+import time
+
+TRACE_HEADER = "# calculator-trace 1"
+
+# 記号: (ハンドラ名, 引数の型)  引数のないイベントは None
+EVENTS = {
+    "d": ("on_digit", str),
+    "a": ("append_digits", str),
+    "o": ("on_operation", str),
+    "=": ("on_equals", None),
+    "c": ("on_clear", None),
+    "b": ("on_backspace", None),
+    "s": ("on_memory_slot", int),
+    "ms": ("on_memory_store", None),
+    "mr": ("on_memory_recall", None),
+    "mc": ("on_memory_clear", None),
+}
+
+# 計算中に呼ばれると pending_feed に溜まり、結果が届いてから feed() で
+# もう一度呼ばれるイベント
+QUEUED_WHILE_BUSY = frozenset(["d", "a", "o", "="])
+
+
+class TraceRecorder:
+    """CalculatorGUI のイベントを記録する
+
+    attach() でハンドラを記録用のラッパーに置き換える。ボタンはハンドラを
+    作成時に受け取るため、CalculatorGUI(root, recorder=...) として
+    ウィジェットの作成前に attach() させる。記録しない場合はラッパーが
+    ないため、コストはかからない。
+
+    計算中に押されて pending_feed に溜まったキーは、押したときではなく
+    feed() で処理されたときに1回だけ記録する。
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.events = []
+        self._clock = clock
+        self._last = None
+
+    def attach(self, gui):
+        """gui のハンドラを記録用のラッパーに置き換える"""
+        for code, (name, _) in EVENTS.items():
+            setattr(gui, name, self._wrap(gui, code, getattr(gui, name)))
+
+    def detach(self, gui):
+        """記録用のラッパーを外す"""
+        for name, _ in EVENTS.values():
+            gui.__dict__.pop(name, None)
+
+    def _wrap(self, gui, code, method):
+        record = self.record
+        queued = code in QUEUED_WHILE_BUSY
+
+        def traced(*args):
+            if not (queued and gui.evaluator.busy):
+                record(code, args[0] if args else None)
+            return method(*args)
+
+        traced.__name__ = method.__name__
+        traced.__doc__ = method.__doc__
+        traced.__wrapped__ = method
+        return traced
+
+    def record(self, code, arg=None):
+        """イベントを1件記録"""
+        now = self._clock()
+        delta = 0 if self._last is None else round((now - self._last) * 1e6)
+        self._last = now
+        self.events.append((delta, code, arg))
+
+    def save(self, path):
+        """トレースをファイルに保存"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(format_trace(self.events))
+
+
+def format_trace(events):
+    """イベントの列をトレースの文字列に変換"""
+    lines = [TRACE_HEADER]
+    for delta, code, arg in events:
+        lines.append(f"{delta} {code}" if arg is None else f"{delta} {code} {arg}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_trace(lines):
+    """トレースの行を (経過マイクロ秒, 記号, 引数) の列に変換"""
+    events = []
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split(" ", 2)
+        if len(parts) < 2 or parts[1] not in EVENTS:
+            raise ValueError(f"{lineno}行目: トレースの形式が不正です: {line!r}")
+        _, arg_type = EVENTS[parts[1]]
+        arg = None
+        if arg_type is not None:
+            if len(parts) < 3:
+                raise ValueError(f"{lineno}行目: 引数がありません: {line!r}")
+            arg = arg_type(parts[2])
+        events.append((int(parts[0]), parts[1], arg))
+    return events
+
+
+def load_trace(path):
+    """トレースをファイルから読み込む"""
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_trace(f)
+
+
+def _canonical(value):
+    """チェックサム用に repr できる形にする
+
+    整数はPythonの整数と文字列の変換の上限を超えても repr できるよう16進にする。
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(item) for item in value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return hex(value)
+    return value
+
+
+def state_checksum(gui):
+    """GUIと電卓の最終状態のチェックサム（同じ入力なら同じ値になる）"""
+    calc = gui.calc
+    state = (
+        gui.display_value,
+        gui.current_input,
+        gui.pending_value,
+        gui.pending_operation,
+        gui.memory_slot,
+        calc.last_result,
+        calc.registers,
+        sorted(calc.named_registers.items()),
+    )
+    digest = hashlib.sha256(repr(_canonical(state)).encode("utf-8"))
+    digest.update(calc.history.to_array().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def percentile(sorted_values, q):
+    """ソート済みの値の q 分位（最近順位法）"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class ReplayReport:
+    """再生結果（イベントごとのレイテンシと最終状態のチェックサム）"""
+
+    def __init__(self, latencies, checksum):
+        # {ハンドラ名: [秒, ...]}
+        self.latencies = latencies
+        self.checksum = checksum
+
+    def summary(self):
+        """{ハンドラ名: {count, p50, p99, max}}（"all" は全イベントの集計）"""
+        groups = dict(sorted(self.latencies.items()))
+        groups["all"] = [v for values in self.latencies.values() for v in values]
+        result = {}
+        for name, values in groups.items():
+            values = sorted(values)
+            result[name] = {
+                "count": len(values),
+                "p50": percentile(values, 0.5),
+                "p99": percentile(values, 0.99),
+                "max": values[-1] if values else 0.0,
+            }
+        return result
+
+    def to_dict(self):
+        """JSONにできる形式"""
+        return {"checksum": self.checksum, "events": self.summary()}
+
+    def format(self):
+        """表形式の文字列（レイテンシはマイクロ秒）"""
+        lines = [f"{'event':<18} {'count':>7} {'p50':>9} {'p99':>9} {'max':>9}"]
+        for name, stats in self.summary().items():
+            lines.append(
+                f"{name:<18} {stats['count']:>7} {stats['p50'] * 1e6:>9.1f}"
+                f" {stats['p99'] * 1e6:>9.1f} {stats['max'] * 1e6:>9.1f}"
+            )
+        lines.append(f"checksum: {self.checksum}")
+        return "\n".join(lines)
+
+
+def replay(gui, events, realtime=False, clock=time.perf_counter, sleep=time.sleep):
+    """トレースを gui に再生して ReplayReport を返す
+
+    realtime=True なら記録時の間隔どおりに、False なら最大速度で再生する。
+    計測するのはハンドラの呼び出しだけで、バックグラウンドの計算は
+    完了を待ってから次のイベントに進む（結果が再生ごとに変わらないように）。
+    root.after_idle がコールバックをすぐに実行する場合は、表示の更新も計測に含まれる。
+    """
+    latencies = {}
+    started = clock()
+    due = 0.0
+    for delta, code, arg in events:
+        name, _ = EVENTS[code]
+        if realtime:
+            due += delta / 1e6
+            remaining = started + due - clock()
+            if remaining > 0:
+                sleep(remaining)
+        handler = getattr(gui, name)
+        args = () if arg is None else (arg,)
+        t0 = clock()
+        handler(*args)
+        elapsed = clock() - t0
+        latencies.setdefault(name, []).append(elapsed)
+        _wait_background(gui, sleep)
+    return ReplayReport(latencies, state_checksum(gui))
+
+
+def _wait_background(gui, sleep, timeout=60):
+    deadline = time.monotonic() + timeout
+    while gui.evaluator.busy:
+        if time.monotonic() > deadline:
+            raise TimeoutError("バックグラウンドの計算が終わりません")
+        gui.poll_background()
+        if gui.evaluator.busy:
+            sleep(0.001)
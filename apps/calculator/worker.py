@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""GUIの外で重い計算を実行するバックグラウンド評価器
+
+Tkのイベントループを止めないよう、計算をワーカースレッドまたはワーカー
+プロセスで実行し、GUI側は root.after で定期的に poll() して結果を受け取る。
+Tkのオブジェクトにはメインスレッドからしか触れないため、ワーカーは結果を
+キュー（プロセスの場合はパイプ）に置くだけにする。
+
+cancel() するとそれまでのジョブの結果は捨てられる。プロセスモードでは
+ワーカープロセスを終了させるため、実行中の計算自体も止まる。
+"""
+
+# Standard library imports
+import multiprocessing
+import queue
+import threading
+from collections import namedtuple
+
+MODES = ("thread", "process")
+
+# value: 計算結果 / error: 送出された例外（成功時はNone）
+JobResult = namedtuple("JobResult", ["value", "error"])
+
+
+def _run_job(func, args):
+    try:
+        return JobResult(func(*args), None)
+    except Exception as e:
+        return JobResult(None, e)
+
+
+def _process_entry(conn, func, args):
+    """ワーカープロセスのエントリポイント"""
+    try:
+        conn.send(_run_job(func, args))
+    finally:
+        conn.close()
+
+
+class BackgroundEvaluator:
+    """一度に1件のジョブをバックグラウンドで実行する
+
+    プロセスモードでは func と引数がpickle可能である必要がある。
+    """
+
+    def __init__(self, mode="thread"):
+        if mode not in MODES:
+            raise ValueError(f"mode は {MODES} のいずれかを指定してください")
+        self.mode = mode
+        self._generation = 0
+        self._results = queue.SimpleQueue()
+        self._process = None
+        self._conn = None
+        self.busy = False
+
+    def submit(self, func, *args):
+        """ジョブを開始（実行中のジョブはキャンセルされる）"""
+        self.cancel()
+        self.busy = True
+        if self.mode == "process":
+            self._start_process(func, args)
+        else:
+            generation = self._generation
+            thread = threading.Thread(
+                target=lambda: self._results.put((generation, _run_job(func, args))),
+                daemon=True,
+            )
+            thread.start()
+
+    def _start_process(self, func, args):
+        # Tkを初期化したプロセスからforkしないようspawnで起動する
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_process_entry, args=(child_conn, func, args), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    def poll(self):
+        """完了していれば JobResult を、実行中またはジョブがなければNoneを返す"""
+        if not self.busy:
+            return None
+        if self.mode == "process":
+            return self._poll_process()
+        while True:
+            try:
+                generation, result = self._results.get_nowait()
+            except queue.Empty:
+                return None
+            # キャンセル済みのジョブの結果は捨てる
+            if generation == self._generation:
+                self.busy = False
+                return result
+
+    def _poll_process(self):
+        try:
+            if not self._conn.poll():
+                if self._process.is_alive():
+                    return None
+                result = JobResult(
+                    None, RuntimeError("ワーカープロセスが異常終了しました")
+                )
+            else:
+                result = self._conn.recv()
+        except (EOFError, OSError) as e:
+            result = JobResult(None, e)
+        self._cleanup_process(terminate=False)
+        self.busy = False
+        return result
+
+    def wait(self, timeout=None):
+        """ジョブの完了を待って JobResult を返す（主にテスト用）"""
+        if not self.busy:
+            return None
+        if self.mode == "process":
+            self._conn.poll(timeout)
+            return self._poll_process()
+        try:
+            while True:
+                generation, result = self._results.get(timeout=timeout)
+                if generation == self._generation:
+                    self.busy = False
+                    return result
+        except queue.Empty:
+            return None
+
+    def cancel(self):
+        """実行中のジョブをキャンセル（結果は捨てられる）"""
+        self._generation += 1
+        if self._process is not None:
+            self._cleanup_process(terminate=True)
+        self.busy = False
+
+    def _cleanup_process(self, terminate):
+        if terminate and self._process.is_alive():
+            self._process.terminate()
+        self._process.join(timeout=1)
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def shutdown(self):
+        """後始末（実行中のジョブはキャンセルされる）"""
+        self.cancel()
@@ -0,0 +1,5 @@
+"""セッションログ（JSONL）ビューアのパッケージ"""
+
+from .viewer import view_session
+
+__all__ = ["view_session"]
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""複数のセッションログの集計
+
+ディレクトリやglobに一致するセッションログを数ファイルずつのシャードに分け、
+プロセスプールのワーカーがシャードごとに SessionStats（足し合わせられる
+カウンタ）を作る。親プロセスは届いた順に1つの SessionStats に足し込むため、
+ファイルの数がいくら多くてもメモリ使用量は一定になる。
+"""
+
+# Standard library imports
+import fnmatch
+import glob
+import heapq
+import json
+import os
+from collections import Counter, deque
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+
+from .index import parse_timestamp
+from .source import open_lines
+
+# 1タスクで処理するファイル数
+FILES_PER_TASK = 8
+
+# 既定で表示する大きいセッションの件数
+DEFAULT_TOP = 10
+
+
+class SessionStats:
+    """セッションログの集計結果（merge() で足し合わせられる）"""
+
+    def __init__(self, top=DEFAULT_TOP):
+        self.top = top
+        self.files = 0
+        self.lines = 0
+        self.bytes = 0
+        self.invalid_lines = 0
+        self.unreadable_files = 0
+        self.types = Counter()
+        self.tools = Counter()
+        # 日付（UTC）ごとのセッション数。セッションの最初のタイムスタンプの日付で数える
+        self.sessions_per_day = Counter()
+        # (バイト数, 行数, パス) の最小ヒープ（大きい方から top 件を残す）
+        self._largest = []
+
+    def add_session(self, path, lines, size):
+        """大きいセッションの候補に加える"""
+        entry = (size, lines, os.fspath(path))
+        if len(self._largest) < self.top:
+            heapq.heappush(self._largest, entry)
+        elif entry > self._largest[0]:
+            heapq.heapreplace(self._largest, entry)
+
+    @property
+    def largest(self):
+        """大きい順の [(バイト数, 行数, パス), ...]"""
+        return sorted(self._largest, reverse=True)
+
+    def merge(self, other):
+        """他の集計結果を足し合わせる"""
+        self.files += other.files
+        self.lines += other.lines
+        self.bytes += other.bytes
+        self.invalid_lines += other.invalid_lines
+        self.unreadable_files += other.unreadable_files
+        self.types.update(other.types)
+        self.tools.update(other.tools)
+        self.sessions_per_day.update(other.sessions_per_day)
+        for size, lines, path in other._largest:
+            self.add_session(path, lines, size)
+        return self
+
+    def to_dict(self):
+        """JSONにできる形式"""
+        return {
+            "files": self.files,
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "invalid_lines": self.invalid_lines,
+            "unreadable_files": self.unreadable_files,
+            "types": dict(self.types.most_common()),
+            "tools": dict(self.tools.most_common()),
+            "sessions_per_day": dict(sorted(self.sessions_per_day.items())),
+            "largest_sessions": [
+                {"path": path, "bytes": size, "lines": lines}
+                for size, lines, path in self.largest
+            ],
+        }
+
+
+def _day(timestamp):
+    milliseconds = parse_timestamp(timestamp)
+    if milliseconds is None:
+        return None
+    return datetime.fromtimestamp(milliseconds / 1000, timezone.utc).date().isoformat()
+
+
+def summarize_file(path, stats):
+    """1ファイル分を stats に加える（圧縮されたログは展開したバイト数で数える）
+
+    途中で読めなくなったファイルは読めなかったファイルとしてだけ数え、
+    そこまでの集計は加えない。
+    """
+    lines = size = invalid = 0
+    types = Counter()
+    tools = Counter()
+    day = None
+    try:
+        with open_lines(path) as f:
+            for line in f:
+                lines += 1
+                size += len(line)
+                try:
+                    data = json.loads(line)
+                    kind = data["type"]
+                except (ValueError, KeyError, TypeError):
+                    kind = None
+                if not isinstance(kind, str):
+                    invalid += 1
+                    continue
+                types[kind] += 1
+                if kind == "tool_use":
+                    tools[str(data.get("name", "Unknown"))] += 1
+                if day is None and data.get("timestamp"):
+                    day = _day(data["timestamp"])
+    except OSError:
+        stats.unreadable_files += 1
+        return stats
+    stats.files += 1
+    stats.lines += lines
+    stats.bytes += size
+    stats.invalid_lines += invalid
+    stats.types.update(types)
+    stats.tools.update(tools)
+    stats.sessions_per_day[day or "unknown"] += 1
+    stats.add_session(path, lines, size)
+    return stats
+
+
+def summarize_files(paths, top=DEFAULT_TOP):
+    """複数ファイルを集計（プロセスプールのワーカーからも呼ばれる）"""
+    stats = SessionStats(top)
+    for path in paths:
+        summarize_file(path, stats)
+    return stats
+
+
+def find_sessions(targets, pattern="*.jsonl"):
+    """ディレクトリ（再帰的に pattern に一致するファイル）・glob・ファイルを列挙"""
+    for target in targets:
+        if os.path.isdir(target):
+            for root, dirs, files in os.walk(target):
+                dirs.sort()
+                for name in sorted(fnmatch.filter(files, pattern)):
+                    yield os.path.join(root, name)
+        elif any(c in target for c in "*?["):
+            for path in glob.iglob(target, recursive=True):
+                if os.path.isfile(path):
+                    yield path
+        else:
+            yield target
+
+
+def shards(paths, size=FILES_PER_TASK):
+    """パスの列を size 件ずつのリストに分割"""
+    paths = iter(paths)
+    while True:
+        shard = list(islice(paths, size))
+        if not shard:
+            return
+        yield shard
+
+
+def merge_shards(paths, work, total, workers=1, on_progress=None):
+    """paths のシャードごとに work(shard) を実行し、結果を total に merge() する
+
+    work はシャードの集計結果（merge() で足し合わせられるもの）を返す
+    モジュールレベルの関数（プロセスプールに渡せるもの）とする。
+    workers が2以上ならシャードをプロセスプールに分散する。先行して投入する
+    シャード数を制限し、届いた結果はすぐに足し込むため、パスの一覧も
+    個々の結果も溜め込まない。on_progress があれば足し込むたびに
+    その時点の total を渡して呼ぶ。
+    """
+    if workers <= 1:
+        for shard in shards(paths):
+            total.merge(work(shard))
+            if on_progress is not None:
+                on_progress(total)
+        return total
+
+    # プロセスプールを使うときだけ読み込む
+    # Standard library imports
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for shard in shards(paths):
+            pending.append(executor.submit(work, shard))
+            if len(pending) >= workers * 2:
+                total.merge(pending.popleft().result())
+                if on_progress is not None:
+                    on_progress(total)
+        while pending:
+            total.merge(pending.popleft().result())
+            if on_progress is not None:
+                on_progress(total)
+    return total
+
+
+def aggregate(paths, workers=1, top=DEFAULT_TOP, on_progress=None):
+    """paths を集計した SessionStats を返す（merge_shards() を参照）"""
+    work = partial(summarize_files, top=top)
+    return merge_shards(paths, work, SessionStats(top), workers, on_progress)
+
+
+def format_report(stats, limit=20):
+    """集計結果の表示用の文字列"""
+    lines = [
+        f"Sessions: {stats.files}  Lines: {stats.lines}  Bytes: {stats.bytes}",
+        f"Invalid lines: {stats.invalid_lines}  "
+        f"Unreadable files: {stats.unreadable_files}",
+        "",
+        "Messages by type:",
+    ]
+    lines += [f"  {kind:<20} {n:>10}" for kind, n in stats.types.most_common(limit)]
+    lines += ["", "Tool usage:"]
+    lines += [f"  {name:<20} {n:>10}" for name, n in stats.tools.most_common(limit)]
+    lines += ["", "Sessions per day:"]
+    days = sorted(stats.sessions_per_day.items())
+    lines += [f"  {day:<20} {n:>10}" for day, n in days]
+    lines += ["", "Largest sessions:"]
+    lines += [
+        f"  {size:>12} bytes {n:>8} lines  {path}" for size, n, path in stats.largest
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""コマンドラインエントリポイント
+
+    python -m apps.session_viewer <session_file.jsonl>
+    python -m apps.session_viewer <session_file.jsonl> --tail 20
+    python -m apps.session_viewer <session_file.jsonl> --since 2025-01-01T10:00
+    python -m apps.session_viewer <session_file.jsonl> --tail 20 --follow
+    python -m apps.session_viewer <session_file.jsonl> --tool Bash --grep pytest
+    python -m apps.session_viewer index <session_file.jsonl>
+    python -m apps.session_viewer aggregate <dir_or_glob> [-j 0] [--json]
+    python -m apps.session_viewer ingest <dir_or_glob> [--db sessions.db]
+    python -m apps.session_viewer query --tool Bash --since 2025-01-01 [--db ...]
+    python -m apps.session_viewer stats <dir_or_glob> [--save s.json] [--load ...]
+
+--since / --until / --tail / --message を指定するとインデックスを使い、
+ログの該当する行だけを読む。インデックスはなければ作り、ログが追記されて
+いれば追記分だけを反映する。--follow を指定すると、表示した後も
+追記される行を待って表示し続ける（Ctrl+C で終了）。
+
+--type / --tool / --grep を指定すると、条件の文字列を含まない行は
+JSONとしてデコードせずに読み飛ばし、一致するレコードだけを表示する。
+gzip / bz2 / xz で圧縮されたログは展開しながら表示する。
+
+ingest は複数のログを SQLite のデータベースに取り込み（2回目以降は追記分だけ）、
+query はデータベースのインデックスで条件に合う行を探して表示する。
+stats は応答時間・ツールの所要時間・ターンの間隔の分位点を表示する
+（--save で保存した結果は次回 --load で合わせられる）。
+"""
+
+# Standard library imports
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from . import aggregate, latency, store
+from .filter import RecordFilter
+from .follow import Follower
+from .index import open_index, parse_timestamp
+from .source import CorruptLogError, detect_compression
+from .viewer import OutputBuffer, exit_quietly, process_line, view_lines, view_session
+
+USAGE = "使用方法: python view_session.py <session_file.jsonl>"
+
+
+def _timestamp_arg(value):
+    timestamp = parse_timestamp(value)
+    if timestamp is None:
+        raise argparse.ArgumentTypeError(f"日時の形式が不正です: {value}")
+    return timestamp
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("1以上を指定してください")
+    return number
+
+
+def build_parser():
+    """表示用の引数パーサを作成"""
+    parser = argparse.ArgumentParser(
+        prog="view_session.py",
+        description="セッションログ（JSONL）を見やすく表示します",
+    )
+    parser.add_argument("session_file", help="セッションログ")
+    parser.add_argument(
+        "--since",
+        type=_timestamp_arg,
+        help="この日時以降のレコードだけを表示（ISO 8601、タイムゾーンなしはUTC）",
+    )
+    parser.add_argument(
+        "--until", type=_timestamp_arg, help="この日時より前のレコードだけを表示"
+    )
+    position = parser.add_mutually_exclusive_group()
+    position.add_argument(
+        "--tail", type=_positive_int, metavar="N", help="最後の N 件だけを表示"
+    )
+    position.add_argument(
+        "--message", type=_positive_int, metavar="K", help="K 行目（1から）だけを表示"
+    )
+    parser.add_argument("--index-file", help="インデックスのパス（既定: <ログ>.idx）")
+    parser.add_argument(
+        "--type",
+        action="append",
+        dest="types",
+        metavar="TYPE",
+        help="この type のレコードだけを表示（複数指定可）",
+    )
+    parser.add_argument(
+        "--tool",
+        action="append",
+        dest="tools",
+        metavar="NAME",
+        help="このツールの tool_use だけを表示（複数指定可）",
+    )
+    parser.add_argument(
+        "--grep", metavar="TEXT", help="文字列の値に TEXT を含むレコードだけを表示"
+    )
+    parser.add_argument(
+        "--follow",
+        "-f",
+        action="store_true",
+        help="追記される行を表示し続ける（他のオプションがなければ新しい行だけ）",
+    )
+    return parser
+
+
+def build_index_parser():
+    """index サブコマンドの引数パーサを作成"""
+    parser = argparse.ArgumentParser(
+        prog="view_session.py index",
+        description="セッションログのインデックスを作成・更新します",
+    )
+    parser.add_argument("session_file", help="セッションログ")
+    parser.add_argument("--index-file", help="インデックスのパス（既定: <ログ>.idx）")
+    return parser
+
+
+def build_aggregate_parser():
+    """aggregate サブコマンドの引数パーサを作成"""
+    parser = argparse.ArgumentParser(
+        prog="view_session.py aggregate",
+        description="複数のセッションログを並列に集計します",
+    )
+    parser.add_argument(
+        "targets", nargs="+", help="ディレクトリ（再帰的に検索）・glob・ファイル"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.jsonl",
+        help="ディレクトリ内で対象にするファイル名（既定: *.jsonl）",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=0,
+        help="プロセス数（0で全コア、既定: 0）",
+    )
+    parser.add_argument(
+        "--top",
+        type=_positive_int,
+        default=aggregate.DEFAULT_TOP,
+        help=f"表示する大きいセッションの件数（既定: {aggregate.DEFAULT_TOP}）",
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    return parser
+
+
+def build_stats_parser():
+    """stats サブコマンドの引数パーサを作成"""
+    parser = argparse.ArgumentParser(
+        prog="view_session.py stats",
+        description="応答時間・ツールの所要時間・ターンの間隔を集計します",
+    )
+    parser.add_argument(
+        "targets", nargs="*", help="ディレクトリ（再帰的に検索）・glob・ファイル"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.jsonl",
+        help="ディレクトリ内で対象にするファイル名（既定: *.jsonl）",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=0,
+        help="プロセス数（0で全コア、既定: 0）",
+    )
+    parser.add_argument(
+        "--load",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="--save で保存した集計結果を合わせる（複数指定可）",
+    )
+    parser.add_argument("--save", metavar="FILE", help="集計結果を保存する")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    return parser
+
+
+def build_ingest_parser():
+    """ingest サブコマンドの引数パーサを作成"""
+    parser = argparse.ArgumentParser(
+        prog="view_session.py ingest",
+        description="セッションログをデータベースに取り込みます（追記分だけ）",
+    )
+    parser.add_argument(
+        "targets", nargs="+", help="ディレクトリ（再帰的に検索）・glob・ファイル"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.jsonl",
+        help="ディレクトリ内で対象にするファイル名（既定: *.jsonl）",
+    )
+    parser.add_argument(
+        "--db",
+        default=store.DEFAULT_DB,
+        help=f"データベース（既定: {store.DEFAULT_DB}）",
+    )
+    return parser
+
+
+def build_query_parser():
+    """query サブコマンドの引数パーサを作成"""
+    parser = argparse.ArgumentParser(
+        prog="view_session.py query",
+        description="データベースから条件に合うレコードを探して表示します",
+    )
+    parser.add_argument(
+        "--db",
+        default=store.DEFAULT_DB,
+        help=f"データベース（既定: {store.DEFAULT_DB}）",
+    )
+    parser.add_argument(
+        "--since",
+        type=_timestamp_arg,
+        help="この日時以降のレコードだけを表示（ISO 8601、タイムゾーンなしはUTC）",
+    )
+    parser.add_argument(
+        "--until", type=_timestamp_arg, help="この日時より前のレコードだけを表示"
+    )
+    parser.add_argument(
+        "--type",
+        action="append",
+        dest="types",
+        metavar="TYPE",
+        help="この type のレコードだけを表示（複数指定可）",
+    )
+    parser.add_argument(
+        "--tool",
+        action="append",
+        dest="tools",
+        metavar="NAME",
+        help="このツールの tool_use だけを表示（複数指定可）",
+    )
+    parser.add_argument(
+        "--grep", metavar="TEXT", help="文字列の値に TEXT を含むレコードだけを表示"
+    )
+    return parser
+
+
+def check_file(session_file):
+    """ファイルが読めるか確認し、読めなければエラーを表示して終了"""
+    # ファイルの存在確認
+    if not Path(session_file).exists():
+        print(f"Error: File '{session_file}' does not exist.", file=sys.stderr)
+        sys.exit(1)
+
+    # ファイルの読み取り権限確認
+    if not Path(session_file).is_file():
+        print(f"Error: '{session_file}' is not a file.", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        # ファイルが読み取り可能か確認
+        with open(session_file, "r", encoding="utf-8"):
+            pass
+    except PermissionError:
+        print(f"Error: No permission to read file '{session_file}'.", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: Unable to read file '{session_file}': {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def uses_index(args):
+    """インデックスが必要なオプションが指定されているか"""
+    return any(
+        value is not None for value in (args.since, args.until, args.tail, args.message)
+    )
+
+
+def build_filter(args):
+    """--type / --tool / --grep の条件（指定がなければNone）"""
+    record_filter = RecordFilter(args.types or (), args.tools or (), args.grep)
+    return record_filter if record_filter else None
+
+
+def select_offsets(index, args, record_filter=None):
+    """オプションに合うレコードのログ上のオフセット
+
+    record_filter があれば、インデックスの type の番号で一致しえない
+    レコードを除く。--tail では条件に一致する最後の N 件を後ろから探す。
+    """
+    if args.message is not None:
+        if args.message > len(index):
+            return []
+        return index.offsets([args.message - 1])
+    positions = index.select(args.since, args.until)
+    if record_filter is not None:
+        if isinstance(positions, range):
+            records = index.records(positions.start, positions.stop)
+        else:
+            records = (index.record(position) for position in positions)
+        positions = [
+            position
+            for position, (_, _, code) in zip(positions, records)
+            if record_filter.may_match_kind(code)
+        ]
+        if args.tail is not None:
+            return tail_matching(index, positions, record_filter, args.tail)
+    if args.tail is not None:
+        positions = positions[-args.tail :]
+    return index.offsets(positions)
+
+
+def tail_matching(index, positions, record_filter, count):
+    """positions のうち条件に一致する最後の count 件のオフセット"""
+    offsets = []
+    with open(index.session_file, "rb") as f:
+        for position in reversed(positions):
+            offset = index.record(position)[0]
+            f.seek(offset)
+            if record_filter.decode(f.readline()) is not None:
+                offsets.append(offset)
+                if len(offsets) == count:
+                    break
+    offsets.reverse()
+    return offsets
+
+
+def matching_offsets(session_file, offsets, record_filter):
+    """offsets のうち条件に一致する行のオフセット"""
+    matched = []
+    with open(session_file, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            if record_filter.decode(f.readline()) is not None:
+                matched.append(offset)
+    return matched
+
+
+def follow_session(session_file, offset=None, record_filter=None):
+    """offset（省略時は末尾）から追記される行を表示し続ける"""
+    try:
+        with Follower(session_file, offset) as follower:
+            with OutputBuffer(sys.stdout) as out:
+                for lines in follower.follow():
+                    for line in lines:
+                        if record_filter is None:
+                            process_line(line.decode("utf-8", "replace"), out=out)
+                        else:
+                            process_line(line, record_filter, out)
+                    # 届いた分はすぐに表示する
+                    out.flush()
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        exit_quietly()
+
+
+def run_index(argv):
+    """index サブコマンド"""
+    parser = build_index_parser()
+    args = parser.parse_args(argv)
+    check_file(args.session_file)
+    if detect_compression(args.session_file) is not None:
+        parser.error("圧縮されたログのインデックスは作れません")
+    try:
+        with open_index(args.session_file, args.index_file) as index:
+            print(f"{index.index_file}: {len(index)} 件", file=sys.stderr)
+    except OSError as e:
+        print(f"Error: Unable to write index: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_aggregate(argv):
+    """aggregate サブコマンド"""
+    parser = build_aggregate_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers は0以上を指定してください")
+    workers = args.workers or os.cpu_count() or 1
+    paths = aggregate.find_sessions(args.targets, args.pattern)
+    stats = aggregate.aggregate(paths, workers=workers, top=args.top)
+    try:
+        if args.json:
+            print(json.dumps(stats.to_dict(), indent=2, ensure_ascii=False))
+        else:
+            print(aggregate.format_report(stats))
+        sys.stdout.flush()
+    except BrokenPipeError:
+        exit_quietly()
+    return 0
+
+
+def load_stats(paths):
+    """保存した集計結果を読んで足し合わせる（読めなければエラーを表示して終了）"""
+    stats = None
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                loaded = latency.LatencyStats.from_dict(json.load(f))
+            stats = loaded if stats is None else stats.merge(loaded)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error: Unable to load stats '{path}': {e}", file=sys.stderr)
+            sys.exit(1)
+    return stats
+
+
+def save_stats(stats, path):
+    """集計結果を保存（書けなければエラーを表示して終了）"""
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f)
+    except OSError as e:
+        print(f"Error: Unable to save stats '{path}': {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def run_stats(argv):
+    """stats サブコマンド"""
+    parser = build_stats_parser()
+    args = parser.parse_args(argv)
+    if not args.targets and not args.load:
+        parser.error("ログか --load を指定してください")
+    if args.workers < 0:
+        parser.error("--workers は0以上を指定してください")
+    stats = load_stats(args.load)
+    workers = args.workers or os.cpu_count() or 1
+    paths = aggregate.find_sessions(args.targets, args.pattern)
+    stats = latency.analyze(paths, workers=workers, stats=stats)
+    if args.save:
+        save_stats(stats, args.save)
+    try:
+        if args.json:
+            print(json.dumps(stats.summary(), indent=2, ensure_ascii=False))
+        else:
+            print(latency.format_report(stats))
+        sys.stdout.flush()
+    except BrokenPipeError:
+        exit_quietly()
+    return 0
+
+
+def run_ingest(argv):
+    """ingest サブコマンド"""
+    args = build_ingest_parser().parse_args(argv)
+    files = records = 0
+    with store.open_store(args.db) as db:
+        for path in aggregate.find_sessions(args.targets, args.pattern):
+            try:
+                added = db.ingest_file(path)
+            except (OSError, ValueError) as e:
+                print(f"Error: Unable to read file '{path}': {e}", file=sys.stderr)
+                continue
+            files += 1
+            records += added
+        total = len(db)
+    print(
+        f"{args.db}: {files} ファイル、{records} 件を追加（合計 {total} 件）",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def run_query(argv):
+    """query サブコマンド"""
+    args = build_query_parser().parse_args(argv)
+    if not Path(args.db).is_file():
+        print(f"Error: Database '{args.db}' does not exist.", file=sys.stderr)
+        return 1
+    # type と tool はデータベースで絞り込み、--grep は表示するときに確かめる
+    record_filter = RecordFilter(grep=args.grep) if args.grep is not None else None
+    with store.open_store(args.db) as db:
+        matches = db.select(args.types or (), args.tools or (), args.since, args.until)
+        try:
+            for path, offsets in matches:
+                if not db.is_current(path):
+                    print(
+                        f"Warning: '{path}' has changed since it was ingested;"
+                        " run ingest again.",
+                        file=sys.stderr,
+                    )
+                    continue
+                if record_filter is not None:
+                    offsets = matching_offsets(path, offsets, record_filter)
+                    if not offsets:
+                        continue
+                print(f"==> {path} <==")
+                view_lines(path, offsets)
+        except BrokenPipeError:
+            exit_quietly()
+    return 0
+
+
+def run_view(argv):
+    """ログの表示（サブコマンドなし）"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.follow and (args.until is not None or args.message is not None):
+        parser.error("--follow は --until / --message と同時に指定できません")
+    check_file(args.session_file)
+    if (uses_index(args) or args.follow) and detect_compression(args.session_file):
+        parser.error(
+            "圧縮されたログには --since / --until / --tail / --message / --follow"
+            " を指定できません"
+        )
+    record_filter = build_filter(args)
+    if not uses_index(args):
+        if args.follow:
+            follow_session(args.session_file, record_filter=record_filter)
+            return 0
+        try:
+            view_session(args.session_file, record_filter)
+        except CorruptLogError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        return 0
+    return _view_indexed(args, record_filter)
+
+
+def _view_indexed(args, record_filter):
+    """インデックスを使って表示（--since / --until / --tail / --message）"""
+    # インデックスを書けなければ、一時ファイルに作って表示だけはする
+    with open_index(args.session_file, args.index_file, fallback=True) as index:
+        offsets = select_offsets(index, args, record_filter)
+        indexed_bytes = index.indexed_bytes
+    if args.tail is not None:
+        # --tail の行は条件を確かめ済み
+        view_lines(args.session_file, offsets)
+    else:
+        view_lines(args.session_file, offsets, record_filter)
+    if args.follow:
+        follow_session(args.session_file, indexed_bytes, record_filter)
+    return 0
+
+
+# サブコマンドと処理する関数
+SUBCOMMANDS = {
+    "index": run_index,
+    "aggregate": run_aggregate,
+    "stats": run_stats,
+    "ingest": run_ingest,
+    "query": run_query,
+}
+
+
+def main(argv=None):
+    """メイン関数"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        print(USAGE)
+        return 0
+    command = SUBCOMMANDS.get(argv[0])
+    if command is not None:
+        return command(argv[1:])
+    return run_view(argv)
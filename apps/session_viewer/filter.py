@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""デコード前のバイト列によるレコードの絞り込み
+
+--type / --tool / --grep の条件を RecordFilter にまとめる。まず生の行（bytes）に条件の文字列がJSONとして現れるかだけを調べ、
+一致する可能性のない行は json.loads せずに捨てる。残った候補だけを
+デコードして match() で条件を正確に確かめる。
+
+バイト列での検査は一致するレコードを決して捨てないように作る。JSONでは
+文字列中の文字を \\uXXXX や \\/ とも書けるため、条件の文字列にエンコーダが
+エスケープしうる文字（ASCII以外と制御文字、/）があれば、そのエスケープを
+含む行は文字列が見つからなくても候補とする（ASCIIの英数字などをわざわざ
+エスケープするエンコーダはなく、キー名もエスケープされない前提）。
+"""
+
+# Standard library imports
+import json
+
+from .index import INHERITED_TIMESTAMP, KINDS
+from .partial import decode_line
+from .viewer import TEXT_LIMIT, TOOL_INPUT_LIMIT
+
+
+def _needles(values, quoted=True):
+    """values をJSONの文字列として書いたバイト列と、それが別の書き方を
+    されているかもしれないことを示すエスケープの組"""
+    tokens = []
+    escapes = set()
+    for value in values:
+        token = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        tokens.append(token if quoted else token[1:-1])
+        if any(ord(c) < 0x20 or ord(c) >= 0x7F for c in value):
+            escapes.add(b"\\u")
+        if "/" in value:
+            escapes.add(b"\\/")
+    return tokens, sorted(escapes)
+
+
+def _contains_any(line, needles):
+    """needles のバイト列のどれかが line に現れる可能性があるか"""
+    tokens, escapes = needles
+    for token in tokens:
+        if token in line:
+            return True
+    for escape in escapes:
+        if escape in line:
+            return True
+    return False
+
+
+def _strings(value):
+    """JSONの値に含まれる文字列（キーを除く）を順に返す"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+class RecordFilter:
+    """レコードの絞り込み条件（指定した条件をすべて満たすレコードが一致する）
+
+    types      type がどれかに一致
+    tools      type が tool_use で name がどれかに一致
+    grep       いずれかの文字列の値が grep を含む（大文字小文字を区別）
+
+    時刻の条件（--since / --until）はインデックスの二分探索で行そのものを
+    読まずに絞り込めるため、ここでは扱わない。
+    """
+
+    def __init__(self, types=(), tools=(), grep=None):
+        self.types = frozenset(types)
+        self.tools = frozenset(tools)
+        self.grep = grep
+        # type の条件（tools は type が tool_use であることも求める）
+        kinds = set(self.types) if self.types else None
+        if self.tools:
+            kinds = {"tool_use"} & kinds if kinds else {"tool_use"}
+        self._kinds = kinds
+        self._kind_needles = _needles(sorted(kinds or ()))
+        self._tool_needles = _needles(sorted(self.tools)) if self.tools else None
+        self._grep_needles = None if grep is None else _needles([grep], quoted=False)
+        # 渡された行数とデコードした行数
+        self.lines = 0
+        self.decoded = 0
+
+    def __bool__(self):
+        return bool(self.types or self.tools or self.grep is not None)
+
+    def decode(self, line):
+        """bytes の行が条件に一致すればデコードしたレコードを、しなければNoneを返す"""
+        self.lines += 1
+        if not self.prefilter(line):
+            return None
+        self.decoded += 1
+        try:
+            if self.grep is None:
+                # type と name だけで判定できるので、長い行は表示する分だけデコード
+                data = decode_line(line, TEXT_LIMIT, TOOL_INPUT_LIMIT)
+            else:
+                data = json.loads(line)
+        except ValueError:
+            return None
+        return data if self.match(data) else None
+
+    def prefilter(self, line):
+        """bytes の行が type / tool / grep の条件に一致する可能性があるか"""
+        if self._kinds is not None and not _contains_any(line, self._kind_needles):
+            return False
+        if self._tool_needles and not _contains_any(line, self._tool_needles):
+            return False
+        if self._grep_needles and not _contains_any(line, self._grep_needles):
+            return False
+        return True
+
+    def match(self, data):
+        """デコードしたレコードが type / tool / grep の条件に一致するか"""
+        if not isinstance(data, dict):
+            return False
+        kind = data.get("type")
+        if self._kinds is not None and not (
+            isinstance(kind, str) and kind in self._kinds
+        ):
+            return False
+        if self.tools:
+            name = data.get("name")
+            if not (isinstance(name, str) and name in self.tools):
+                return False
+        if self.grep is not None:
+            return any(self.grep in text for text in _strings(data))
+        return True
+
+    def may_match_kind(self, code):
+        """インデックスの type の番号のレコードが一致する可能性があるか"""
+        if self._kinds is None:
+            return True
+        name = KINDS[code & ~INHERITED_TIMESTAMP]
+        if name == "other":
+            return any(kind not in KINDS for kind in self._kinds)
+        return name in self._kinds
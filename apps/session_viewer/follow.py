@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""追記されていくセッションログの追跡（tail -f）
+
+Follower はファイルの読み込み位置を保ったまま、追記された分だけを読む。
+改行で終わっていない末尾の行は次の追記まで持ち越し、ログのローテーション
+（同じパスに別のファイルができる）や切り詰め（ファイルが短くなる）を
+検出したら新しい内容を先頭から読み直す。
+
+追記を待つ間は、Linux では inotify でディレクトリの変更通知を待ち、
+使えない環境では間隔を徐々に伸ばすポーリングにフォールバックする。
+"""
+
+# Standard library imports
+import ctypes
+import os
+import select
+import sys
+import time
+
+# 一度に読むバイト数
+READ_BLOCK = 1 << 16
+
+# ポーリングの間隔（秒）。変化がなければ最大値まで倍々に伸ばす
+POLL_MIN_INTERVAL = 0.01
+POLL_MAX_INTERVAL = 1.0
+
+# inotify の通知がなくても状態を確認する間隔（秒）
+INOTIFY_TIMEOUT = 1.0
+
+# <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+)
+
+
+class PollingWaiter:
+    """変化がないほど間隔を伸ばすポーリング"""
+
+    def __init__(self, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+
+    def wait(self):
+        """次の確認まで待つ"""
+        time.sleep(self.interval)
+        self.interval = min(self.interval * 2, self.max_interval)
+
+    def reset(self):
+        """新しいデータが届いたので間隔を最小に戻す"""
+        self.interval = self.min_interval
+
+    def close(self):
+        pass
+
+
+class InotifyWaiter:
+    """inotify でログのあるディレクトリの変更通知を待つ（Linuxのみ）
+
+    ローテーションで新しいファイルができた場合も通知されるよう、
+    ファイルではなくディレクトリを監視する。
+    """
+
+    def __init__(self, path, timeout=INOTIFY_TIMEOUT):
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 に失敗しました")
+        directory = os.path.dirname(os.path.abspath(path))
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, "inotify_add_watch に失敗しました")
+        self.fd = fd
+        self.timeout = timeout
+
+    def wait(self):
+        """変更通知が届くか timeout 秒たつまで待つ"""
+        readable, _, _ = select.select([self.fd], [], [], self.timeout)
+        if readable:
+            # 溜まっている通知を読み捨てる（中身は使わず、ファイルを確認し直す）
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def reset(self):
+        pass
+
+    def close(self):
+        """監視を終了"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def make_waiter(path):
+    """使える中で最も効率のよい待ち方を選ぶ"""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWaiter(path)
+        except (OSError, AttributeError):
+            # inotify が使えない（コンテナの制限、libc が見つからないなど）
+            pass
+    return PollingWaiter()
+
+
+def end_of_complete_lines(f):
+    """最後の改行の直後の位置（書き込み途中の末尾の行の先頭）"""
+    end = f.seek(0, os.SEEK_END)
+    position = end
+    while position > 0:
+        start = max(0, position - READ_BLOCK)
+        f.seek(start)
+        block = f.read(position - start)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+class Follower:
+    """ログに追記された行を読む
+
+    poll() はすぐに返り、follow() は追記を待ちながら行を返し続ける。
+    行は改行を含む bytes で、デコードは呼び出し側で行う。
+    """
+
+    def __init__(self, path, offset=None, waiter=None):
+        self.path = os.fspath(path)
+        self._f = open(self.path, "rb")
+        if offset is None:
+            offset = end_of_complete_lines(self._f)
+        self._f.seek(offset)
+        self.offset = offset
+        self._partial = b""
+        self._waiter = waiter
+        self.rotations = 0
+        self.truncations = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ファイルと監視を閉じる"""
+        self._f.close()
+        if self._waiter is not None:
+            self._waiter.close()
+
+    def poll(self):
+        """追記された完全な行（bytes、改行を含む）のリストを返す"""
+        lines = self._read_lines()
+        if self._check_truncated():
+            lines += self._read_lines()
+        elif self._check_rotated():
+            # 古いファイルの残りを読み切ってから新しいファイルに移る
+            lines += self._read_lines()
+            self._reopen()
+            lines += self._read_lines()
+        return lines
+
+    def _read_lines(self):
+        chunks = []
+        while True:
+            data = self._f.read(READ_BLOCK)
+            if not data:
+                break
+            chunks.append(data)
+            self.offset += len(data)
+        if not chunks:
+            return []
+        data = self._partial + b"".join(chunks)
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        return data[:end].splitlines(keepends=True)
+
+    def _check_truncated(self):
+        """同じファイルが読み込み位置より短くなっていたら先頭から読み直す"""
+        if os.fstat(self._f.fileno()).st_size >= self.offset:
+            return False
+        self._f.seek(0)
+        self.offset = 0
+        self._partial = b""
+        self.truncations += 1
+        return True
+
+    def _check_rotated(self):
+        """パスが別のファイルを指すようになったか"""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            # 削除されてまだ新しいファイルがない（できるまで古いファイルを読む）
+            return False
+        opened = os.fstat(self._f.fileno())
+        return (current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev)
+
+    def _reopen(self):
+        self._f.close()
+        self._f = open(self.path, "rb")
+        self.offset = 0
+        # 古いファイルの書き込み途中の行は完成しないので捨てる
+        self._partial = b""
+        self.rotations += 1
+
+    def follow(self, stop=None):
+        """追記を待ちながら、届いた行のリストを返し続ける（stop() が真なら終了）"""
+        if self._waiter is None:
+            self._waiter = make_waiter(self.path)
+        while stop is None or not stop():
+            lines = self.poll()
+            if lines:
+                self._waiter.reset()
+                yield lines
+            else:
+                self._waiter.wait()
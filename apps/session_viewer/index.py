@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""セッションログのバイトオフセットのインデックス
+
+ログの1行ごとに (バイトオフセット, タイムスタンプ, type) を固定長のレコードとして
+サイドカーファイル（既定では "<ログ>.idx"）に保存する。表示するときは
+インデックスから該当する行のオフセットを求めて seek するため、数GBのログでも
+末尾の数件や特定の時間帯だけを先頭から読まずに表示できる。
+
+ログは追記されていく前提で、update() は前回インデックスを作った位置から
+先だけを読む。ログが短くなった場合や先頭の行が変わった場合（ローテーション）は
+作り直す。末尾の改行で終わっていない行は書き込み途中とみなし、次回に回す。
+
+ファイル形式（リトルエンディアン）:
+
+    ヘッダー   HEADER  マジック, インデックス済みバイト数, レコード数,
+                       最後のタイムスタンプ, フラグ, 先頭行のハッシュ
+    レコード   RECORD  オフセット, タイムスタンプ（ミリ秒）, type の番号
+"""
+
+# Standard library imports
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+
+MAGIC = b"VSIDX\x00\x00\x01"
+HEADER = struct.Struct("<8sQQqB16s7x")
+RECORD = struct.Struct("<QqB")
+
+# type の番号（0 は解析できなかった行、OTHER は上記以外の type）
+KINDS = ("invalid", "user", "assistant", "tool_use", "summary", "other")
+KIND_CODES = {name: code for code, name in enumerate(KINDS)}
+OTHER = KIND_CODES["other"]
+
+# レコード自身にタイムスタンプがない（直前のレコードの値を引き継いだ）ことを示すビット
+INHERITED_TIMESTAMP = 0x80
+
+# タイムスタンプのあるレコードがまだない位置の値（どの時刻よりも前として扱う）
+NO_TIMESTAMP = -(1 << 63)
+
+# タイムスタンプが昇順でないレコードがあることを示すフラグ
+FLAG_UNSORTED = 0x01
+
+# 先頭行のハッシュに使う最大バイト数
+FINGERPRINT_BYTES = 4096
+
+# 一度に読み書きするレコード数
+RECORDS_PER_READ = 65536
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_timestamp(value):
+    """ISO 8601 の文字列をUNIX時間のミリ秒に変換（解析できなければNone）
+
+    タイムゾーンのない時刻はUTCとみなす。
+    """
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(milliseconds=1)
+
+
+def default_index_path(session_file):
+    """サイドカーファイルの既定のパス"""
+    return f"{os.fspath(session_file)}.idx"
+
+
+def first_line_hash(f):
+    """先頭行（最大 FINGERPRINT_BYTES バイト）のハッシュ"""
+    f.seek(0)
+    first = f.readline(FINGERPRINT_BYTES)
+    if not first.endswith(b"\n") and len(first) < FINGERPRINT_BYTES:
+        # 先頭行がまだ書き込み途中
+        first = b""
+    return hashlib.blake2b(first, digest_size=16).digest()
+
+
+def _describe(line):
+    """行の (タイムスタンプ（ミリ秒）またはNone, type の番号)"""
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None, KIND_CODES["invalid"]
+    if not isinstance(data, dict):
+        return None, KIND_CODES["invalid"]
+    kind = data.get("type")
+    code = KIND_CODES.get(kind, OTHER) if isinstance(kind, str) else 0
+    timestamp = data.get("timestamp")
+    return (parse_timestamp(timestamp) if timestamp else None), code
+
+
+class SessionIndex:
+    """セッションログ1つ分のインデックス
+
+    インデックスを読むときはヘッダーと必要なレコードだけを読む。
+    with 文で使うか、使い終わったら close() する。
+
+    fallback=True なら、インデックスファイルを開けないとき（ログのディレクトリが
+    読み取り専用など）は一時ファイルに作る。その場合 index_file は None になり、
+    毎回ログ全体を読むことになる。
+    """
+
+    def __init__(self, session_file, index_file=None, fallback=False):
+        self.session_file = os.fspath(session_file)
+        self.index_file = index_file or default_index_path(session_file)
+        self.fallback = fallback
+        self.indexed_bytes = 0
+        self.count = 0
+        self.last_timestamp = NO_TIMESTAMP
+        self.flags = 0
+        self.fingerprint = b""
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """インデックスファイルを閉じる"""
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def is_sorted(self):
+        """タイムスタンプが昇順に並んでいるか"""
+        return not self.flags & FLAG_UNSORTED
+
+    def _open(self):
+        if self._f is None:
+            try:
+                self._f = self._open_file()
+            except OSError:
+                if not self.fallback:
+                    raise
+                self._f = tempfile.TemporaryFile()
+                self.index_file = None
+        return self._f
+
+    def _open_file(self):
+        try:
+            return open(self.index_file, "r+b")
+        except FileNotFoundError:
+            return open(self.index_file, "w+b")
+
+    def _load_header(self):
+        """ヘッダーを読む（ないか壊れていれば空のインデックスとして扱う）"""
+        f = self._open()
+        f.seek(0)
+        data = f.read(HEADER.size)
+        if len(data) == HEADER.size:
+            magic, indexed, count, last, flags, fingerprint = HEADER.unpack(data)
+            if magic == MAGIC:
+                self.indexed_bytes = indexed
+                self.count = count
+                self.last_timestamp = last
+                self.flags = flags
+                self.fingerprint = fingerprint
+                return True
+        self._reset()
+        return False
+
+    def _reset(self):
+        self.indexed_bytes = 0
+        self.count = 0
+        self.last_timestamp = NO_TIMESTAMP
+        self.flags = 0
+        self.fingerprint = b""
+
+    def _write_header(self):
+        f = self._open()
+        f.seek(0)
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                self.indexed_bytes,
+                self.count,
+                self.last_timestamp,
+                self.flags,
+                self.fingerprint,
+            )
+        )
+
+    def update(self):
+        """前回の続きからログを読んでインデックスに追加し、追加した件数を返す"""
+        self._load_header()
+        with open(self.session_file, "rb") as log:
+            size = os.fstat(log.fileno()).st_size
+            fingerprint = first_line_hash(log)
+            if size < self.indexed_bytes or (
+                self.count and fingerprint != self.fingerprint
+            ):
+                # 短くなった・先頭が変わった（ローテーションされた）ので作り直す
+                self._reset()
+            self.fingerprint = fingerprint
+            added = self._append_from(log)
+
+        f = self._open()
+        # 書き込み途中で止まったレコードがあれば切り捨て、ヘッダーを最後に更新する
+        f.truncate(HEADER.size + self.count * RECORD.size)
+        self._write_header()
+        f.flush()
+        return added
+
+    def _append_from(self, log):
+        f = self._open()
+        f.seek(HEADER.size + self.count * RECORD.size)
+        log.seek(self.indexed_bytes)
+        offset = self.indexed_bytes
+        last = self.last_timestamp
+        unsorted = self.flags & FLAG_UNSORTED
+        pending = []
+        added = 0
+        for line in log:
+            if not line.endswith(b"\n"):
+                break
+            timestamp, code = _describe(line)
+            if timestamp is None:
+                code |= INHERITED_TIMESTAMP
+                timestamp = last
+            elif timestamp < last:
+                unsorted = FLAG_UNSORTED
+            last = timestamp
+            pending.append(RECORD.pack(offset, timestamp, code))
+            offset += len(line)
+            if len(pending) >= RECORDS_PER_READ:
+                f.write(b"".join(pending))
+                added += len(pending)
+                pending.clear()
+        f.write(b"".join(pending))
+        added += len(pending)
+
+        self.indexed_bytes = offset
+        self.count += added
+        self.last_timestamp = last
+        self.flags = (self.flags & ~FLAG_UNSORTED) | unsorted
+        return added
+
+    def records(self, start=0, stop=None):
+        """(オフセット, タイムスタンプ, type の番号) を start から stop まで返す
+
+        タイムスタンプは直前のレコードから引き継いだ値も含む。自身に
+        タイムスタンプがあったかは type の番号の INHERITED_TIMESTAMP ビットでわかる。
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        f = self._open()
+        while start < stop:
+            n = min(stop - start, RECORDS_PER_READ)
+            f.seek(HEADER.size + start * RECORD.size)
+            yield from RECORD.iter_unpack(f.read(n * RECORD.size))
+            start += n
+
+    def record(self, position):
+        """position 番目（0から）のレコード"""
+        if not 0 <= position < self.count:
+            raise IndexError("インデックスの範囲外です")
+        f = self._open()
+        f.seek(HEADER.size + position * RECORD.size)
+        return RECORD.unpack(f.read(RECORD.size))
+
+    def _bisect(self, timestamp):
+        """タイムスタンプが timestamp 以上になる最初の位置（昇順のときだけ使える）"""
+        return bisect_left(_TimestampView(self), timestamp)
+
+    def select(self, since=None, until=None):
+        """タイムスタンプが since 以上 until 未満のレコードの位置を返す
+
+        昇順のインデックスなら二分探索で範囲を求め、そうでなければ
+        インデックスのレコードを順に調べる（ログ自体は読まない）。
+        """
+        if since is None and until is None:
+            return range(self.count)
+        if self.is_sorted:
+            start = 0 if since is None else self._bisect(since)
+            stop = self.count if until is None else self._bisect(until)
+            return range(start, max(start, stop))
+        return [
+            position
+            for position, (_, timestamp, _) in enumerate(self.records())
+            if (since is None or timestamp >= since)
+            and (until is None or timestamp < until)
+        ]
+
+    def offsets(self, positions):
+        """レコードの位置をログのバイトオフセットに変換"""
+        if isinstance(positions, range) and positions.step == 1:
+            return [r[0] for r in self.records(positions.start, positions.stop)]
+        return [self.record(position)[0] for position in positions]
+
+
+class _TimestampView:
+    """bisect 用に、インデックスのタイムスタンプを列のように見せる"""
+
+    def __init__(self, index):
+        self._index = index
+
+    def __len__(self):
+        return self._index.count
+
+    def __getitem__(self, position):
+        return self._index.record(position)[1]
+
+
+def open_index(session_file, index_file=None, fallback=False):
+    """インデックスを開き、前回からログに追記された分を反映する"""
+    index = SessionIndex(session_file, index_file, fallback)
+    index.update()
+    return index
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""セッションログのターンの所要時間の統計
+
+各ログを先頭から1回だけ読み、レコードのタイムスタンプから次の時間（秒）を
+QuantileSketch に加える。
+
+    response   ユーザーのメッセージから最初のアシスタントの返答まで
+    tool       tool_use から次のレコードまで（ツール名ごとにも数える）
+    gap        ユーザーのメッセージの直前のレコードからそのメッセージまで
+               （ターンの間の待ち時間）
+
+タイムスタンプのないレコードや不正な行は読み飛ばし、時刻が前に戻った区間は
+数えずに out_of_order として数える。スケッチは足し合わせられるため、
+aggregate と同じくシャードごとに並列に集計でき、to_dict() で保存した
+前回までの結果とも合わせられる。
+"""
+
+# Standard library imports
+from functools import partial
+
+from .aggregate import merge_shards
+from .index import parse_timestamp
+from .partial import decode_line
+from .sketch import DEFAULT_ACCURACY, QuantileSketch
+from .source import open_lines
+
+# 表示する分位点
+PERCENTILES = (0.5, 0.9, 0.99)
+
+# 集計する時間の名前と表示名
+METRICS = (
+    ("response", "User -> assistant"),
+    ("tool", "Tool use"),
+    ("gap", "Turn gap"),
+)
+
+# 保存形式のバージョン
+FORMAT_VERSION = 1
+
+
+class LatencyStats:
+    """ターンの所要時間の集計結果（merge() で足し合わせられる）"""
+
+    def __init__(self, relative_accuracy=DEFAULT_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.files = 0
+        self.records = 0
+        self.out_of_order = 0
+        self.unreadable_files = 0
+        self.sketches = {name: QuantileSketch(relative_accuracy) for name, _ in METRICS}
+        # ツール名 → tool_use の所要時間のスケッチ
+        self.tools = {}
+
+    def add_tool(self, name, seconds):
+        """tool_use の所要時間を加える"""
+        self.sketches["tool"].add(seconds)
+        sketch = self.tools.get(name)
+        if sketch is None:
+            sketch = self.tools[name] = QuantileSketch(self.relative_accuracy)
+        sketch.add(seconds)
+
+    def merge(self, other):
+        """他の集計結果を足し合わせる"""
+        self.files += other.files
+        self.records += other.records
+        self.out_of_order += other.out_of_order
+        self.unreadable_files += other.unreadable_files
+        for name, sketch in other.sketches.items():
+            self.sketches[name].merge(sketch)
+        for name, sketch in other.tools.items():
+            if name in self.tools:
+                self.tools[name].merge(sketch)
+            else:
+                self.tools[name] = QuantileSketch(self.relative_accuracy).merge(sketch)
+        return self
+
+    def to_dict(self):
+        """保存用のJSONにできる形式（from_dict() で読み込める）"""
+        return {
+            "version": FORMAT_VERSION,
+            "relative_accuracy": self.relative_accuracy,
+            "files": self.files,
+            "records": self.records,
+            "out_of_order": self.out_of_order,
+            "unreadable_files": self.unreadable_files,
+            "sketches": {
+                name: sketch.to_dict() for name, sketch in self.sketches.items()
+            },
+            "tools": {name: sketch.to_dict() for name, sketch in self.tools.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict() の形式から作る"""
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError("統計の保存形式のバージョンが違います")
+        stats = cls(data["relative_accuracy"])
+        stats.files = data["files"]
+        stats.records = data["records"]
+        stats.out_of_order = data["out_of_order"]
+        stats.unreadable_files = data["unreadable_files"]
+        for name, sketch in data["sketches"].items():
+            stats.sketches[name] = QuantileSketch.from_dict(sketch)
+        for name, sketch in data["tools"].items():
+            stats.tools[name] = QuantileSketch.from_dict(sketch)
+        return stats
+
+    def summary(self):
+        """分位点などの要約（表示用、JSONにできる形式）"""
+
+        def describe(sketch):
+            result = {"count": sketch.count, "mean": sketch.mean}
+            for q in PERCENTILES:
+                result[f"p{q * 100:g}"] = sketch.quantile(q)
+            result["max"] = sketch.max if sketch.count else None
+            return result
+
+        return {
+            "files": self.files,
+            "records": self.records,
+            "out_of_order": self.out_of_order,
+            "unreadable_files": self.unreadable_files,
+            "metrics": {name: describe(self.sketches[name]) for name, _ in METRICS},
+            "tools": {
+                name: describe(sketch) for name, sketch in sorted(self.tools.items())
+            },
+        }
+
+
+class _TurnTimer:
+    """1ファイル分のレコードを順に受け取り、所要時間を stats に加える"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        # 返答を待っているユーザーのメッセージ、実行中の tool_use とその名前、
+        # 直前のレコードの時刻（ミリ秒）
+        self.pending_user = self.pending_tool = self.tool_name = self.last = None
+
+    def add(self, data, timestamp):
+        """タイムスタンプ（ミリ秒）のあるレコードを加える"""
+        stats = self.stats
+        stats.records += 1
+        if self.last is not None and timestamp < self.last:
+            # 時刻が前に戻ったので、待っている区間を捨てる
+            stats.out_of_order += 1
+            self.pending_user = self.pending_tool = None
+        kind = data.get("type")
+        if self.pending_tool is not None:
+            stats.add_tool(self.tool_name, (timestamp - self.pending_tool) / 1000)
+            self.pending_tool = None
+        if kind == "user":
+            self._user(timestamp)
+        elif kind == "assistant" and self.pending_user is not None:
+            stats.sketches["response"].add((timestamp - self.pending_user) / 1000)
+            self.pending_user = None
+        elif kind == "tool_use":
+            self.pending_tool = timestamp
+            self.tool_name = str(data.get("name", "Unknown"))
+        self.last = timestamp
+
+    def _user(self, timestamp):
+        if self.last is not None and timestamp >= self.last:
+            self.stats.sketches["gap"].add((timestamp - self.last) / 1000)
+        if self.pending_user is None:
+            self.pending_user = timestamp
+
+
+def _timestamped(line):
+    """行の (レコード, タイムスタンプ（ミリ秒）)（時刻がなければ (None, None)）"""
+    try:
+        # 種類と時刻しか使わないので、長い行は本文をほぼ読まない
+        data = decode_line(line, 0, 0)
+    except ValueError:
+        return None, None
+    if not isinstance(data, dict) or not data.get("timestamp"):
+        return None, None
+    return data, parse_timestamp(data["timestamp"])
+
+
+def analyze_file(path, stats):
+    """1ファイル分の所要時間を stats に加える
+
+    途中で読めなくなったファイルは読めなかったファイルとしてだけ数え、
+    そこまでの集計は加えない。
+    """
+    local = LatencyStats(stats.relative_accuracy)
+    timer = _TurnTimer(local)
+    try:
+        with open_lines(path) as lines:
+            for line in lines:
+                data, timestamp = _timestamped(line)
+                if timestamp is not None:
+                    timer.add(data, timestamp)
+    except OSError:
+        stats.unreadable_files += 1
+        return stats
+    local.files = 1
+    return stats.merge(local)
+
+
+def analyze_files(paths, relative_accuracy=DEFAULT_ACCURACY):
+    """複数ファイルを集計（プロセスプールのワーカーからも呼ばれる）"""
+    stats = LatencyStats(relative_accuracy)
+    for path in paths:
+        analyze_file(path, stats)
+    return stats
+
+
+def analyze(paths, workers=1, stats=None, on_progress=None):
+    """paths を集計して stats（省略時は新しい LatencyStats）に加えて返す"""
+    if stats is None:
+        stats = LatencyStats()
+    work = partial(analyze_files, relative_accuracy=stats.relative_accuracy)
+    return merge_shards(paths, work, stats, workers, on_progress)
+
+
+def _seconds(value):
+    return "-" if value is None else f"{value:.3f}"
+
+
+def format_report(stats):
+    """集計結果の表示用の文字列"""
+    summary = stats.summary()
+    columns = ["count", "mean"] + [f"p{q * 100:g}" for q in PERCENTILES] + ["max"]
+    header = f"  {'(seconds)':<24}" + "".join(f" {c:>10}" for c in columns)
+
+    def row(label, values):
+        cells = [f" {values['count']:>10}"]
+        cells += [f" {_seconds(values[c]):>10}" for c in columns[1:]]
+        return f"  {label:<24}" + "".join(cells)
+
+    lines = [
+        f"Sessions: {stats.files}  Records: {stats.records}  "
+        f"Out of order: {stats.out_of_order}  "
+        f"Unreadable files: {stats.unreadable_files}",
+        "",
+        header,
+    ]
+    lines += [row(label, summary["metrics"][name]) for name, label in METRICS]
+    if summary["tools"]:
+        lines += ["", "Tool use by name:", header]
+        lines += [row(name, values) for name, values in summary["tools"].items()]
+    return "\n".join(lines)
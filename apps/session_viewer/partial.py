@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""巨大な行の部分的なデコード
+
+print_record() が表示するのは、アシスタントの本文の先頭 TEXT_LIMIT 文字と、
+ツール入力を json.dumps した先頭 TOOL_INPUT_LIMIT 文字だけである。
+decode_line() は PARTIAL_DECODE_CHARS 文字以上の行について、表示する値への
+経路（message → content → text、input）だけを自前でたどり、本文は表示する
+長さだけをデコードし、ツール入力は json.dumps した結果の先頭だけを作る。
+content の本文以外のブロックやツール入力のうち表示しない値、表示する長さを
+超えた文字列の残りは、デコードせずに正規表現で閉じる " まで検査して読み飛ばす
+ため、これらの値がどれだけ大きくても、解析に使うメモリは表示する長さ程度で済む。
+
+ただし行そのものは丸ごと読み、str にデコードしてから解析する（絞り込みの
+有無によらない）。そのため読んだ bytes とデコードした str の分だけは、
+行の長さに比例したメモリを使う。
+
+読み飛ばす値も含めて行全体を json と同じ規則で検査し、不正な行や想定外の形
+（最上位がオブジェクトでない、type が message / input より後ろにある、など）
+では json.loads にフォールバックするため、表示される内容やエラーは行全体を
+デコードした場合と同じになる。
+"""
+
+# Standard library imports
+import json
+import re
+from json.decoder import scanstring
+
+# これ以上の長さ（文字数）の行を部分的にデコードする
+PARTIAL_DECODE_CHARS = 1 << 16
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# 文字列の " の後から、閉じる " の手前まで（エスケープは1つずつ区切る）
+_STRING = re.compile(
+    r'[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*'
+)
+_STRING_BLOCK = 1 << 12
+
+
+class JSONPrefix(str):
+    """json.dumps(ensure_ascii=False) した結果の先頭部分"""
+
+
+class _Fallback(Exception):
+    """部分的なデコードをあきらめて json.loads に任せる"""
+
+
+def _ws(s, pos):
+    return _WHITESPACE.match(s, pos).end()
+
+
+def _value(s, pos):
+    """pos から始まる値をデコードして (値, 終了位置) を返す"""
+    return _DECODER.raw_decode(s, pos)
+
+
+def _string_end(s, pos):
+    """pos の " から始まる文字列をデコードせずに検査し、終了位置を返す"""
+    pos += 1
+    while True:
+        # 一度に長く照合すると、re がエスケープごとの状態を溜めてしまう
+        end = _STRING.match(s, pos, pos + _STRING_BLOCK).end()
+        if end == pos:
+            break
+        pos = end
+    if s[pos] != '"':
+        # 制御文字か不正なエスケープ
+        raise _Fallback
+    return pos + 1
+
+
+def _string_prefix(s, pos, length):
+    """pos の " から始まる文字列の先頭 length 文字と終了位置を返す
+
+    文字列全体は検査するだけでデコードしない。
+    """
+    end = _string_end(s, pos)
+    # 1文字はエスケープでも最大12文字（サロゲートペア）。エスケープの途中で
+    # 切らないよう stop の手前の区切りまでをデコードしても length + 1 文字以上
+    # あるので、先頭 length 文字は正しい（最後の1文字はペアの片方かもしれない）
+    stop = pos + 1 + 12 * (length + 2)
+    if stop >= end - 1:
+        return scanstring(s, pos + 1)[0][:length], end
+    cut = _STRING.match(s, pos + 1, stop).end()
+    return scanstring(s[pos + 1 : cut] + '"', 0)[0][:length], end
+
+
+def _skip(s, pos):
+    """pos から始まる値を検査し、終了位置を返す（文字列はデコードしない）"""
+    if s[pos] == '"':
+        return _string_end(s, pos)
+    if s[pos] == "{":
+        return _object(s, pos, lambda members, key, pos: (None, _skip(s, pos)))[1]
+    if s[pos] == "[":
+        return _array(s, pos, lambda pos: (None, _skip(s, pos)))[1]
+    return _value(s, pos)[1]
+
+
+def _object(s, pos, member):
+    """pos の { から始まるオブジェクトを読み、(dict, 終了位置) を返す
+
+    各メンバーの値は member(途中までの dict, キー, 値の開始位置) で読む。
+    キーが重複した場合は json.loads と同じく後の値を使う。
+    """
+    result = {}
+    pos = _ws(s, pos + 1)
+    if s[pos] == "}":
+        return result, pos + 1
+    while True:
+        if s[pos] != '"':
+            raise _Fallback
+        key, pos = scanstring(s, pos + 1)
+        pos = _ws(s, pos)
+        if s[pos] != ":":
+            raise _Fallback
+        result[key], pos = member(result, key, _ws(s, pos + 1))
+        pos = _ws(s, pos)
+        if s[pos] == "}":
+            return result, pos + 1
+        if s[pos] != ",":
+            raise _Fallback
+        pos = _ws(s, pos + 1)
+
+
+def _array(s, pos, item):
+    """pos の [ から始まる配列を読み、(list, 終了位置) を返す
+
+    各要素は item(要素の開始位置) で読む。
+    """
+    result = []
+    pos = _ws(s, pos + 1)
+    if s[pos] == "]":
+        return result, pos + 1
+    while True:
+        value, pos = item(pos)
+        result.append(value)
+        pos = _ws(s, pos)
+        if s[pos] == "]":
+            return result, pos + 1
+        if s[pos] != ",":
+            raise _Fallback
+        pos = _ws(s, pos + 1)
+
+
+def _text(s, pos, limit):
+    """文字列なら先頭 limit + 1 文字（切り詰めたかがわかる長さ）だけデコードする"""
+    if s[pos] == '"':
+        return _string_prefix(s, pos, limit + 1)
+    return _value(s, pos)
+
+
+def _assistant_content(s, pos, limit):
+    """アシスタントの content（本文は表示する長さだけ残す）"""
+    if s[pos] == '"':
+        return _text(s, pos, limit)
+    if s[pos] != "[":
+        return _value(s, pos)
+
+    def field(fields, key, pos):
+        if key == "type":
+            return _value(s, pos)
+        if key == "text":
+            if s[pos] != '"':
+                raise _Fallback
+            return _text(s, pos, limit)
+        return None, _skip(s, pos)
+
+    def block(pos):
+        # 表示に使う type と本文の先頭だけを残す
+        if s[pos] != "{":
+            return None, _skip(s, pos)
+        fields, end = _object(s, pos, field)
+        if fields.get("type") != "text":
+            return {"type": fields.get("type")}, end
+        return {"type": "text", "text": fields.get("text", "")}, end
+
+    return _array(s, pos, block)
+
+
+def _assistant_message(s, pos, limit):
+    """アシスタントの message（content 以外はそのままデコード）"""
+    if s[pos] != "{":
+        return _value(s, pos)
+
+    def member(message, key, pos):
+        if key == "content":
+            return _assistant_content(s, pos, limit)
+        return _value(s, pos)
+
+    return _object(s, pos, member)
+
+
+def _dump(s, pos, limit):
+    """pos から始まる値を json.dumps した結果の、正しい先頭 limit 文字を含む文字列
+
+    limit 文字より後ろは正しいとは限らない。
+    """
+    if s[pos] == "{":
+        return _dump_object(s, pos, limit)
+    if s[pos] == "[":
+        return _dump_array(s, pos, limit)
+    if s[pos] == '"':
+        value, end = _string_prefix(s, pos, limit)
+    else:
+        value, end = _value(s, pos)
+    return json.dumps(value, ensure_ascii=False), end
+
+
+def _join(opening, closing, parts, limit):
+    """parts をつないだ先頭 limit 文字を含む文字列
+
+    parts の None は先頭 limit 文字に入らないとして読み飛ばした要素。
+    """
+    text = opening
+    for i, part in enumerate(parts):
+        separator = ", " if i else ""
+        if len(text) + len(separator) >= limit:
+            return text + separator
+        if part is None:
+            # 重複したキーの値が短くなり、読み飛ばした要素が先頭に入った
+            raise _Fallback
+        text += separator + part
+    return text + closing
+
+
+def _dump_object(s, pos, limit):
+    # 次のメンバーのキーが始まる位置
+    start = 1
+
+    def member(members, key, pos):
+        nonlocal start
+        if key not in members and start >= limit:
+            return None, _skip(s, pos)
+        text, end = _dump(s, pos, limit)
+        if key not in members:
+            start += len(json.dumps(key, ensure_ascii=False)) + len(text) + 4
+        return text, end
+
+    members, end = _object(s, pos, member)
+    parts = [
+        None if text is None else f"{json.dumps(key, ensure_ascii=False)}: {text}"
+        for key, text in members.items()
+    ]
+    return _join("{", "}", parts, limit), end
+
+
+def _dump_array(s, pos, limit):
+    # 次の要素が始まる位置
+    start = 1
+
+    def item(pos):
+        nonlocal start
+        if start >= limit:
+            return None, _skip(s, pos)
+        text, end = _dump(s, pos, limit)
+        start += len(text) + 2
+        return text, end
+
+    items, end = _array(s, pos, item)
+    return _join("[", "]", items, limit), end
+
+
+def _tool_input(s, pos, limit):
+    text, end = _dump(s, pos, limit)
+    return JSONPrefix(text[:limit]), end
+
+
+def _decode_record(s, text_limit, input_limit):
+    pos = _ws(s, 0)
+    if s[pos] != "{":
+        raise _Fallback
+    # 部分的にデコードしたキーと、そのときの type
+    partial = {}
+
+    def member(record, key, pos):
+        kind = record.get("type")
+        if key == "message" and kind == "assistant":
+            partial[key] = kind
+            return _assistant_message(s, pos, text_limit)
+        if key == "input" and kind == "tool_use":
+            partial[key] = kind
+            return _tool_input(s, pos, input_limit)
+        partial.pop(key, None)
+        return _value(s, pos)
+
+    record, end = _object(s, pos, member)
+    if _ws(s, end) != len(s):
+        raise _Fallback
+    if any(record.get("type") != kind for kind in partial.values()):
+        # 後から type が変わった
+        raise _Fallback
+    return record
+
+
+def decode_line(line, text_limit, input_limit):
+    """1行をデコード（長い行は表示に必要な分だけ）
+
+    短い行や部分的にデコードできない行は json.loads の結果をそのまま返す
+    （不正な行では json.loads と同じ例外を送出する）。
+    """
+    if len(line) < PARTIAL_DECODE_CHARS:
+        return json.loads(line)
+    try:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        return _decode_record(line, text_limit, input_limit)
+    except (_Fallback, ValueError, IndexError, RecursionError):
+        pass
+    return json.loads(line)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""足し合わせられる分位点スケッチ
+
+QuantileSketch は DDSketch と同じく、値を対数スケールのバケツに数えるだけで
+分位点を求める。どの分位点も相対誤差 relative_accuracy 以内で、使うメモリは
+バケツ数（最大 max_buckets）だけで値の個数によらない。バケツの数を足し合わせる
+だけで2つのスケッチを合わせられるため、ファイルごと・プロセスごと・実行ごとに
+作ったスケッチを後から1つにまとめられる（to_dict() / from_dict() で保存できる）。
+
+t-digest と違い、結果は値を加える順序や合わせ方によらない。
+"""
+
+# Standard library imports
+import math
+
+# 既定の相対誤差
+DEFAULT_ACCURACY = 0.01
+
+# 既定の最大バケツ数（超えたら小さい値のバケツからまとめる）
+DEFAULT_MAX_BUCKETS = 2048
+
+# これより小さい値は0として数える
+MIN_VALUE = 1e-9
+
+
+class QuantileSketch:
+    """0以上の値の分位点を相対誤差 relative_accuracy 以内で求めるスケッチ"""
+
+    def __init__(
+        self, relative_accuracy=DEFAULT_ACCURACY, max_buckets=DEFAULT_MAX_BUCKETS
+    ):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy は0より大きく1より小さい値です")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        # バケツの番号 i → 数（(gamma^(i-1), gamma^i] の値を数える）
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value, count=1):
+        """値を count 回加える"""
+        if value < 0 or math.isnan(value):
+            raise ValueError(f"負の値やNaNは加えられません: {value}")
+        if value < MIN_VALUE:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            buckets = self.buckets
+            if key in buckets:
+                buckets[key] += count
+            else:
+                buckets[key] = count
+                if len(buckets) > self.max_buckets:
+                    self._collapse()
+        self.count += count
+        self.sum += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _collapse(self):
+        """バケツが多すぎるので、小さい値のバケツを1つにまとめる"""
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.max_buckets
+        merged = sum(self.buckets.pop(key) for key in keys[:excess])
+        self.buckets[keys[excess]] += merged
+
+    def merge(self, other):
+        """他のスケッチを足し合わせる（相対誤差が同じものに限る）"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("相対誤差の異なるスケッチは足し合わせられません")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """q 分位点（0 <= q <= 1、値がなければNone）"""
+        if not 0 <= q <= 1:
+            raise ValueError("q は0以上1以下です")
+        if not self.count:
+            return None
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return max(self.min, 0.0)
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # バケツの範囲のうち、相対誤差が最小になる値
+                value = 2 * self._gamma**key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        """平均値（値がなければNone）"""
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self):
+        """JSONにできる形式"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "buckets": {str(key): count for key, count in sorted(self.buckets.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict() の形式から作る"""
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.buckets = {int(key): count for key, count in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
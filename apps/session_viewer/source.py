@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""セッションログの読み込み
+
+gzip / bz2 / xz（lzma）で圧縮されたログは先頭のマジックバイトで判別し、
+READ_BLOCK バイトずつ展開しながら行に分ける。圧縮されていないログは mmap で
+読む。どちらも行は bytes のまま返し、テキストへのデコードは表示する行だけで
+行う（text_lines() は open(..., "r", encoding="utf-8") で読んだ場合と同じ行に
+変換する）。
+
+圧縮されたログは先頭から展開しないと途中の位置に移れないため、インデックスや
+追跡（--follow）、データベースへの取り込みには使えない。
+"""
+
+# Standard library imports
+import io
+import mmap
+from contextlib import contextmanager
+
+# 圧縮形式を判別するマジックバイト
+MAGIC = ((b"\x1f\x8b", "gzip"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "xz"))
+
+# 圧縮されたログを一度に展開するバイト数
+READ_BLOCK = 1 << 20
+
+
+class CorruptLogError(OSError):
+    """圧縮されたログを展開できない（壊れている・途中で切れている）"""
+
+
+def detect_compression(path):
+    """圧縮形式（"gzip" / "bz2" / "xz"、圧縮されていなければNone）"""
+    with open(path, "rb") as f:
+        head = f.read(max(len(magic) for magic, _ in MAGIC))
+    for magic, name in MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_compressed(path, compression):
+    """圧縮されたログを展開しながら読むバイナリファイルとして開く
+
+    (ファイル, 展開に失敗したときに送出される例外のタプル) を返す。
+    """
+    # 使う形式のモジュールだけを読み込む（bz2 / lzma のないビルドもある）
+    if compression == "gzip":
+        # Standard library imports
+        import gzip
+        import zlib
+
+        return gzip.open(path, "rb"), (OSError, EOFError, zlib.error)
+    if compression == "bz2":
+        # Standard library imports
+        import bz2
+
+        return bz2.open(path, "rb"), (OSError, EOFError)
+    if compression == "xz":
+        # Standard library imports
+        import lzma
+
+        return lzma.open(path, "rb"), (OSError, EOFError, lzma.LZMAError)
+    raise ValueError(f"未対応の圧縮形式です: {compression}")
+
+
+def _block_lines(f):
+    """READ_BLOCK バイトずつ読み、改行で分けた行を返す"""
+    # 改行までの断片（長い行を連結し直さないよう、改行が来てから1回だけ連結する）
+    pieces = []
+    while True:
+        block = f.read(READ_BLOCK)
+        if not block:
+            break
+        end = block.rfind(b"\n") + 1
+        if not end:
+            pieces.append(block)
+            continue
+        pieces.append(block[:end])
+        yield from io.BytesIO(b"".join(pieces))
+        pieces = [block[end:]] if end < len(block) else []
+    if pieces:
+        yield b"".join(pieces)
+
+
+def _checked(lines, path, compression, errors):
+    """展開に失敗したら CorruptLogError にする"""
+    try:
+        yield from lines
+    except errors as e:
+        raise CorruptLogError(f"{path}: 展開できません（{compression}）: {e}") from e
+
+
+@contextmanager
+def open_lines(path):
+    """ログの行（bytes、改行を含む）を先頭から返すイテレータを開く
+
+    with 文で使う。圧縮されていれば展開しながら読む。
+    """
+    compression = detect_compression(path)
+    if compression is not None:
+        f, errors = open_compressed(path, compression)
+        with f:
+            yield _checked(_block_lines(f), path, compression, errors)
+        return
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # 空のファイルや mmap できないファイル（パイプなど）
+            yield f
+            return
+        with mapped:
+            # 1行ずつの分割は C 実装の readline に任せる
+            yield iter(mapped.readline, b"")
+
+
+def text_lines(lines):
+    """bytes の行を、UTF-8 のテキストモード（改行の変換あり）で読んだ場合と同じ
+    文字列の行に変換する（不正な UTF-8 では UnicodeDecodeError を送出する）"""
+    for line in lines:
+        text = line.decode("utf-8")
+        if "\r" not in text:
+            yield text
+            continue
+        # テキストモードでは \r\n と \r も行の区切りで、\n に変換される
+        parts = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        for part in parts[:-1]:
+            yield part + "\n"
+        if parts[-1]:
+            yield parts[-1]
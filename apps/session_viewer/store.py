@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""セッションログの SQLite データベース
+
+ingest_file() はセッションログの1行ごとに (ファイル, バイトオフセット,
+タイムスタンプ, type, ツール名, 本文の先頭) を SQLite のデータベースに保存する。
+ファイルごとに取り込み済みのバイト数を覚えておき、2回目以降は追記された分
+だけを読む。続きから読む前に先頭の行と最後に取り込んだ行のハッシュを確かめ、
+ログが短くなった場合や、ローテーション・書き換えでどちらかが変わった場合は
+そのファイルを取り込み直す。行は INGEST_BATCH 件ごとに1つのトランザクションで
+追加し、取り込み済みのバイト数も同じトランザクションで更新するため、途中で
+止まっても次回は続きから取り込める。
+
+select() は type・ツール名・時刻の条件をデータベースのインデックスで絞り込み、
+該当する行のログ上のオフセットを返す。表示はログの該当行を読んで行うため、
+ログを直接表示した場合と同じ内容になる。
+
+タイムスタンプは SessionIndex と同じくUNIX時間のミリ秒で、タイムスタンプの
+ないレコードは直前のレコードの値を引き継ぐ。
+"""
+
+# Standard library imports
+import hashlib
+import json
+import os
+import sqlite3
+from itertools import groupby
+
+from .index import first_line_hash, parse_timestamp
+from .partial import decode_line
+from .source import detect_compression
+
+# 保存する本文の最大文字数
+STORED_TEXT_CHARS = 1000
+
+# 1トランザクションで追加する行数
+INGEST_BATCH = 10000
+
+# 最後に取り込んだ行のうち、ハッシュで確かめる末尾のバイト数
+TAIL_BYTES = 4096
+
+# 既定のデータベースのパス
+DEFAULT_DB = "sessions.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    ingested_bytes INTEGER NOT NULL DEFAULT 0,
+    last_timestamp INTEGER,
+    fingerprint BLOB,
+    tail_hash BLOB
+);
+CREATE TABLE IF NOT EXISTS records (
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    byte_offset INTEGER NOT NULL,
+    timestamp INTEGER,
+    type TEXT,
+    tool TEXT,
+    text TEXT,
+    PRIMARY KEY (file_id, byte_offset)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_timestamp ON records (timestamp);
+CREATE INDEX IF NOT EXISTS records_type ON records (type, timestamp);
+CREATE INDEX IF NOT EXISTS records_tool ON records (tool, timestamp);
+"""
+
+
+def _text(data):
+    """表示される本文（ツールは入力のJSON）の先頭 STORED_TEXT_CHARS 文字"""
+    kind = data.get("type")
+    if kind == "tool_use":
+        value = data.get("input", {})
+    elif kind == "summary":
+        value = data.get("summary", "")
+    else:
+        message = data.get("message")
+        value = message.get("content", "") if isinstance(message, dict) else ""
+        if isinstance(value, list):
+            value = "\n".join(
+                item["text"]
+                for item in value
+                if isinstance(item, dict)
+                and item.get("type") == "text"
+                and isinstance(item.get("text"), str)
+            )
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False)
+    return value[:STORED_TEXT_CHARS]
+
+
+def _describe(line):
+    """行の (タイムスタンプ（ミリ秒）またはNone, type, ツール名, 本文)"""
+    try:
+        data = decode_line(line, STORED_TEXT_CHARS, STORED_TEXT_CHARS)
+    except ValueError:
+        return None, None, None, None
+    if not isinstance(data, dict):
+        return None, None, None, None
+    kind = data.get("type")
+    if not isinstance(kind, str):
+        kind = None
+    tool = data.get("name") if kind == "tool_use" else None
+    if not isinstance(tool, str):
+        tool = None
+    timestamp = data.get("timestamp")
+    return (parse_timestamp(timestamp) if timestamp else None), kind, tool, _text(data)
+
+
+def _tail_hash(tail):
+    return hashlib.blake2b(tail, digest_size=16).digest()
+
+
+class SessionStore:
+    """セッションログのデータベース
+
+    with 文で使うか、使い終わったら close() する。
+    """
+
+    def __init__(self, db_file=DEFAULT_DB):
+        self.db_file = os.fspath(db_file)
+        self._db = sqlite3.connect(self.db_file)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(files)")]
+        if "tail_hash" not in columns:
+            # tail_hash がない版で作ったデータベース（次の取り込みで作り直す）
+            self._db.execute("ALTER TABLE files ADD COLUMN tail_hash BLOB")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """データベースを閉じる"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def _file_state(self, path):
+        return self._db.execute(
+            "SELECT id, ingested_bytes, last_timestamp, fingerprint, tail_hash"
+            " FROM files WHERE path = ?",
+            (path,),
+        ).fetchone()
+
+    def _is_appended(self, log, state):
+        """ログが取り込んだときから追記されただけか
+
+        大きさと先頭の行に加えて、最後に取り込んだ行（末尾の TAIL_BYTES バイト）が
+        取り込んだときと同じかを確かめる。
+        """
+        file_id, offset, _, fingerprint, tail_hash = state
+        if not offset:
+            return True
+        if os.fstat(log.fileno()).st_size < offset:
+            return False
+        if first_line_hash(log) != fingerprint:
+            return False
+        # 最後に取り込んだ行はオフセットが最大のレコード
+        (start,) = self._db.execute(
+            "SELECT MAX(byte_offset) FROM records WHERE file_id = ?", (file_id,)
+        ).fetchone()
+        if start is None:
+            return False
+        start = max(start, offset - TAIL_BYTES)
+        log.seek(start)
+        return _tail_hash(log.read(offset - start)) == tail_hash
+
+    def ingest_file(self, session_file):
+        """前回の続きからログを読んでデータベースに追加し、追加した行数を返す"""
+        path = os.path.abspath(session_file)
+        if detect_compression(path) is not None:
+            raise ValueError("圧縮されたログは取り込めません")
+        with open(path, "rb") as log:
+            fingerprint = first_line_hash(log)
+            with self._db:
+                state = self._file_state(path)
+                if state is None:
+                    file_id = self._db.execute(
+                        "INSERT INTO files (path) VALUES (?)", (path,)
+                    ).lastrowid
+                    offset, last = 0, None
+                else:
+                    file_id, offset, last, _, _ = state
+                    if not self._is_appended(log, state):
+                        # 短くなった・先頭か最後に取り込んだ行が変わった
+                        # （ローテーション・書き換えされた）ので取り込み直す
+                        self._db.execute(
+                            "DELETE FROM records WHERE file_id = ?", (file_id,)
+                        )
+                        offset, last = 0, None
+                self._db.execute(
+                    "UPDATE files SET ingested_bytes = ?, last_timestamp = ?,"
+                    " fingerprint = ? WHERE id = ?",
+                    (offset, last, fingerprint, file_id),
+                )
+            return self._append_from(log, file_id, offset, last)
+
+    def _append_from(self, log, file_id, offset, last):
+        log.seek(offset)
+        pending = []
+        added = 0
+        for line in log:
+            if not line.endswith(b"\n"):
+                # 書き込み途中の行は次回に回す
+                break
+            timestamp, kind, tool, text = _describe(line)
+            if timestamp is None:
+                timestamp = last
+            last = timestamp
+            pending.append((file_id, offset, timestamp, kind, tool, text))
+            offset += len(line)
+            complete = line
+            if len(pending) >= INGEST_BATCH:
+                self._commit(file_id, pending, offset, last, complete)
+                added += len(pending)
+                pending.clear()
+        if pending:
+            self._commit(file_id, pending, offset, last, complete)
+            added += len(pending)
+        return added
+
+    def _commit(self, file_id, rows, offset, last, line):
+        """rows と取り込み済みの位置を1つのトランザクションで保存する
+
+        line は最後に取り込んだ行で、次回に続きから読む前の確認に使う。
+        """
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO records"
+                " (file_id, byte_offset, timestamp, type, tool, text)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.execute(
+                "UPDATE files SET ingested_bytes = ?, last_timestamp = ?,"
+                " tail_hash = ? WHERE id = ?",
+                (offset, last, _tail_hash(line[-TAIL_BYTES:]), file_id),
+            )
+
+    def is_current(self, session_file):
+        """ログが取り込んだときから追記されただけで、オフセットが使えるか"""
+        path = os.path.abspath(session_file)
+        state = self._file_state(path)
+        if state is None:
+            return False
+        try:
+            with open(path, "rb") as log:
+                return self._is_appended(log, state)
+        except OSError:
+            return False
+
+    def select(self, types=(), tools=(), since=None, until=None):
+        """条件に合う行の (ログのパス, [オフセット, ...]) をパス順に返す
+
+        types は type のどれかに、tools は tool_use のツール名のどれかに一致する
+        行を、since / until（ミリ秒）はタイムスタンプが since 以上 until 未満の
+        行を選ぶ。
+        """
+        clauses = []
+        params = []
+        if types:
+            clauses.append(f"r.type IN ({', '.join('?' * len(types))})")
+            params += types
+        if tools:
+            clauses.append(
+                f"r.type = 'tool_use' AND r.tool IN ({', '.join('?' * len(tools))})"
+            )
+            params += tools
+        if since is not None:
+            clauses.append("r.timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.timestamp < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._db.execute(
+            "SELECT f.path, r.byte_offset FROM records AS r"
+            f" JOIN files AS f ON f.id = r.file_id{where}"
+            " ORDER BY f.path, r.byte_offset",
+            params,
+        )
+        for path, group in groupby(rows, key=lambda row: row[0]):
+            yield path, [offset for _, offset in group]
+
+
+def open_store(db_file=DEFAULT_DB):
+    """データベースを開く（なければ作る）"""
+    return SessionStore(db_file)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""セッションログ（JSONL）のレコードを見やすく表示
+
+レコードの表示は print の代わりに OutputBuffer に書き、まとめて大きな単位で
+出力する。出力される内容は print で1行ずつ表示した場合と同じになる。
+"""
+
+# Standard library imports
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+from .partial import JSONPrefix, decode_line
+from .source import open_lines, text_lines
+
+# 表示する本文・ツール入力の最大文字数
+TEXT_LIMIT = 300
+TOOL_INPUT_LIMIT = 100
+
+# 出力をまとめて書き出す大きさ（バイト数）
+OUTPUT_BUFFER_BYTES = 1 << 18
+
+# 表示用に整形したタイムスタンプを覚えておく件数（超えたら忘れる）
+TIMESTAMP_CACHE_SIZE = 1024
+
+# この形のタイムスタンプなら、表示は秒までの部分（先頭19文字）だけで決まる
+# （どのバージョンの datetime.fromisoformat でも同じように解釈される形に限る）
+_SECONDS = re.compile(r"([1-9]\d{3}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})")
+_SUBSECOND_SUFFIX = re.compile(
+    r"(?:\.\d{3}|\.\d{6})?(?:Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?"
+)
+
+_time_prefixes = {}
+
+
+def exit_quietly():
+    """出力先が閉じられた（head などにパイプした）ので静かに終了"""
+    try:
+        # 終了時の標準出力の flush で再び BrokenPipeError にならないようにする
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    except (OSError, ValueError):
+        pass
+    sys.exit(0)
+
+
+class OutputBuffer:
+    """出力をためておき、OUTPUT_BUFFER_BYTES ごとにまとめて書き出す
+
+    with 文で使うと、抜けるときに残りを書き出す。出力先が閉じられていたら
+    exit_quietly() で終了する。
+    """
+
+    def __init__(self, stream, limit=OUTPUT_BUFFER_BYTES):
+        self.stream = stream
+        self.limit = limit
+        raw = getattr(stream, "buffer", None)
+        encoding = getattr(stream, "encoding", None)
+        if raw is not None and encoding and os.linesep == "\n":
+            # 書くときにエンコードしてバイト列をためる（エンコードできない文字の
+            # エラーは print と同じく、その書き込みで起きる）
+            self._raw = raw
+            self._encoding = encoding
+            self._errors = getattr(stream, "errors", None) or "strict"
+            self._buffer = bytearray()
+            self.write = self._write_bytes
+        else:
+            self._raw = None
+            self._buffer = []
+            self._size = 0
+            self.write = self._write_text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self.flush()
+        except BrokenPipeError:
+            exit_quietly()
+
+    # write(text): text を出力する（ためた量が limit を超えたら書き出す）
+
+    def _write_bytes(self, text):
+        self._buffer += text.encode(self._encoding, self._errors)
+        if len(self._buffer) >= self.limit:
+            self.flush()
+
+    def _write_text(self, text):
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.limit:
+            self.flush()
+
+    def flush(self):
+        """ためた出力を書き出す"""
+        if self._raw is not None:
+            if self._buffer:
+                # 出力先に直接書かれたテキストより後ろに書く
+                self.stream.flush()
+                self._raw.write(self._buffer)
+                self._buffer.clear()
+            self._raw.flush()
+        else:
+            if self._buffer:
+                self.stream.write("".join(self._buffer))
+                self._buffer.clear()
+                self._size = 0
+            self.stream.flush()
+
+
+def format_time_prefix(timestamp_str):
+    """タイムスタンプの表示（"[YYYY-MM-DD HH:MM:SS] "）
+
+    連続するレコードは秒まで同じことが多いため、秒までの部分ごとに結果を
+    覚えておく。
+    """
+    if isinstance(timestamp_str, str):
+        key = timestamp_str[:19]
+        time_prefix = _time_prefixes.get(key)
+        if (
+            time_prefix is not None
+            and _SUBSECOND_SUFFIX.fullmatch(timestamp_str, 19) is not None
+        ):
+            return time_prefix
+        seconds = _SECONDS.match(timestamp_str)
+        if seconds and _SUBSECOND_SUFFIX.fullmatch(timestamp_str, 19) is not None:
+            # 日時として正しいかは datetime に確かめさせ（不正ならここで例外）、
+            # 表示は strftime せずに文字列から作る
+            datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+            time_prefix = f"[{seconds[1]} {seconds[2]}] "
+            if len(_time_prefixes) >= TIMESTAMP_CACHE_SIZE:
+                _time_prefixes.clear()
+            _time_prefixes[key] = time_prefix
+            return time_prefix
+    timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+    return f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] "
+
+
+def _time_prefix(data):
+    """タイムスタンプがあれば表示の先頭に付ける文字列（なければ空文字列）"""
+    timestamp_str = data.get("timestamp", "")
+    if timestamp_str:
+        return format_time_prefix(timestamp_str)
+    return ""
+
+
+def _write_assistant_content(content, write):
+    """アシスタントの本文を表示（配列ならテキストのブロックだけ）"""
+    if isinstance(content, list):
+        for item in content:
+            if isinstance(item, dict) and item.get("type") == "text":
+                text = item.get("text", "")
+                write(f"{_truncate(text)}\n")
+    else:
+        write(f"{_truncate(content)}\n")
+
+
+def _tool_input_json(tool_input):
+    """ツール入力を json.dumps した文字列"""
+    if isinstance(tool_input, JSONPrefix):
+        # 部分的にデコードした行では、入力は json.dumps した先頭だけがある
+        return tool_input
+    return json.dumps(tool_input, ensure_ascii=False)
+
+
+def print_record(data, write=None):
+    """1レコードを表示（write を指定すると、print の代わりにその関数で出力する）"""
+    if write is None:
+        write = sys.stdout.write
+
+    time_prefix = _time_prefix(data)
+
+    # メッセージタイプごとの処理（1回の write が元の1回の print にあたる）
+    if data["type"] == "user":
+        message = data.get("message", {})
+        content = message.get("content", "")
+        write(f"\n{time_prefix}USER:\n")
+        write(f"{content}\n")
+
+    elif data["type"] == "assistant":
+        message = data.get("message", {})
+        content = message.get("content", [])
+        write(f"\n{time_prefix}CLAUDE:\n")
+        _write_assistant_content(content, write)
+
+    elif data["type"] == "tool_use":
+        tool_name = data.get("name", "Unknown")
+        tool_input = data.get("input", {})
+        write(f"\n{time_prefix}TOOL: {tool_name}\n")
+        write(f"Input: {_tool_input_json(tool_input)[:TOOL_INPUT_LIMIT]}...\n")
+
+    elif data["type"] == "summary":
+        summary = data.get("summary", "")
+        write(f"\n{time_prefix}SUMMARY: {summary}\n")
+
+
+def _truncate(text):
+    return text[:TEXT_LIMIT] + "..." if len(text) > TEXT_LIMIT else text
+
+
+def process_line(line, record_filter=None, out=None):
+    """1行を解析して表示（不正な行は警告を出して読み飛ばす）
+
+    record_filter を指定した場合、line は bytes で、条件に一致する行だけを
+    表示する（一致しない行や不正な行は何も出力せずに読み飛ばす）。
+    out（OutputBuffer）を指定すると、標準出力に直接ではなく out に書く。
+    """
+    try:
+        if record_filter is None:
+            data = decode_line(line, TEXT_LIMIT, TOOL_INPUT_LIMIT)
+        else:
+            data = record_filter.decode(line)
+            if data is None:
+                return
+        print_record(data, None if out is None else out.write)
+    except (json.JSONDecodeError, KeyError) as e:
+        # JSON parsing or key access errors - skip invalid lines
+        print(f"Warning: Skipping invalid line: {e}", file=sys.stderr)
+    except BrokenPipeError:
+        # Broken pipe (e.g., when output is piped to head) - exit gracefully
+        exit_quietly()
+    except Exception as e:
+        # Unexpected errors - log and continue
+        print(f"Unexpected error processing line: {e}", file=sys.stderr)
+
+
+def view_session(session_file, record_filter=None):
+    """セッションログ全体を先頭から表示（record_filter があれば一致する行だけ）
+
+    gzip / bz2 / xz で圧縮されたログは展開しながら表示する。
+    """
+    with OutputBuffer(sys.stdout) as out, open_lines(session_file) as lines:
+        if record_filter is not None:
+            for line in lines:
+                process_line(line, record_filter, out)
+            return
+        for line in text_lines(lines):
+            process_line(line, out=out)
+
+
+def view_lines(session_file, offsets, record_filter=None):
+    """バイトオフセットで指定した行だけを表示（インデックスを使う場合）"""
+    with OutputBuffer(sys.stdout) as out, open(session_file, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            line = f.readline()
+            if record_filter is None:
+                process_line(line.decode("utf-8", "replace"), out=out)
+            else:
+                process_line(line, record_filter, out)
@@ -0,0 +1,8 @@
+# ベンチマークパッケージ
+"""電卓アプリとセッションビューアのベンチマーク
+
+    python -m benchmarks            # 実行してベースラインと比較
+    python -m benchmarks --save     # 結果をベースラインとして保存
+
+ベースライン（baseline.json）はマシンごとに異なるためコミットしない。
+"""
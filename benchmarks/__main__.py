@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""python -m benchmarks"""
+
+# Standard library imports
+import argparse
+import json
+import sys
+
+# Local application imports
+from benchmarks import bench_calculator, bench_gui, bench_view_session, runner
+
+ALL_BENCHMARKS = {}
+for module in (bench_calculator, bench_gui, bench_view_session):
+    ALL_BENCHMARKS.update(module.BENCHMARKS)
+
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="ベンチマークを実行し、ベースラインより遅くなっていれば失敗します",
+    )
+    parser.add_argument(
+        "--size", type=int, default=100000, help="基準の処理件数（既定: 100000）"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="繰り返し回数（最速を採用）"
+    )
+    parser.add_argument("--filter", help="名前にこの文字列を含むものだけ実行")
+    parser.add_argument(
+        "--baseline", default=str(runner.DEFAULT_BASELINE), help="ベースラインのJSON"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="結果をベースラインとして保存"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="この割合以上遅くなったら失敗（既定: 0.2 = 20%%）",
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args(argv)
+
+    results = runner.run(ALL_BENCHMARKS, args.size, max(1, args.repeat), args.filter)
+    baseline = runner.load_baseline(args.baseline)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            base = baseline.get(name)
+            change = ""
+            if base:
+                ratio = result["ops_per_sec"] / base["ops_per_sec"] - 1
+                change = f" ({ratio:+.1%})"
+            print(f"{name:<24} {result['ops_per_sec']:>14,.0f} ops/s{change}")
+
+    if args.save:
+        runner.save_baseline(args.baseline, results)
+        print(f"ベースラインを保存しました: {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not baseline:
+        print(
+            f"ベースラインがないため比較しません（--save で作成）: {args.baseline}",
+            file=sys.stderr,
+        )
+        return 0
+
+    regressions = runner.compare(results, baseline, args.threshold)
+    for name, before, after in regressions:
+        print(
+            f"性能低下: {name} {before:,.0f} → {after:,.0f} ops/s",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
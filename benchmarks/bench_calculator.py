@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Calculator のスカラー演算のベンチマーク"""
+
+# Local application imports
+from apps.calculator import Calculator
+
+
+def _bench_operation(name, b=3):
+    def bench(size):
+        calc = Calculator()
+        op = getattr(calc, name)
+        for i in range(size):
+            op(i, b)
+        return size
+
+    return bench
+
+
+def bench_mixed(size):
+    """四則演算と累乗を交互に呼び出す"""
+    calc = Calculator()
+    for i in range(size // 5):
+        calc.add(i, 3)
+        calc.subtract(i, 3)
+        calc.multiply(i, 3)
+        calc.divide(i, 3)
+        calc.power(i, 3)
+    return size // 5 * 5
+
+
+def bench_sum(size):
+    """ジェネレータの総和（チャンクごとの正確な総和）"""
+    Calculator().sum(i * 0.1 for i in range(size))
+    return size
+
+
+def bench_sum_pairwise(size):
+    """add で1つずつ足す（bench_sum との比較用）"""
+    calc = Calculator()
+    total = 0
+    for i in range(size):
+        total = calc.add(total, i * 0.1)
+    return size
+
+
+def _shared_expressions(size):
+    """共通部分式の多い数式の列"""
+    return [
+        f"(x{i % 50} + x{i % 50 + 1}) * (x{i % 50} - x{i % 50 + 1}) + x{i % 7} / 3"
+        for i in range(size)
+    ]
+
+
+_VARIABLES = {f"x{i}": i * 0.5 for i in range(51)}
+
+
+def bench_evaluate_batch(size):
+    """共通部分式を共有した一括評価"""
+    Calculator().evaluate_batch(_shared_expressions(size), _VARIABLES)
+    return size
+
+
+def bench_evaluate_each(size):
+    """evaluate で1つずつ評価（bench_evaluate_batch との比較用）"""
+    calc = Calculator()
+    for text in _shared_expressions(size):
+        calc.evaluate(text, _VARIABLES)
+    return size
+
+
+# 名前: (関数, --size に対する倍率)
+BENCHMARKS = {
+    "calculator.add": (_bench_operation("add"), 1.0),
+    "calculator.subtract": (_bench_operation("subtract"), 1.0),
+    "calculator.multiply": (_bench_operation("multiply"), 1.0),
+    "calculator.divide": (_bench_operation("divide"), 1.0),
+    "calculator.power": (_bench_operation("power"), 1.0),
+    "calculator.mixed": (bench_mixed, 1.0),
+    "calculator.sum": (bench_sum, 10.0),
+    "calculator.sum_pairwise": (bench_sum_pairwise, 1.0),
+    "calculator.evaluate_batch": (bench_evaluate_batch, 1.0),
+    "calculator.evaluate_each": (bench_evaluate_each, 1.0),
+}
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""CalculatorGUI のキー入力処理のベンチマーク
+
+テストと同様に tkinter をモック化するため、ディスプレイなしで実行できる。
+"""
+
+# Standard library imports
+import random
+import sys
+from unittest.mock import MagicMock, Mock, patch
+
+# tkinterをモック化（GUIテスト環境がない場合でもベンチマーク可能に）
+sys.modules["tkinter"] = MagicMock()
+sys.modules["tkinter.ttk"] = MagicMock()
+
+# Local application imports
+from apps.calculator import trace
+from apps.calculator.calculator_gui import CalculatorGUI
+
+
+def create_gui(background_mode="thread"):
+    """モックのrootでGUIインスタンスを作成
+
+    アイドル時の表示更新は実際のTkと同様に毎回の入力の後に行われるよう、
+    after_idle はコールバックをすぐに実行する。
+    """
+    root = Mock()
+    root.after_idle = Mock(side_effect=lambda func, *args: func(*args))
+    with patch("apps.calculator.calculator_gui.tk.StringVar", return_value=Mock()):
+        return CalculatorGUI(root, background_mode=background_mode)
+
+
+def bench_keystrokes(size):
+    """「12 + 34 =」のようなキー入力を繰り返す（1回あたり7キー）"""
+    gui = create_gui()
+    operations = ["+", "-", "×", "÷"]
+    rounds = max(1, size // 7)
+    for i in range(rounds):
+        gui.on_clear()
+        gui.on_digit("1")
+        gui.on_digit("2")
+        gui.on_operation(operations[i % 4])
+        gui.on_digit("3")
+        gui.on_digit("4")
+        gui.on_equals()
+    return rounds * 7
+
+
+def bench_chain(size):
+    """演算子で連続計算する（calculate が毎回呼ばれる）"""
+    gui = create_gui()
+    gui.on_digit("1")
+    for _ in range(size):
+        gui.on_operation("+")
+        gui.on_digit("1")
+    gui.on_equals()
+    return size * 2
+
+
+def synthetic_trace(events, seed=0):
+    """数字・演算子・=・バックスペース・メモリ操作が混在するトレースを生成"""
+    rng = random.Random(seed)
+    trace = []
+    while len(trace) < events:
+        for _ in range(rng.randint(1, 6)):
+            trace.append((rng.randint(50000, 200000), "d", rng.choice("0123456789")))
+        if rng.random() < 0.1:
+            trace.append((rng.randint(50000, 200000), "b", None))
+        if rng.random() < 0.05:
+            trace.append((rng.randint(50000, 200000), "ms", None))
+        code = rng.choice(["o", "o", "o", "="])
+        arg = rng.choice(["+", "-", "×", "÷"]) if code == "o" else None
+        trace.append((rng.randint(50000, 500000), code, arg))
+    return trace[:events]
+
+
+def bench_replay(size):
+    """合成したキー入力のトレースを最大速度で再生する"""
+    trace.replay(create_gui(), synthetic_trace(size))
+    return size
+
+
+BENCHMARKS = {
+    "gui.keystrokes": (bench_keystrokes, 0.2),
+    "gui.chain": (bench_chain, 0.1),
+    "gui.replay": (bench_replay, 0.1),
+}
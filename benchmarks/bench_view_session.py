@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""examples/view_session.py のベンチマーク（1秒あたりの行数）"""
+
+# Standard library imports
+import atexit
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import tempfile
+from pathlib import Path
+
+# Local application imports
+from apps.session_viewer.filter import RecordFilter
+
+VIEW_SESSION_PATH = Path(__file__).parent.parent / "examples" / "view_session.py"
+
+_module = None
+_session_files = {}
+
+
+def load_view_session():
+    """examples/view_session.py をモジュールとして読み込む"""
+    global _module
+    if _module is None:
+        spec = importlib.util.spec_from_file_location("view_session", VIEW_SESSION_PATH)
+        _module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(_module)
+    return _module
+
+
+def generate_session(path, lines, seed=0):
+    """ユーザー・アシスタント・ツール・サマリーが混在するJSONLを生成"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            hour, minute, second = i // 3600 % 24, i // 60 % 60, i % 60
+            timestamp = f"2025-01-01T{hour:02d}:{minute:02d}:{second:02d}Z"
+            kind = rng.choice(["user", "assistant", "assistant", "tool_use", "summary"])
+            if kind == "user":
+                record = {"message": {"content": "質問です " * rng.randint(1, 20)}}
+            elif kind == "assistant":
+                text = "回答の本文です。" * rng.randint(1, 100)
+                record = {"message": {"content": [{"type": "text", "text": text}]}}
+            elif kind == "tool_use":
+                command = "ls -la " + "x" * rng.randint(1, 200)
+                record = {"name": "Bash", "input": {"command": command}}
+            else:
+                record = {"summary": "セッションの要約"}
+            record.update({"type": kind, "timestamp": timestamp})
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def session_file(lines):
+    """指定行数のセッションログを一時ファイルに生成する（行数ごとに1回だけ）"""
+    if lines not in _session_files:
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(fd)
+        atexit.register(os.unlink, path)
+        generate_session(path, lines)
+        _session_files[lines] = path
+    return _session_files[lines]
+
+
+def bench_view_session(size):
+    """生成したセッションログを表示する（出力は破棄）"""
+    view_session = load_view_session().view_session
+    path = session_file(size)
+    with contextlib.redirect_stdout(io.StringIO()):
+        view_session(path)
+    return size
+
+
+def bench_view_session_filtered(size):
+    """--tool Bash で絞り込んで表示する（一致しない行はデコードしない）"""
+    view_session = load_view_session().view_session
+    path = session_file(size)
+    with contextlib.redirect_stdout(io.StringIO()):
+        view_session(path, RecordFilter(tools=["Bash"]))
+    return size
+
+
+# 計測の前にログを生成しておく
+bench_view_session.setup = session_file
+bench_view_session_filtered.setup = session_file
+
+
+BENCHMARKS = {
+    "view_session.lines": (bench_view_session, 0.1),
+    "view_session.filter": (bench_view_session_filtered, 0.1),
+}
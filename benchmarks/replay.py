@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""記録したキー入力のトレースをディスプレイなしで再生する
+
+    python -m apps.calculator.calculator_gui --record session.trace
+    python -m benchmarks.replay session.trace
+    python -m benchmarks.replay session.trace --expect 3f2a9c0d1b7e4a55
+
+ハンドラごとのレイテンシ（p50/p99/最大、マイクロ秒）と最終状態の
+チェックサムを表示する。--expect と異なるチェックサムになった場合や、
+--max-p99 を超えたイベントがあった場合は終了コード1で終わる。
+"""
+
+# Standard library imports
+import argparse
+import json
+import sys
+
+# Local application imports
+from apps.calculator import trace
+from benchmarks.bench_gui import create_gui
+
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.replay",
+        description="キー入力のトレースを再生してハンドラのレイテンシを計測します",
+    )
+    parser.add_argument("trace", help="トレースファイル")
+    parser.add_argument(
+        "--realtime", action="store_true", help="記録時の間隔どおりに再生する"
+    )
+    parser.add_argument(
+        "--background-mode",
+        choices=["thread", "process"],
+        default="thread",
+        help="重い計算の実行方法（既定: thread）",
+    )
+    parser.add_argument("--expect", help="期待する最終状態のチェックサム")
+    parser.add_argument(
+        "--max-p99", type=float, help="p99 の上限（マイクロ秒、全イベント共通）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args(argv)
+
+    events = trace.load_trace(args.trace)
+    gui = create_gui(args.background_mode)
+    try:
+        report = trace.replay(gui, events, realtime=args.realtime)
+    finally:
+        gui.evaluator.shutdown()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.format())
+
+    status = 0
+    if args.expect and report.checksum != args.expect:
+        print(
+            f"チェックサムが一致しません: {args.expect} → {report.checksum}",
+            file=sys.stderr,
+        )
+        status = 1
+    if args.max_p99 is not None:
+        for name, stats in report.summary().items():
+            if stats["p99"] * 1e6 > args.max_p99:
+                print(
+                    f"レイテンシ超過: {name} p99 {stats['p99'] * 1e6:.1f}µs",
+                    file=sys.stderr,
+                )
+                status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
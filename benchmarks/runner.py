@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""ベンチマークの実行とベースライン比較"""
+
+# Standard library imports
+import json
+import platform
+import time
+from pathlib import Path
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def measure(func, size, repeat):
+    """func(size) を repeat 回実行し、最速の回の 1秒あたり処理数を返す
+
+    func は処理した件数を返す。func.setup があれば計測の前に setup(size) を呼ぶ。
+    """
+    setup = getattr(func, "setup", None)
+    if setup is not None:
+        setup(size)
+    best = None
+    ops = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        ops = func(size)
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return {"ops": ops, "seconds": best, "ops_per_sec": ops / best if best else 0.0}
+
+
+def run(benchmarks, size, repeat, name_filter=None):
+    """ベンチマークをすべて実行して {名前: 結果} を返す"""
+    results = {}
+    for name, (func, scale) in benchmarks.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(func, max(1, int(size * scale)), repeat)
+    return results
+
+
+def load_baseline(path):
+    """ベースラインを読み込む（なければ空の辞書）"""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path, results):
+    """結果をベースラインとして保存"""
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def compare(results, baseline, threshold):
+    """ベースラインから threshold（割合）以上遅くなったものを返す
+
+    戻り値は (名前, ベースラインの処理数/秒, 今回の処理数/秒) のリスト。
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append((name, base["ops_per_sec"], result["ops_per_sec"]))
+    return regressions
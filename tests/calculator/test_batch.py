@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# Standard library imports
+import math
+import sys
+import unittest
+from array import array
+from pathlib import Path
+from unittest.mock import patch
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import Calculator, batch
+from apps.calculator.power import PowerLimitError
+
+
+class TestBatchFallback(unittest.TestCase):
+    """一括演算のテスト（純Pythonフォールバック）"""
+
+    def setUp(self):
+        """NumPyなしの状態を再現して電卓インスタンスを作成"""
+        patcher = patch.object(batch, "get_numpy", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calc = Calculator()
+
+    def test_basic_operations(self):
+        """四則演算と累乗の一括計算テスト"""
+        a = [1, 2, 3]
+        b = [4, 5, 6]
+        self.assertEqual(self.calc.add_many(a, b), [5, 7, 9])
+        self.assertEqual(self.calc.subtract_many(a, b), [-3, -3, -3])
+        self.assertEqual(self.calc.multiply_many(a, b), [4, 10, 18])
+        self.assertEqual(self.calc.divide_many([8, 9], [2, 3]), [4, 3])
+        self.assertEqual(self.calc.power_many([2, 10], [3, -1]), [8, 0.1])
+
+    def test_last_result(self):
+        """last_result が最終要素になるテスト"""
+        self.calc.add_many([1, 2], [3, 4])
+        self.assertEqual(self.calc.last_result, 6)
+
+        # 空の入力では last_result は変わらない
+        self.calc.add_many([], [])
+        self.assertEqual(self.calc.last_result, 6)
+
+    def test_buffer_inputs(self):
+        """array.array やmemoryviewを受け付けるテスト"""
+        a = array("d", [1.5, 2.5])
+        b = memoryview(array("i", [1, 2]))
+        self.assertEqual(self.calc.add_many(a, b), [2.5, 4.5])
+
+    def test_generator_spanning_chunks(self):
+        """チャンクをまたぐジェネレータ入力のテスト"""
+        n = batch.CHUNK_SIZE * 2 + 5
+        result = self.calc.add_many(range(n), (1 for _ in range(n)))
+        self.assertEqual(len(result), n)
+        self.assertEqual(self.calc.last_result, n)
+
+    def test_length_mismatch(self):
+        """長さが一致しない場合のテスト"""
+        with self.assertRaises(ValueError):
+            self.calc.add_many([1, 2, 3], [1, 2])
+
+    def test_divide_by_zero_raises(self):
+        """ゼロ除算が例外になるテスト"""
+        self.calc.add(1, 1)
+        with self.assertRaises(ZeroDivisionError):
+            self.calc.divide_many([1, 2, 3], [1, 0, 1])
+        self.assertEqual(self.calc.last_result, 2)
+
+    def test_divide_by_zero_mask(self):
+        """ゼロ除算をマスクで受け取るテスト"""
+        result, mask = self.calc.divide_many([1, 2, 3], [1, 0, 2], errors="mask")
+        self.assertEqual(mask, [False, True, False])
+        self.assertTrue(math.isnan(result[1]))
+        self.assertEqual(self.calc.last_result, 1.5)
+
+        # 最終要素がゼロ除算なら last_result は更新しない
+        self.calc.divide_many([4], [0], errors="mask")
+        self.assertEqual(self.calc.last_result, 1.5)
+
+    def test_invalid_errors_mode(self):
+        """不正な errors 指定のテスト"""
+        with self.assertRaises(ValueError):
+            self.calc.divide_many([1], [1], errors="ignore")
+
+
+@unittest.skipIf(batch.get_numpy() is None, "NumPyがインストールされていません")
+class TestBatchNumpy(unittest.TestCase):
+    """一括演算のテスト（NumPy）"""
+
+    def setUp(self):
+        """各テストの前に新しい電卓インスタンスを作成"""
+        self.np = batch.get_numpy()
+        self.calc = Calculator()
+
+    def test_add_many(self):
+        """NumPy配列の足し算テスト"""
+        result = self.calc.add_many(self.np.arange(4), self.np.arange(4))
+        self.assertEqual(result.tolist(), [0, 2, 4, 6])
+        self.assertEqual(self.calc.last_result, 6)
+
+    def test_negative_integer_power(self):
+        """整数の負の累乗が小数になるテスト"""
+        result = self.calc.power_many(self.np.array([10, 2]), self.np.array([-1, 2]))
+        self.assertEqual(result.tolist(), [0.1, 4.0])
+
+    def test_divide_by_zero(self):
+        """ゼロ除算の例外とマスクのテスト"""
+        with self.assertRaises(ZeroDivisionError):
+            self.calc.divide_many(self.np.array([1.0, 2.0]), self.np.array([1.0, 0.0]))
+        result, mask = self.calc.divide_many(
+            array("d", [1, 2]), array("d", [0, 4]), errors="mask"
+        )
+        self.assertEqual(mask.tolist(), [True, False])
+        self.assertTrue(math.isnan(result[0]))
+        self.assertEqual(self.calc.last_result, 0.5)
+
+    def test_integer_overflow_is_exact(self):
+        """int64の範囲を超える整数の結果がPythonと同じになるテスト"""
+        self.assertEqual(
+            self.calc.multiply_many([2**40, 3], [2**40, 4]).tolist(), [2**80, 12]
+        )
+        self.assertEqual(self.calc.add_many([2**62], [2**62]).tolist(), [2**63])
+        self.assertEqual(
+            self.calc.subtract_many([-(2**63)], [1]).tolist(), [-(2**63) - 1]
+        )
+        self.assertEqual(self.calc.last_result, -(2**63) - 1)
+        # 範囲内なら整数型のまま計算する
+        self.assertEqual(self.calc.add_many([1, 2], [3, 4]).dtype, self.np.int64)
+
+    def test_bool_operands(self):
+        """boolを整数として計算するテスト"""
+        self.assertEqual(self.calc.add_many([True], [True]).tolist(), [2])
+
+    def test_power_beyond_int64(self):
+        """int64を超えても上限内の累乗はPythonと同じ整数になるテスト"""
+        result = self.calc.power_many([10, 2], [30, 3])
+        self.assertEqual(result.tolist(), [10**30, 8])
+        self.assertEqual(self.calc.last_result, 8)
+        self.assertEqual(self.calc.power_many([2], [3]).dtype, self.np.int64)
+
+    def test_power_mixed_sign_exponents(self):
+        """負の指数の要素だけが浮動小数点になり、残りは正確な整数になるテスト"""
+        result = self.calc.power_many([10, 3, 2], [-1, 40, 5])
+        expected = [self.calc.power(10, -1), 3**40, 32]
+        self.assertEqual(result.tolist(), expected)
+        self.assertEqual([type(v) for v in result.tolist()], [float, int, int])
+        result = self.calc.power_many([[2, 4]], [[-1, 2]])
+        self.assertEqual(result.tolist(), [[0.5, 16]])
+        with self.assertRaises(PowerLimitError):
+            Calculator(power_max_bits=100).power_many([2, 2], [-1, 200])
+
+    def test_power_limit(self):
+        """power_max_bits を超える累乗にだけ上限超過の扱いを適用するテスト"""
+        calc = Calculator(power_max_bits=100)
+        self.assertEqual(calc.power_many([2], [100]).tolist(), [2**100])
+        with self.assertRaises(PowerLimitError):
+            calc.power_many([2, 2], [3, 200])
+        calc = Calculator(power_max_bits=100, power_overflow="float")
+        self.assertEqual(calc.power_many([2], [200]).tolist(), [2.0**200])
+
+    def test_zero_to_negative_power(self):
+        """0 の負の累乗がZeroDivisionErrorになるテスト"""
+        with self.assertRaises(ZeroDivisionError):
+            self.calc.power_many([2, 0], [1, -1])
+        with self.assertRaises(ZeroDivisionError):
+            self.calc.power_many([0.0], [-0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Standard library imports
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import bulk, cli
+
+
+def flatten(chunks):
+    return [line for chunk in chunks for line in chunk]
+
+
+class TestBulk(unittest.TestCase):
+    """一括評価パイプラインのテスト"""
+
+    def test_expressions(self):
+        """数式の一括評価テスト"""
+        lines = ["1 + 2\n", "\n", "10 ÷ 0\n", "2 ^ 10\n"]
+        self.assertEqual(
+            flatten(bulk.evaluate_stream(lines)),
+            ["3", "", "エラー: ゼロで割ることはできません", "1024"],
+        )
+
+    def test_deep_nesting_is_line_error(self):
+        """深すぎる入れ子の行がその行だけのエラーになるテスト"""
+        lines = ["1 + 2\n", "(" * 400 + "1" + ")" * 400 + "\n", "3 * 3\n"]
+        results = flatten(bulk.evaluate_stream(lines))
+        self.assertEqual(results[0], "3")
+        self.assertTrue(results[1].startswith("エラー: 数式の入れ子が深すぎます"))
+        self.assertEqual(results[2], "9")
+        with patch.object(bulk.Calculator, "evaluate", side_effect=RecursionError):
+            self.assertEqual(flatten(bulk.evaluate_stream(["1\n"])), ["エラー: "])
+
+    def test_csv_rows(self):
+        """CSV行の一括評価テスト"""
+        lines = ["add,1,2\n", "×,2.5,2\n", "mod,1,2\n", "+,1\n"]
+        results = flatten(bulk.evaluate_stream(lines, fmt="csv"))
+        self.assertEqual(results[:2], ["3", "5.0"])
+        self.assertTrue(results[2].startswith("エラー"))
+        self.assertTrue(results[3].startswith("エラー"))
+
+    def test_csv_fixed_operation(self):
+        """--op で演算を固定したCSVのテスト"""
+        lines = ["2,3\n", "4,0.5\n"]
+        self.assertEqual(
+            flatten(bulk.evaluate_stream(lines, fmt="csv", op="power")), ["8", "2.0"]
+        )
+
+    def test_streams_lazily(self):
+        """入力全体を読み込まずにチャンク単位で返すテスト"""
+        consumed = []
+
+        def lines():
+            for i in range(10):
+                consumed.append(i)
+                yield f"{i} + 1\n"
+
+        stream = bulk.evaluate_stream(lines(), chunk_size=3)
+        self.assertEqual(next(stream), ["1", "2", "3"])
+        self.assertLessEqual(len(consumed), 4)
+
+    def test_process_pool_preserves_order(self):
+        """プロセスプールでも順序が保たれるテスト"""
+        lines = [f"{i} * 2\n" for i in range(200)]
+        results = flatten(bulk.evaluate_stream(lines, chunk_size=7, workers=2))
+        self.assertEqual(results, [str(i * 2) for i in range(200)])
+
+    def test_invalid_options(self):
+        """不正なオプションのテスト"""
+        with self.assertRaises(ValueError):
+            list(bulk.evaluate_stream([], fmt="json"))
+        with self.assertRaises(ValueError):
+            list(bulk.evaluate_stream([], chunk_size=0))
+
+
+class TestCli(unittest.TestCase):
+    """python -m apps.calculator のテスト"""
+
+    def test_file_input(self):
+        """ファイル入力の一括評価テスト"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "input.csv"
+            path.write_text("-,10,4\n/,1,4\n", encoding="utf-8")
+            stdout = io.StringIO()
+            with patch("sys.stdout", stdout):
+                self.assertEqual(cli.main([str(path), "--format", "csv"]), 0)
+        self.assertEqual(stdout.getvalue(), "6\n0.25\n")
+
+    def test_stdin_input(self):
+        """標準入力の一括評価テスト"""
+        stdout = io.StringIO()
+        with patch("sys.stdin", io.StringIO("x\n3 × 3\n")), patch("sys.stdout", stdout):
+            cli.main([])
+        self.assertEqual(stdout.getvalue(), "エラー: 未定義の変数です: x\n9\n")
+
+    def test_repl(self):
+        """対話モードの代入・ans・エラー・終了のテスト"""
+        stdin = io.StringIO("1 + 2\nx = ans × 10\n\nx ^ 2\n1 ÷ 0\nquit\n5\n")
+        stdout = io.StringIO()
+        cli.run_repl(stdin, stdout, prompt="")
+        self.assertEqual(
+            stdout.getvalue(), "3\n30\n900\nエラー: ゼロで割ることはできません\n"
+        )
+
+    def test_repl_deep_nesting(self):
+        """深すぎる入れ子の数式でも対話モードが続くテスト"""
+        stdin = io.StringIO("(" * 400 + "1" + ")" * 400 + "\n2 + 2\n")
+        stdout = io.StringIO()
+        cli.run_repl(stdin, stdout, prompt="")
+        first, second = stdout.getvalue().splitlines()
+        self.assertTrue(first.startswith("エラー: 数式の入れ子が深すぎます"))
+        self.assertEqual(second, "4")
+        with patch.object(cli.Calculator, "evaluate", side_effect=RecursionError):
+            cli.run_repl(io.StringIO("1\n"), stdout, prompt="")
+
+    def test_headless(self):
+        """--headless で標準入力を対話モードとして処理するテスト"""
+        stdout = io.StringIO()
+        with patch("sys.stdin", io.StringIO("2 × 21\n")), patch("sys.stdout", stdout):
+            self.assertEqual(cli.main(["--headless"]), 0)
+            self.assertEqual(cli.main(["--headless", "--chunk-size", "1"]), 0)
+        self.assertEqual(stdout.getvalue(), "42\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Standard library imports
+import math
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import CachedCalculator
+from apps.calculator.cached import ResultCache
+
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCachedCalculator(unittest.TestCase):
+    """キャッシュ付き電卓のテスト"""
+
+    def setUp(self):
+        """各テストの前に新しい電卓インスタンスを作成"""
+        self.calc = CachedCalculator(maxsize=4)
+
+    def test_hit_updates_last_result(self):
+        """ヒット時も last_result が更新されるテスト"""
+        self.assertEqual(self.calc.power(2, 10), 1024)
+        self.calc.add(1, 1)
+        self.assertEqual(self.calc.power(2, 10), 1024)
+        self.assertEqual(self.calc.last_result, 1024)
+        stats = self.calc.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["hit_rate"], 1 / 3)
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_float_keys(self):
+        """-0.0 と NaN、int と float を区別するテスト"""
+        self.assertEqual(str(self.calc.multiply(0.0, 1)), "0.0")
+        self.assertEqual(str(self.calc.multiply(-0.0, 1)), "-0.0")
+        self.assertIsInstance(self.calc.add(1, 2), int)
+        self.assertIsInstance(self.calc.add(1.0, 2), float)
+
+        self.assertTrue(math.isnan(self.calc.add(math.nan, 1)))
+        self.assertTrue(math.isnan(self.calc.add(float("nan"), 1)))
+        self.assertEqual(self.calc.cache_stats()["hits"], 1)
+
+    def test_errors_are_not_cached(self):
+        """ゼロ除算はキャッシュされないテスト"""
+        for _ in range(2):
+            with self.assertRaises(ZeroDivisionError):
+                self.calc.divide(1, 0)
+        self.assertEqual(len(self.calc.cache), 0)
+
+    def test_lru_eviction(self):
+        """件数上限で追い出されるテスト"""
+        for i in range(6):
+            self.calc.add(i, i)
+        stats = self.calc.cache_stats()
+        self.assertEqual((stats["size"], stats["evictions"]), (4, 2))
+
+    def test_ttl_expiration(self):
+        """有効期限切れのテスト"""
+        clock = FakeClock()
+        calc = CachedCalculator(cache=ResultCache(ttl=10, clock=clock))
+        calc.add(1, 2)
+        clock.now = 5
+        calc.add(1, 2)
+        clock.now = 20
+        calc.add(1, 2)
+        stats = calc.cache_stats()
+        self.assertEqual((stats["hits"], stats["expirations"]), (1, 1))
+
+    def test_shared_across_threads(self):
+        """スレッド間で共有できるテスト"""
+        cache = ResultCache(maxsize=64)
+
+        def worker():
+            calc = CachedCalculator(cache=cache)
+            for i in range(1000):
+                self.assertEqual(calc.multiply(i % 100, 3), (i % 100) * 3)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 4000)
+        self.assertEqual(stats["size"], 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # Standard library imports
 import sys
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
@@ -13,7 +15,11 @@ sys.modules["tkinter"] = MagicMock()
 sys.modules["tkinter.ttk"] = MagicMock()
 
 # Local application imports
-from apps.calculator.calculator_gui import CalculatorGUI
+from apps.calculator.calculator_gui import (
+    CalculatorGUI,
+    _format_number,
+    _is_heavy_power,
+)
 
 
 class TestCalculatorGUI(unittest.TestCase):
@@ -27,6 +33,8 @@ class TestCalculatorGUI(unittest.TestCase):
         self.mock_root.resizable = Mock()
         self.mock_root.bind = Mock()
         self.mock_root.mainloop = Mock()
+        # アイドル時のコールバックはすぐに実行する（入力ごとにアイドルになる想定）
+        self.mock_root.after_idle = Mock(side_effect=lambda func, *args: func(*args))
 
         # StringVarのモック
         self.mock_string_var = Mock()
@@ -39,6 +47,13 @@ class TestCalculatorGUI(unittest.TestCase):
         ):
             self.gui = CalculatorGUI(self.mock_root)
 
+    def run_background(self):
+        """ワーカーの計算が終わるまで root.after の代わりにポーリングする"""
+        deadline = time.monotonic() + 5
+        while self.gui.evaluator.busy and time.monotonic() < deadline:
+            self.gui.poll_background()
+            time.sleep(0.001)
+
     # 数字入力のテスト
     def test_digit_input(self):
         """数字入力のテスト"""
@@ -115,6 +130,164 @@ class TestCalculatorGUI(unittest.TestCase):
         # エラー処理により current_input は空になる
         self.assertEqual(self.gui.current_input, "")
 
+    def test_power(self):
+        """キーボードからの累乗テスト"""
+        event = Mock()
+        self.gui.on_digit("2")
+        event.char = "^"
+        self.gui.on_key_press(event)
+        self.gui.on_digit("1")
+        self.gui.on_digit("0")
+        self.gui.on_equals()
+        # 小さな累乗はワーカーを使わずにすぐ計算する
+        self.assertFalse(self.gui.evaluator.busy)
+        self.assertEqual(self.gui.current_input, "1024")
+        self.assertEqual(self.gui.calc.last_result, 1024)
+
+    def test_integer_power_is_exact(self):
+        """整数の入力の累乗が誤差のない整数になるテスト"""
+        self.gui.feed("3^40=")
+        self.assertEqual(self.gui.current_input, str(3**40))
+        self.gui.feed("+1=")
+        self.assertEqual(self.gui.calc.last_result, 3**40 + 1)
+        self.gui.on_clear()
+        self.gui.feed("4^0.5=")
+        self.assertEqual(self.gui.current_input, "2")
+        self.assertIsInstance(self.gui.calc.last_result, float)
+
+    def test_power_overflow(self):
+        """大きすぎる累乗はエラー表示になるテスト"""
+        self.gui.on_digit("9")
+        self.gui.on_operation("^")
+        for digit in "999999":
+            self.gui.on_digit(digit)
+        self.gui.on_equals()
+        self.run_background()
+        self.assertEqual(self.gui.current_input, "")
+        self.mock_string_var.set.assert_called_with("エラー")
+
+    def test_power_chain(self):
+        """計算中に押した演算子が結果に続けて適用されるテスト"""
+        self.gui.feed("2^70000")
+        self.gui.on_operation("+")
+        self.assertTrue(self.gui.evaluator.busy)
+        self.run_background()
+        self.assertEqual(self.gui.pending_value, 2**70000)
+        self.assertEqual(self.gui.pending_operation, "+")
+        self.gui.on_digit("1")
+        self.gui.on_equals()
+        self.assertEqual(self.gui.calc.last_result, 2**70000 + 1)
+
+    def test_clear_cancels_background(self):
+        """計算中のクリアでキャンセルされるテスト"""
+        release = threading.Event()
+
+        def slow_job():
+            release.wait(5)
+            return 1
+
+        self.gui.start_background(slow_job)
+        self.mock_string_var.set.assert_called_with("計算中…")
+
+        # 計算中の入力は結果を待ち、クリアで捨てられる
+        self.gui.on_digit("5")
+        self.assertEqual(self.gui.current_input, "")
+
+        self.gui.on_clear()
+        release.set()
+        self.assertFalse(self.gui.evaluator.busy)
+        self.mock_root.after_cancel.assert_called()
+        self.gui.poll_background()
+        self.mock_string_var.set.assert_called_with("0")
+
+    # 表示更新と一括入力のテスト
+    def test_display_updates_are_coalesced(self):
+        """アイドルまでの表示更新が1回にまとまるテスト"""
+        idle_callbacks = []
+        self.mock_root.after_idle = Mock(side_effect=idle_callbacks.append)
+        self.mock_string_var.set.reset_mock()
+
+        for digit in "12345":
+            self.gui.on_digit(digit)
+        self.assertEqual(len(idle_callbacks), 1)
+        self.mock_string_var.set.assert_not_called()
+
+        idle_callbacks.pop()()
+        self.mock_string_var.set.assert_called_once_with("12345")
+
+    def test_feed(self):
+        """文字列の一括入力テスト"""
+        self.assertTrue(self.gui.feed("12 + 30 * 2 ="))
+        self.assertEqual(self.gui.current_input, "84")
+        self.mock_string_var.set.assert_called_with("84")
+
+    def test_feed_digit_rules(self):
+        """一括入力でも数字入力の規則が同じになるテスト"""
+        self.gui.feed("0.5.5")
+        self.assertEqual(self.gui.current_input, "0.55")
+        self.gui.on_clear()
+        self.gui.feed("07")
+        self.assertEqual(self.gui.current_input, "7")
+        self.gui.on_clear()
+        self.gui.feed(".")
+        self.assertEqual(self.gui.current_input, "0.")
+
+    def test_feed_long_input(self):
+        """長い入力を一括で処理するテスト"""
+        self.mock_string_var.set.reset_mock()
+        self.gui.feed("9" * 10000)
+        self.assertEqual(len(self.gui.current_input), 10000)
+        self.assertEqual(self.mock_string_var.set.call_count, 1)
+
+    def test_feed_rejects_invalid_text(self):
+        """不正な文字を含む入力は全体を拒否するテスト"""
+        self.gui.on_digit("1")
+        self.assertFalse(self.gui.feed("2+abc"))
+        self.assertEqual(self.gui.current_input, "1")
+        self.assertIsNone(self.gui.pending_operation)
+
+    def test_feed_waits_for_background(self):
+        """巨大な整数の累乗をワーカーで計算し、結果を待って残りを処理するテスト"""
+        self.gui.feed("3^100000+1=")
+        self.assertTrue(self.gui.evaluator.busy)
+        self.run_background()
+        self.assertFalse(self.gui.evaluator.busy)
+        self.assertEqual(self.gui.calc.last_result, 3**100000 + 1)
+        self.assertEqual(self.gui.current_input, _format_number(3**100000 + 1))
+
+    def test_keys_while_busy_are_queued(self):
+        """計算中に押したキーが結果の後に処理されるテスト"""
+        self.gui.on_digit("2")
+        self.gui.on_operation("^")
+        self.gui.feed("70000")
+        self.gui.on_equals()
+        self.assertTrue(self.gui.evaluator.busy)
+        self.gui.on_operation("-")
+        self.gui.on_digit("4")
+        self.gui.on_equals()
+        self.run_background()
+        self.assertEqual(self.gui.calc.last_result, 2**70000 - 4)
+
+    def test_heavy_power(self):
+        """ワーカーで計算する累乗の判定テスト"""
+        self.assertFalse(_is_heavy_power(2.0, 100000.0))
+        self.assertFalse(_is_heavy_power(2, 10))
+        self.assertFalse(_is_heavy_power(2, -(10**6)))
+        self.assertTrue(_is_heavy_power(3, 10**6))
+
+    def test_format_number(self):
+        """Pythonの整数と文字列の変換の上限を超える整数も表示できるテスト"""
+        self.assertEqual(_format_number(2.0), "2")
+        self.assertEqual(_format_number(2.5), "2.5")
+        digits = _format_number(10**5000)
+        self.assertEqual(digits, "1" + "0" * 5000)
+
+    def test_paste(self):
+        """クリップボードからの貼り付けテスト"""
+        self.mock_root.clipboard_get = Mock(return_value="6×7=")
+        self.assertTrue(self.gui.on_paste())
+        self.assertEqual(self.gui.current_input, "42")
+
     # 連続計算のテスト
     def test_chain_calculation(self):
         """連続計算のテスト"""
@@ -163,6 +336,21 @@ class TestCalculatorGUI(unittest.TestCase):
         self.gui.on_memory_recall()
         self.assertEqual(self.gui.current_input, "0")
 
+    def test_memory_slots(self):
+        """メモリのスロット切り替えのテスト"""
+        self.gui.on_digit("7")
+        self.gui.on_memory_store()
+
+        self.gui.on_memory_slot(2)
+        self.gui.on_digit("9")
+        self.gui.on_memory_store()
+
+        self.gui.on_memory_recall()
+        self.assertEqual(self.gui.current_input, "79")
+        self.gui.on_memory_slot(0)
+        self.gui.on_memory_recall()
+        self.assertEqual(self.gui.current_input, "7")
+
     # キーボード入力のテスト
     def test_keyboard_digit_input(self):
         """キーボードからの数字入力テスト"""
@@ -243,6 +431,45 @@ class TestCalculatorGUI(unittest.TestCase):
         self.gui.on_equals()
         self.assertEqual(self.gui.current_input, "2.5")
 
+    def test_operation_after_error(self):
+        """エラーの直後に演算子を押しても例外にならないテスト"""
+        self.gui.feed("8÷0+")
+        self.assertEqual(self.gui.current_input, "")
+        self.assertIsNone(self.gui.pending_operation)
+        self.mock_string_var.set.assert_called_with("エラー")
+
+    # プレビューのテスト
+    def test_preview_while_typing(self):
+        """入力中に計算結果がプレビューされるテスト"""
+        self.gui.feed("12+3")
+        self.assertEqual(self.gui.preview_text, "15")
+        self.gui.on_digit("0")
+        self.assertEqual(self.gui.preview_text, "42")
+        self.gui.on_backspace()
+        self.assertEqual(self.gui.preview_text, "15")
+
+    def test_preview_does_not_touch_calculator(self):
+        """プレビューでは last_result と履歴が変わらないテスト"""
+        self.gui.feed("6×7")
+        self.assertEqual(self.gui.preview_text, "42")
+        self.assertEqual(self.gui.calc.last_result, 0)
+        self.assertEqual(len(self.gui.calc.history), 0)
+
+    def test_preview_cleared(self):
+        """演算子の直後・ゼロ除算・計算後・クリアでプレビューが消えるテスト"""
+        self.gui.feed("8÷")
+        self.assertEqual(self.gui.preview_text, "")
+        self.gui.on_digit("0")
+        self.assertEqual(self.gui.preview_text, "")
+        self.gui.on_digit(".")
+        self.gui.on_digit("5")
+        self.assertEqual(self.gui.preview_text, "16")
+        self.gui.on_equals()
+        self.assertEqual(self.gui.preview_text, "")
+        self.gui.feed("+1")
+        self.gui.on_clear()
+        self.assertEqual(self.gui.preview_text, "")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Standard library imports
+import random
+import sys
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import Calculator
+from apps.calculator.dag import ExpressionGraph
+from apps.calculator.expression import ExpressionError
+from apps.calculator.power import PowerLimitError
+
+
+class TestExpressionGraph(unittest.TestCase):
+    """共通部分式を共有した一括評価のテスト"""
+
+    def setUp(self):
+        self.calc = Calculator()
+
+    def test_matches_evaluate(self):
+        """各数式の結果が1つずつ評価した場合と同じになるテスト"""
+        rng = random.Random(0)
+        atoms = ["a", "b", "c", "0", "2", "0.5", "3"]
+        texts = []
+        for _ in range(300):
+            text = rng.choice(atoms)
+            for _ in range(rng.randint(1, 4)):
+                op = rng.choice(["+", "-", "*", "/", "^"])
+                operand = rng.choice(atoms)
+                text = f"({text} {op} {operand})" if rng.random() < 0.5 else text
+                text = f"-{text}" if rng.random() < 0.1 else f"{text} {op} {operand}"
+            texts.append(text)
+        env = {"a": 1.5, "b": -2, "c": 7}
+        result = self.calc.evaluate_batch(texts, env)
+        for text, value, error in zip(texts, result.values, result.errors):
+            with self.subTest(text=text):
+                try:
+                    expected = Calculator().evaluate(text, env)
+                except Exception as e:
+                    self.assertIs(type(error), type(e))
+                    self.assertEqual(str(error), str(e))
+                    self.assertIsNone(value)
+                else:
+                    self.assertIsNone(error)
+                    self.assertEqual(value, expected)
+                    self.assertIs(type(value), type(expected))
+
+    def test_shared_subexpressions(self):
+        """同じ部分式を1回だけ計算し、省けた演算の回数を返すテスト"""
+        texts = ["(a + b) * c", "(a + b) * c + 1", "-(a + b)", "(b + a) * c"]
+        result = self.calc.evaluate_batch(texts, a=1, b=2, c=3)
+        self.assertEqual(result.values, [9, 10, -3, 9])
+        self.assertEqual(result.errors, [None] * 4)
+        # 2 + 3 + 2 + 2 回のうち a + b と (a + b) * c を共有する
+        self.assertEqual(result.operations, 9)
+        self.assertEqual(result.distinct_operations, 6)
+        self.assertEqual(result.saved_operations, 3)
+
+    def test_literal_types_are_distinct(self):
+        """1 と 1.0 を別のノードとして扱うテスト"""
+        result = self.calc.evaluate_batch(["x + 1", "x + 1.0"], x=2)
+        self.assertEqual(result.values, [3, 3.0])
+        self.assertIs(type(result.values[0]), int)
+        self.assertIs(type(result.values[1]), float)
+        self.assertEqual(result.saved_operations, 0)
+
+    def test_errors_in_input_order(self):
+        """数式ごとのエラーが入力と同じ順序で返るテスト"""
+        texts = ["a / (b - 2)", "a + 1", "a / (b - 2) + 1", "y * 2", "1 +", "2 ^ 9999"]
+        calc = Calculator(power_max_bits=64)
+        result = calc.evaluate_batch(texts, a=1, b=2)
+        self.assertEqual(result.values, [None, 2, None, None, None, None])
+        self.assertIsInstance(result.errors[0], ZeroDivisionError)
+        self.assertEqual(str(result.errors[0]), "ゼロで割ることはできません")
+        self.assertIsNone(result.errors[1])
+        self.assertIs(result.errors[2], result.errors[0])
+        self.assertIsInstance(result.errors[3], NameError)
+        self.assertIsInstance(result.errors[4], ExpressionError)
+        self.assertIsInstance(result.errors[5], PowerLimitError)
+
+    def test_long_literal(self):
+        """長すぎる数値リテラルもその数式だけのエラーになるテスト"""
+        result = self.calc.evaluate_batch(["1 + 1", "1" * 5000, "2 / 0"])
+        self.assertEqual(result.values, [2, None, None])
+        self.assertIsInstance(result.errors[1], ExpressionError)
+        self.assertIsInstance(result.errors[2], ZeroDivisionError)
+
+    def test_left_error_first(self):
+        """左右のオペランドがエラーなら左のエラーを返すテスト"""
+        result = self.calc.evaluate_batch(["x + 1 / 0", "1 / 0 + x"])
+        self.assertIsInstance(result.errors[0], NameError)
+        self.assertIsInstance(result.errors[1], ZeroDivisionError)
+
+    def test_syntax_error_adds_no_nodes(self):
+        """構文エラーの数式の途中までのノードが残らないテスト"""
+        graph = ExpressionGraph(["a * b + (c - d"])
+        self.assertEqual(graph.distinct_operations, 0)
+        self.assertEqual(graph.operations, 0)
+        self.assertEqual(graph.add("c - d"), 1)
+        self.assertEqual(graph.evaluate(c=5, d=3).values, [None, 2])
+
+    def test_reuse_graph(self):
+        """構築済みのグラフを変数を変えて評価するテスト"""
+        graph = ExpressionGraph(["x ^ 2", "x ^ 2 - 1"])
+        self.assertEqual(len(graph), 2)
+        self.assertEqual(self.calc.evaluate_batch(graph, x=3).values, [9, 8])
+        self.assertEqual(self.calc.evaluate_batch(graph, {"x": 4}).values, [16, 15])
+
+    def test_last_result(self):
+        """last_result を最後の数式の値で1回だけ更新するテスト"""
+        self.calc.evaluate_batch(["1 + 1", "2 * 3"])
+        self.assertEqual(self.calc.last_result, 6)
+        self.assertEqual(list(self.calc.history), [6])
+        self.calc.evaluate_batch(["1 + 1", "1 / 0"])
+        self.assertEqual(self.calc.last_result, 6)
+        self.calc.evaluate_batch([])
+        self.assertEqual(list(self.calc.history), [6])
+
+
+if __name__ == "__main__":
+    unittest.main()
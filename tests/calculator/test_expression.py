@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Standard library imports
+import sys
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import Calculator
+from apps.calculator.expression import (
+    ExpressionCache,
+    ExpressionError,
+    compile_expression,
+)
+
+
+class TestExpression(unittest.TestCase):
+    """数式エンジンのテスト"""
+
+    def test_operators(self):
+        """GUIの演算子とキーボードの演算子のテスト"""
+        self.assertEqual(compile_expression("5 + 3")(), 8)
+        self.assertEqual(compile_expression("10 - 4")(), 6)
+        self.assertEqual(compile_expression("7 × 6")(), 42)
+        self.assertEqual(compile_expression("7 * 6")(), 42)
+        self.assertEqual(compile_expression("20 ÷ 4")(), 5)
+        self.assertEqual(compile_expression("20 / 8")(), 2.5)
+        self.assertEqual(compile_expression("2 ^ 8")(), 256)
+
+    def test_precedence(self):
+        """演算子の優先順位と結合性のテスト"""
+        self.assertEqual(compile_expression("2 + 3 * 4")(), 14)
+        self.assertEqual(compile_expression("(2 + 3) * 4")(), 20)
+        self.assertEqual(compile_expression("2 ^ 3 ^ 2")(), 512)
+        self.assertEqual(compile_expression("-2 ^ 2")(), -4)
+        self.assertEqual(compile_expression("2 ^ -1")(), 0.5)
+        self.assertEqual(compile_expression("10 - 4 - 3")(), 3)
+
+    def test_variables(self):
+        """変数の束縛のテスト"""
+        expr = compile_expression("(a + b) * c ^ 2")
+        self.assertEqual(expr.variables, ("a", "b", "c"))
+        self.assertEqual(expr(a=1, b=2, c=3), 27)
+        self.assertEqual(expr({"a": 2, "b": 2}, c=1), 4)
+
+    def test_undefined_variable(self):
+        """未定義の変数のテスト"""
+        with self.assertRaises(NameError):
+            compile_expression("a + 1")()
+
+    def test_division_by_zero(self):
+        """ゼロ除算のテスト"""
+        with self.assertRaises(ZeroDivisionError):
+            compile_expression("1 ÷ (x - 2)")(x=2)
+
+    def test_syntax_errors(self):
+        """構文エラーのテスト"""
+        for text in ["", "1 +", "(1 + 2", "1 2", "1 $ 2", "* 3", "__import__('os')"]:
+            with self.subTest(text=text):
+                with self.assertRaises(ExpressionError):
+                    compile_expression(text)
+
+    def test_long_literal(self):
+        """int に変換できない長さの数値リテラルが構文エラーになるテスト"""
+        with self.assertRaises(ExpressionError):
+            compile_expression("1" * 5000 + " + 1")
+        self.assertEqual(compile_expression("1" * 100)(), int("1" * 100))
+
+    def test_nesting_limit(self):
+        """入れ子が深すぎる・長すぎる数式が構文エラーになるテスト"""
+        self.assertEqual(compile_expression("(" * 50 + "1" + ")" * 50)(), 1)
+        texts = [
+            "(" * 400 + "1" + ")" * 400,
+            "-" * 2000 + "1",
+            " ^ ".join(["2"] * 1000),
+            " + ".join(["1"] * 5000),
+        ]
+        for text in texts:
+            with self.subTest(text=text[:10]):
+                with self.assertRaises(ExpressionError):
+                    compile_expression(text)
+
+    def test_calculator_evaluate(self):
+        """Calculator.evaluate が last_result を更新するテスト"""
+        calc = Calculator()
+        self.assertEqual(calc.evaluate("x × 2 + 1", x=20), 41)
+        self.assertEqual(calc.last_result, 41)
+
+
+class TestExpressionCache(unittest.TestCase):
+    """LRUキャッシュのテスト"""
+
+    def test_hits_and_misses(self):
+        """ヒット数とミス数のテスト"""
+        cache = ExpressionCache(maxsize=8)
+        first = cache.get("a + 1")
+        self.assertIs(cache.get("a + 1"), first)
+        info = cache.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_lru_eviction(self):
+        """最も古く使われた数式から追い出されるテスト"""
+        cache = ExpressionCache(maxsize=2)
+        cache.get("1")
+        cache.get("2")
+        cache.get("1")  # "1" を最近使ったことにする
+        cache.get("3")  # "2" が追い出される
+        self.assertEqual(len(cache), 2)
+        cache.get("1")
+        self.assertEqual(cache.cache_info().hits, 2)
+        cache.get("2")
+        self.assertEqual(cache.cache_info().misses, 4)
+
+    def test_clear(self):
+        """キャッシュクリアのテスト"""
+        cache = ExpressionCache()
+        cache.get("1 + 1")
+        cache.clear()
+        self.assertEqual(cache.cache_info(), (0, 0, cache.maxsize, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
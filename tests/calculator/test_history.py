@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Standard library imports
+import math
+import sys
+import unittest
+from array import array
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import Calculator
+from apps.calculator.history import ResultHistory
+
+
+class TestResultHistory(unittest.TestCase):
+    """リングバッファの履歴のテスト"""
+
+    def test_append_and_wraparound(self):
+        """容量を超えると古い結果から上書きされるテスト"""
+        history = ResultHistory(capacity=3)
+        for value in range(5):
+            history.append(value)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(list(history), [2.0, 3.0, 4.0])
+        self.assertEqual(history[0], 2.0)
+        self.assertEqual(history[-1], 4.0)
+        self.assertEqual(history[1:], array("d", [3.0, 4.0]))
+        self.assertEqual(history.recent(2), array("d", [4.0, 3.0]))
+        with self.assertRaises(IndexError):
+            history[3]
+
+    def test_replay(self):
+        """古い順に再生するテスト"""
+        history = ResultHistory(capacity=4)
+        for value in [1, 2, 3]:
+            history.append(value)
+        replayed = []
+        history.replay(replayed.append)
+        self.assertEqual(replayed, [1.0, 2.0, 3.0])
+
+    def test_unrepresentable_values(self):
+        """floatにできない値のテスト"""
+        history = ResultHistory()
+        history.append(10**400)
+        history.append(-(10**400))
+        history.append("x")
+        self.assertEqual(history[0], math.inf)
+        self.assertEqual(history[1], -math.inf)
+        self.assertTrue(math.isnan(history[2]))
+
+    def test_clear(self):
+        """履歴のクリアのテスト"""
+        history = ResultHistory(capacity=2)
+        history.append(1)
+        history.clear()
+        self.assertEqual(len(history), 0)
+        self.assertEqual(history.recent(5), array("d"))
+
+
+class TestCalculatorRegisters(unittest.TestCase):
+    """複数メモリと履歴のテスト"""
+
+    def setUp(self):
+        """各テストの前に新しい電卓インスタンスを作成"""
+        self.calc = Calculator(memory_slots=3, history_size=4)
+
+    def test_history_records_results(self):
+        """計算結果が履歴に残るテスト"""
+        self.calc.add(1, 2)
+        self.calc.multiply(3, 4)
+        self.calc.clear()
+        self.assertEqual(list(self.calc.history), [3.0, 12.0])
+
+    def test_indexed_registers(self):
+        """番号付きレジスタのテスト"""
+        self.calc.add(1, 1)
+        self.calc.memory_store(1)
+        self.calc.add(2, 2)
+        self.calc.memory_store()
+        self.assertEqual(self.calc.memory_recall(1), 2)
+        self.assertEqual(self.calc.memory_recall(), 4)
+        self.assertEqual(self.calc.memory, 4)
+        self.calc.memory_clear(1)
+        self.assertEqual(self.calc.memory_recall(1), 0)
+        self.assertEqual(self.calc.memory_recall(0), 4)
+        with self.assertRaises(IndexError):
+            self.calc.memory_store(3)
+
+    def test_named_registers(self):
+        """名前付きレジスタのテスト"""
+        self.calc.multiply(6, 7)
+        self.calc.memory_store("answer")
+        self.assertEqual(self.calc.memory_recall("answer"), 42)
+        self.assertEqual(self.calc.memory_recall("missing"), 0)
+        self.calc.memory_clear_all()
+        self.assertEqual(self.calc.memory_recall("answer"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Standard library imports
+import json
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import CachedCalculator, Calculator
+from apps.calculator.metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """演算メトリクスのテスト"""
+
+    def setUp(self):
+        """各テストの前に計測付きの電卓インスタンスを作成"""
+        self.calc = Calculator()
+        self.metrics = self.calc.enable_metrics(Metrics())
+
+    def test_counts_and_errors(self):
+        """呼び出し数とエラー数のテスト"""
+        self.calc.add(1, 2)
+        self.calc.add(3, 4)
+        with self.assertRaises(ZeroDivisionError):
+            self.calc.divide(1, 0)
+        self.assertEqual(self.calc.last_result, 7)
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["add"].count, 2)
+        self.assertEqual(snapshot["divide"].count, 1)
+        self.assertEqual(snapshot["divide"].errors, {"ZeroDivisionError": 1})
+        self.assertEqual(sum(snapshot["add"].buckets), 2)
+
+    def test_disable(self):
+        """無効化するとラッパーが外れるテスト"""
+        self.calc.disable_metrics()
+        self.assertNotIn("add", self.calc.__dict__)
+        self.calc.add(1, 2)
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_subclass_counts_once(self):
+        """サブクラスの super() 呼び出しを二重に数えないテスト"""
+        calc = CachedCalculator()
+        metrics = calc.enable_metrics(Metrics())
+        calc.add(1, 2)
+        calc.add(1, 2)
+        self.assertEqual(metrics.snapshot()["add"].count, 2)
+
+    def test_threads_are_merged(self):
+        """スレッドごとの統計が集計されるテスト"""
+
+        def worker():
+            for i in range(500):
+                self.calc.multiply(i, 2)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.metrics.snapshot()["multiply"].count, 2000)
+
+    def test_prometheus_format(self):
+        """Prometheusテキスト形式のテスト"""
+        self.calc.add(1, 2)
+        with self.assertRaises(ZeroDivisionError):
+            self.calc.divide(1, 0)
+        text = self.metrics.to_prometheus()
+        self.assertIn('calculator_calls_total{op="add"} 1', text)
+        self.assertIn(
+            'calculator_errors_total{op="divide",error="ZeroDivisionError"} 1', text
+        )
+        self.assertIn('calculator_latency_seconds_bucket{op="add",le="+Inf"} 1', text)
+        self.assertIn('calculator_latency_seconds_count{op="divide"} 1', text)
+
+    def test_json_snapshot(self):
+        """JSONスナップショットのテスト"""
+        self.calc.power(2, 8)
+        data = json.loads(self.metrics.to_json())
+        self.assertEqual(data["power"]["count"], 1)
+        self.assertEqual(data["power"]["buckets"]["+Inf"], 1)
+
+    def test_reset(self):
+        """統計のリセットのテスト"""
+        self.calc.add(1, 2)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
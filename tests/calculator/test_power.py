@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Standard library imports
+import math
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import Calculator, batch
+from apps.calculator.power import PowerLimitError, bounded_power
+
+
+class TestBoundedPower(unittest.TestCase):
+    """コスト上限付き累乗のテスト"""
+
+    def test_regular_results(self):
+        """上限内の累乗は通常どおり計算されるテスト"""
+        self.assertEqual(bounded_power(2, 10), 1024)
+        self.assertEqual(bounded_power(-3, 3), -27)
+        self.assertEqual(bounded_power(10, -1), 0.1)
+        self.assertEqual(bounded_power(1, 10**12), 1)
+        self.assertEqual(bounded_power(-1, 10**12 + 1), -1)
+        self.assertEqual(bounded_power(2.0, 10), 1024.0)
+
+    def test_refuses_huge_integer_results(self):
+        """巨大な整数の累乗を拒否するテスト"""
+        with self.assertRaises(PowerLimitError):
+            bounded_power(10, 10**8)
+        with self.assertRaises(OverflowError):
+            bounded_power(2, 65, max_bits=64)
+
+    def test_float_downgrade(self):
+        """上限超過時に浮動小数点へ落とすテスト"""
+        self.assertEqual(bounded_power(2, 100, max_bits=64, overflow="float"), 2.0**100)
+        self.assertEqual(bounded_power(10, 10**8, overflow="float"), math.inf)
+        self.assertEqual(bounded_power(-10, 10**8 + 1, overflow="float"), -math.inf)
+
+    def test_custom_error(self):
+        """上限超過時の例外を差し替えるテスト"""
+        with self.assertRaises(RuntimeError):
+            bounded_power(2, 100, max_bits=64, overflow=RuntimeError)
+
+    def test_exponent_beyond_float(self):
+        """float に収まらない指数でも上限超過として扱うテスト"""
+        huge = 10**400
+        with self.assertRaises(PowerLimitError):
+            bounded_power(10, huge)
+        with self.assertRaises(RuntimeError):
+            bounded_power(10, huge, overflow=RuntimeError)
+        self.assertEqual(bounded_power(10, huge, overflow="float"), math.inf)
+        self.assertEqual(bounded_power(-10, huge + 1, overflow="float"), -math.inf)
+        self.assertEqual(bounded_power(1, huge), 1)
+
+    def test_modulus(self):
+        """べき剰余のテスト"""
+        self.assertEqual(bounded_power(3, 10**18, 1000), pow(3, 10**18, 1000))
+        with self.assertRaises(TypeError):
+            bounded_power(2.0, 3, 5)
+
+
+class TestCalculatorPowerGuard(unittest.TestCase):
+    """Calculator と一括APIの上限設定のテスト"""
+
+    def test_calculator_power(self):
+        """Calculator.power の上限とべき剰余のテスト"""
+        calc = Calculator(power_max_bits=64)
+        self.assertEqual(calc.power(2, 10, modulus=1000), 24)
+        self.assertEqual(calc.last_result, 24)
+        with self.assertRaises(PowerLimitError):
+            calc.power(2, 100)
+        self.assertEqual(calc.last_result, 24)
+
+    def test_invalid_overflow(self):
+        """不正な overflow 指定のテスト"""
+        with self.assertRaises(ValueError):
+            Calculator(power_overflow="ignore")
+
+    def test_expression_uses_guard(self):
+        """数式の累乗にも上限が適用されるテスト"""
+        calc = Calculator(power_max_bits=64, power_overflow="float")
+        self.assertEqual(calc.evaluate("2 ^ 100"), 2.0**100)
+        with self.assertRaises(PowerLimitError):
+            Calculator().evaluate("10 ^ 10 ^ 8")
+
+    def test_power_many_uses_guard(self):
+        """一括累乗にも上限が適用されるテスト"""
+        calc = Calculator(power_max_bits=64)
+        with patch.object(batch, "get_numpy", return_value=None):
+            self.assertEqual(calc.power_many([2, 3], [3, 2]), [8, 9])
+            with self.assertRaises(PowerLimitError):
+                calc.power_many([2, 2], [3, 100])
+
+
+if __name__ == "__main__":
+    unittest.main()
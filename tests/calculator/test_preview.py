@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# Standard library imports
+import math
+import sys
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator.preview import IncrementalNumber, format_preview, preview_result
+
+
+class TestIncrementalNumber(unittest.TestCase):
+    """入力中の数値の差分更新のテスト"""
+
+    def type_text(self, text):
+        number = IncrementalNumber()
+        for ch in text:
+            number.push(ch)
+        return number
+
+    def test_push_matches_float(self):
+        """1文字ずつ追加した値が float() と一致するテスト"""
+        for text in ["0", "7", "123", "0.1", "3.14159", "12.50", "0.000001"]:
+            with self.subTest(text=text):
+                number = self.type_text(text)
+                self.assertEqual(number.text, text)
+                self.assertEqual(number.value, float(text))
+
+    def test_push_rules(self):
+        """先頭の0の置き換えと小数点の重複のテスト"""
+        self.assertEqual(self.type_text("007").text, "7")
+        self.assertEqual(self.type_text(".5").text, "0.5")
+        self.assertEqual(self.type_text("1..2.3").text, "1.23")
+
+    def test_pop(self):
+        """末尾の削除で値が戻るテスト"""
+        number = self.type_text("12.34")
+        expected = ["12.3", "12.", "12", "1", ""]
+        for text in expected:
+            number.pop()
+            self.assertEqual(number.text, text)
+            self.assertEqual(number.value, float(text) if text else None)
+        number.pop()
+        self.assertEqual(number.text, "")
+        self.assertFalse(number)
+
+    def test_reset(self):
+        """計算結果の文字列から作り直すテスト"""
+        for text in ["-2.5", "1.5e-07", "inf", "-0"]:
+            with self.subTest(text=text):
+                self.assertEqual(IncrementalNumber(text).value, float(text))
+        self.assertIsNone(IncrementalNumber("-").value)
+        self.assertIsNone(IncrementalNumber("エラー").value)
+
+    def test_push_after_result(self):
+        """計算結果の後ろに数字を続けるテスト"""
+        number = IncrementalNumber("-2.5")
+        number.push("1")
+        self.assertEqual(number.value, -2.51)
+        number = IncrementalNumber("1.5e-07")
+        number.push("1")
+        self.assertEqual(number.value, float("1.5e-071"))
+        number.pop()
+        self.assertEqual(number.value, 1.5e-07)
+
+    def test_huge_input(self):
+        """floatに収まらない桁数は inf になるテスト"""
+        number = self.type_text("9" * 400)
+        self.assertEqual(number.value, math.inf)
+
+
+class TestPreviewResult(unittest.TestCase):
+    """プレビューの計算と表示のテスト"""
+
+    def test_operations(self):
+        """四則演算と累乗のプレビュー"""
+        self.assertEqual(preview_result(2.0, "+", 3.0), 5.0)
+        self.assertEqual(preview_result(2.0, "-", 3.0), -1.0)
+        self.assertEqual(preview_result(2.0, "×", 3.0), 6.0)
+        self.assertEqual(preview_result(3.0, "÷", 2.0), 1.5)
+        self.assertEqual(preview_result(2.0, "^", 10.0), 1024.0)
+
+    def test_no_preview(self):
+        """計算できない場合は None"""
+        self.assertIsNone(preview_result(None, "+", 1.0))
+        self.assertIsNone(preview_result(1.0, None, 1.0))
+        self.assertIsNone(preview_result(1.0, "+", None))
+        self.assertIsNone(preview_result(1.0, "÷", 0.0))
+        self.assertIsNone(preview_result(10.0, "^", 1e9))
+
+    def test_format(self):
+        """整数は整数として、表示できない値は空文字"""
+        self.assertEqual(format_preview(10.0), "10")
+        self.assertEqual(format_preview(2.5), "2.5")
+        self.assertEqual(format_preview(None), "")
+        self.assertEqual(format_preview(math.inf), "")
+        self.assertEqual(format_preview(complex(1, 1)), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
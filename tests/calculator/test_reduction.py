@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# Standard library imports
+import math
+import random
+import statistics
+import sys
+import tracemalloc
+import unittest
+from array import array
+from decimal import Decimal
+from fractions import Fraction
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import Calculator, reduction
+
+
+def exact_float(value):
+    """Fraction を float に丸める（範囲外は inf）"""
+    try:
+        return float(value)
+    except OverflowError:
+        return math.copysign(math.inf, 1 if value > 0 else -1)
+
+
+class TestReduction(unittest.TestCase):
+    """ストリームの集約のテスト"""
+
+    def setUp(self):
+        self.calc = Calculator()
+        rng = random.Random(0)
+        self.values = [
+            rng.uniform(-1, 1) * 10 ** rng.randint(-10, 10) for _ in range(20000)
+        ]
+
+    def test_sum_exact(self):
+        """総和が正しく丸めた値になるテスト（チャンクをまたぐ場合を含む）"""
+        self.assertEqual(self.calc.sum([0.1] * 10), 1.0)
+        self.assertEqual(self.calc.sum(self.values), math.fsum(self.values))
+        exact = exact_float(sum(map(Fraction, self.values)))
+        self.assertEqual(self.calc.sum(iter(self.values)), exact)
+        self.assertEqual(self.calc.sum([1e100, 1.0, -1e100] * 5000), 5000.0)
+
+    def test_sum_types(self):
+        """整数は整数のまま、その他の型は通常の + で足すテスト"""
+        self.assertEqual(self.calc.sum(range(10**6)), 499999500000)
+        self.assertIsInstance(self.calc.sum(range(10)), int)
+        self.assertEqual(self.calc.sum([10**30, 1, -(10**30)]), 1)
+        self.assertEqual(self.calc.sum([Fraction(1, 3)] * 3), 1)
+        self.assertEqual(self.calc.sum([Decimal("0.1")] * 3), Decimal("0.3"))
+        self.assertEqual(self.calc.sum([]), 0)
+        self.assertEqual(self.calc.sum(array("d", [0.1] * 10)), 1.0)
+        self.assertEqual(self.calc.sum([1e308, 1e308]), math.inf)
+        self.assertTrue(math.isnan(self.calc.sum([math.inf, -math.inf])))
+
+    def test_product_scaling(self):
+        """途中でオーバーフロー・アンダーフローしないテスト"""
+        self.assertEqual(self.calc.product([1e-300] * 3 + [1e300] * 2), 1e-300)
+        self.assertEqual(self.calc.product([2.0] * 1100 + [0.5] * 1100), 1.0)
+        self.assertEqual(self.calc.product([10**400, 1e-300]), 1e100)
+        self.assertEqual(self.calc.product([2.0] * 2000), math.inf)
+        self.assertEqual(self.calc.product([-2.0] * 2001), -math.inf)
+        self.assertEqual(self.calc.product([0.5] * 2000), 0.0)
+        self.assertTrue(math.isnan(self.calc.product([0.0, math.inf])))
+        self.assertEqual(self.calc.product(range(1, 21)), math.factorial(20))
+        self.assertEqual(self.calc.product([Fraction(1, 2)] * 3), Fraction(1, 8))
+        self.assertEqual(self.calc.product([]), 1)
+
+    def test_product_accuracy(self):
+        """桁の大きく異なる値の総乗が正確に求まるテスト"""
+        rng = random.Random(1)
+        for scale in (1, 10, 300):
+            values = [
+                rng.choice((-1, 1)) * 10 ** rng.uniform(-scale, scale)
+                for _ in range(1500)
+            ]
+            exact = 1
+            for value in values:
+                exact *= Fraction(value)
+            expected = exact_float(exact)
+            actual = self.calc.product(values)
+            if expected == 0 or math.isinf(expected):
+                self.assertEqual(actual, expected)
+            else:
+                self.assertLess(abs(actual - expected), 1e-12 * abs(expected))
+
+    def test_mean_variance(self):
+        """平均・分散が statistics と一致するテスト"""
+        rng = random.Random(2)
+        values = [rng.gauss(1e9, 1) for _ in range(20000)]
+        self.assertAlmostEqual(
+            self.calc.mean(values), statistics.fmean(values), delta=1e-6
+        )
+        expected = statistics.pvariance(values)
+        self.assertLess(abs(self.calc.variance(values) - expected), 1e-8 * expected)
+        expected = statistics.variance(values)
+        self.assertLess(abs(self.calc.variance(values, 1) - expected), 1e-8 * expected)
+        self.assertEqual(self.calc.mean(range(5)), 2.0)
+        self.assertEqual(self.calc.variance([3]), 0.0)
+        with self.assertRaises(ValueError):
+            self.calc.mean([])
+        with self.assertRaises(ValueError):
+            self.calc.variance([3], ddof=1)
+
+    def test_last_result_updated_once(self):
+        """last_result は最後に1回だけ更新されるテスト"""
+        before = len(self.calc.history)
+        self.assertEqual(self.calc.sum(range(10000)), 49995000)
+        self.assertEqual(self.calc.last_result, 49995000)
+        self.assertEqual(len(self.calc.history), before + 1)
+        with self.assertRaises(ValueError):
+            self.calc.mean(iter([]))
+        self.assertEqual(self.calc.last_result, 49995000)
+
+    def test_constant_memory(self):
+        """ジェネレータを要素数によらないメモリで集約するテスト"""
+        for method in (self.calc.sum, self.calc.product, self.calc.variance):
+            # ピークを測り直すために計測を開始し直す（reset_peak は 3.9 以降）
+            tracemalloc.start()
+            try:
+                method(1.0 + i * 1e-9 for i in range(50000))
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            self.assertLess(peak, 1024 * 1024)
+
+    def test_chunks(self):
+        """チャンクに分けるテスト"""
+        chunks = list(reduction.chunks(range(10), size=4))
+        self.assertEqual(chunks, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+
+    def test_metrics(self):
+        """集約メソッドも計測の対象になるテスト"""
+        # Local application imports
+        from apps.calculator.metrics import Metrics
+
+        metrics = self.calc.enable_metrics(Metrics())
+        self.calc.sum([1, 2])
+        self.calc.mean([1, 2])
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["sum"].count, 1)
+        self.assertEqual(snapshot["mean"].count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# Standard library imports
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator import Calculator
+from apps.calculator.client import CalculatorClient, ServerError, run_load
+from apps.calculator.server import CalculatorServer, dispatch, handle_line
+
+
+class TestDispatch(unittest.TestCase):
+    """リクエスト処理のテスト"""
+
+    def setUp(self):
+        """各テストの前に新しい電卓インスタンスを作成"""
+        self.calc = Calculator()
+
+    def test_operations(self):
+        """演算リクエストのテスト"""
+        response = dispatch(self.calc, {"id": 1, "op": "add", "args": [2, 3]})
+        self.assertEqual(response, {"id": 1, "result": 5})
+        response = dispatch(
+            self.calc, {"id": 2, "op": "evaluate", "args": ["x ^ 2", {"x": 3}]}
+        )
+        self.assertEqual(response["result"], 9)
+
+    def test_errors(self):
+        """エラー応答のテスト"""
+        cases = [
+            ({"id": 1, "op": "divide", "args": [1, 0]}, "ZeroDivisionError"),
+            ({"id": 2, "op": "__init__", "args": []}, "RequestError"),
+            ({"id": 3, "op": "add", "args": [1]}, "RequestError"),
+            ({"id": 4, "op": "add", "args": ["1", 2]}, "RequestError"),
+            ([1, 2], "RequestError"),
+            ({"id": 5, "op": "evaluate", "args": [5]}, "RequestError"),
+            ({"id": 6, "op": "evaluate", "args": ["x", [1]]}, "RequestError"),
+            (
+                {"id": 7, "op": "evaluate", "args": ["x * 3", {"x": "ab"}]},
+                "RequestError",
+            ),
+            ({"id": 8, "op": "evaluate", "args": ["x", {"x": [1]}]}, "RequestError"),
+            ({"id": 9, "op": "evaluate", "args": ["x", {"x": True}]}, "RequestError"),
+        ]
+        for request, error_type in cases:
+            with self.subTest(request=request):
+                response = dispatch(self.calc, request)
+                self.assertEqual(response["error"]["type"], error_type)
+
+    def test_unrepresentable_results(self):
+        """JSONの数値で表せない結果がエラー応答になるテスト"""
+        nested = "(" * 500 + "1" + ")" * 500
+        cases = [
+            ({"id": 1, "op": "power", "args": [10, 5000]}, "ResultError"),
+            ({"id": 2, "op": "power", "args": [-8, 0.5]}, "ResultError"),
+            ({"id": 3, "op": "multiply", "args": [1e308, 10]}, "ResultError"),
+            ({"id": 4, "op": "evaluate", "args": [nested]}, "ExpressionError"),
+        ]
+        for request, error_type in cases:
+            with self.subTest(request=request["op"]):
+                response = dispatch(self.calc, request)
+                self.assertEqual(response["id"], request["id"])
+                self.assertEqual(response["error"]["type"], error_type)
+        self.assertEqual(
+            dispatch(self.calc, {"id": 5, "op": "power", "args": [10, 4299]}),
+            {"id": 5, "result": 10**4299},
+        )
+        for result in ["ab", [1], True, None]:
+            with self.subTest(result=result):
+                with patch.object(self.calc, "add", return_value=result):
+                    response = dispatch(
+                        self.calc, {"id": 6, "op": "add", "args": [1, 2]}
+                    )
+                self.assertEqual(response["error"]["type"], "ResultError")
+
+    def test_handle_line_always_responds(self):
+        """どんな行にも正しいJSONの応答を1行返すテスト"""
+        lines = [
+            b'{"id": NaN, "op": "add", "args": [1, 2]}',
+            b'{"id": 1, "op": "add", "args": [Infinity, 1]}',
+            b"[" * 100000,
+            b'{"id": 1, "op": "evaluate", "args": [5]}',
+        ]
+        for line in lines:
+            with self.subTest(line=line[:20]):
+                response = json.loads(handle_line(self.calc, line))
+                self.assertIn("error", response)
+
+
+class TestCalculatorServer(unittest.IsolatedAsyncioTestCase):
+    """計算サーバーのテスト"""
+
+    async def asyncSetUp(self):
+        """空きポートでサーバーを起動"""
+        self.server = CalculatorServer()
+        await self.server.start(port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        """サーバーを停止"""
+        await self.server.close()
+
+    async def test_pipelined_requests(self):
+        """パイプラインで送ったリクエストが順に返るテスト"""
+        async with await CalculatorClient.connect(port=self.port) as client:
+            futures = [client.send("multiply", i, 2) for i in range(100)]
+            await client.drain()
+            results = await asyncio.gather(*futures)
+        self.assertEqual(results, [i * 2 for i in range(100)])
+
+    async def test_session_memory(self):
+        """メモリが接続ごとに独立しているテスト"""
+        async with await CalculatorClient.connect(port=self.port) as first:
+            async with await CalculatorClient.connect(port=self.port) as second:
+                await first.call("add", 40, 2)
+                self.assertEqual(await first.call("memory_store"), 42)
+                self.assertEqual(await second.call("memory_recall"), 0)
+                self.assertEqual(await first.call("memory_recall"), 42)
+
+    async def test_error_response(self):
+        """エラーが例外として返るテスト"""
+        async with await CalculatorClient.connect(port=self.port) as client:
+            with self.assertRaises(ServerError) as ctx:
+                await client.call("divide", 1, 0)
+            self.assertEqual(ctx.exception.error_type, "ZeroDivisionError")
+            self.assertEqual(await client.call("add", 1, 1), 2)
+
+    async def test_error_keeps_pipeline(self):
+        """エンコードできない結果の後ろのリクエストも処理されるテスト"""
+        async with await CalculatorClient.connect(port=self.port) as client:
+            first = client.send("power", 10, 5000)
+            second = client.send("add", 1, 2)
+            await client.drain()
+            with self.assertRaises(ServerError) as ctx:
+                await first
+            self.assertEqual(ctx.exception.error_type, "ResultError")
+            self.assertEqual(await second, 3)
+
+    async def test_load_generator(self):
+        """負荷生成ツールのテスト"""
+        stats = await run_load(
+            lambda: CalculatorClient.connect(port=self.port),
+            connections=20,
+            requests=50,
+            depth=8,
+        )
+        self.assertEqual(stats["requests"], 1000)
+        self.assertEqual(stats["errors"], 0)
+
+
+@unittest.skipUnless(hasattr(asyncio, "start_unix_server"), "Unixソケット非対応")
+class TestCalculatorUnixServer(unittest.IsolatedAsyncioTestCase):
+    """Unixソケットのテスト"""
+
+    async def test_unix_socket(self):
+        """Unixソケット経由の計算テスト"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "calc.sock")
+            server = CalculatorServer()
+            await server.start(unix_path=path)
+            try:
+                async with await CalculatorClient.connect_unix(path) as client:
+                    self.assertEqual(await client.call("power", 2, 10, 1000), 24)
+            finally:
+                await server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
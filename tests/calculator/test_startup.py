@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Standard library imports
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+
+# 読み込み時間の上限（マイクロ秒、-X importtime の累積時間）
+# 遅いCIでも誤検知しないよう、手元の計測値の数倍に設定している
+IMPORT_BUDGET_US = {
+    "apps.calculator": 5000,
+    "apps.calculator.calculator": 50000,
+    "apps.calculator.cli": 60000,
+}
+
+# GUI以外の経路で読み込まれてはいけないモジュール
+FORBIDDEN_MODULES = ("tkinter", "_tkinter", "multiprocessing", "concurrent")
+
+
+def import_times(args, stdin=""):
+    """python -X importtime を実行して {モジュール名: 累積マイクロ秒} を返す
+
+    バイトコードのキャッシュを一時ディレクトリに作ってから計測する
+    （コンパイルの時間は含めない）。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=tmp, PYTHONPATH=str(ROOT))
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        command = [sys.executable, "-X", "importtime", *args]
+        for _ in range(2):
+            completed = subprocess.run(
+                command,
+                input=stdin,
+                capture_output=True,
+                text=True,
+                cwd=ROOT,
+                env=env,
+                check=True,
+            )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times, completed.stdout
+
+
+class TestStartup(unittest.TestCase):
+    """起動時間と読み込むモジュールのテスト"""
+
+    def assert_no_forbidden(self, times):
+        for name in times:
+            self.assertNotIn(
+                name.split(".")[0], FORBIDDEN_MODULES, f"{name} が読み込まれています"
+            )
+
+    def test_package_import_is_lazy(self):
+        """import apps.calculator だけでは何も読み込まないテスト"""
+        times, _ = import_times(["-c", "import apps.calculator"])
+        self.assertNotIn("apps.calculator.calculator", times)
+        self.assertLessEqual(
+            times["apps.calculator"], IMPORT_BUDGET_US["apps.calculator"]
+        )
+
+    def test_calculator_import(self):
+        """Calculator を使ってもGUIやプロセスプールを読み込まないテスト"""
+        code = "from apps.calculator import Calculator; print(Calculator().add(1, 2))"
+        times, stdout = import_times(["-c", code])
+        self.assertEqual(stdout, "3\n")
+        self.assert_no_forbidden(times)
+        self.assertLessEqual(
+            times["apps.calculator.calculator"],
+            IMPORT_BUDGET_US["apps.calculator.calculator"],
+        )
+
+    def test_headless_startup(self):
+        """--headless は argparse も読み込まずに起動するテスト"""
+        times, stdout = import_times(
+            ["-m", "apps.calculator", "--headless"], stdin="6 × 7\n"
+        )
+        self.assertEqual(stdout, "42\n")
+        self.assert_no_forbidden(times)
+        self.assertNotIn("argparse", times)
+        self.assertLessEqual(
+            times["apps.calculator.cli"], IMPORT_BUDGET_US["apps.calculator.cli"]
+        )
+
+    def test_batch_mode(self):
+        """一括評価（1プロセス）でもGUIやプロセスプールを読み込まないテスト"""
+        times, stdout = import_times(["-m", "apps.calculator"], stdin="2 ^ 8\n")
+        self.assertEqual(stdout, "256\n")
+        self.assert_no_forbidden(times)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# Standard library imports
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# tkinterをモック化（GUIテスト環境がない場合でもテスト可能に）
+sys.modules["tkinter"] = MagicMock()
+sys.modules["tkinter.ttk"] = MagicMock()
+
+# Local application imports
+from apps.calculator import trace
+from apps.calculator.calculator_gui import CalculatorGUI
+
+
+class FakeClock:
+    """呼び出すたびに step 秒進む時計"""
+
+    def __init__(self, step=0.001):
+        self.now = 0.0
+        self.step = step
+        self.sleeps = []
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def create_gui(recorder=None):
+    """モックのrootでGUIインスタンスを作成"""
+    root = Mock()
+    root.after_idle = Mock(side_effect=lambda func, *args: func(*args))
+    with patch("apps.calculator.calculator_gui.tk.StringVar", return_value=Mock()):
+        return CalculatorGUI(root, recorder=recorder)
+
+
+def play_session(gui):
+    """メモリ操作やバックスペースを含む入力"""
+    gui.on_digit("1")
+    gui.on_digit("2")
+    gui.on_backspace()
+    gui.on_digit("5")
+    gui.on_operation("×")
+    gui.append_digits("4")
+    gui.on_equals()
+    gui.on_memory_slot(3)
+    gui.on_memory_store()
+    gui.on_clear()
+    gui.on_memory_recall()
+    gui.on_operation("÷")
+    gui.on_digit("0")
+    gui.on_equals()
+
+
+class TestTrace(unittest.TestCase):
+    """キー入力の記録と再生のテスト"""
+
+    def record_session(self):
+        recorder = trace.TraceRecorder(clock=FakeClock(0.25))
+        gui = create_gui(recorder)
+        play_session(gui)
+        return recorder, gui
+
+    def test_record(self):
+        """ハンドラの呼び出しが経過時間と一緒に記録されるテスト"""
+        recorder, gui = self.record_session()
+        self.assertEqual(
+            recorder.events[:6],
+            [
+                (0, "d", "1"),
+                (250000, "d", "2"),
+                (250000, "b", None),
+                (250000, "d", "5"),
+                (250000, "o", "×"),
+                (250000, "a", "4"),
+            ],
+        )
+        self.assertEqual(len(recorder.events), 14)
+        # 記録中もハンドラは通常どおり動く
+        self.assertEqual(gui.calc.memory_recall(3), 60)
+
+    def test_format_roundtrip(self):
+        """保存したトレースを読み込むと同じイベントになるテスト"""
+        recorder, _ = self.record_session()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "session.trace"
+            recorder.save(path)
+            text = path.read_text(encoding="utf-8")
+            self.assertTrue(text.startswith(trace.TRACE_HEADER + "\n"))
+            self.assertIn("250000 s 3\n", text)
+            self.assertEqual(trace.load_trace(path), recorder.events)
+
+    def test_parse_errors(self):
+        """不正な行はエラーになるテスト"""
+        with self.assertRaises(ValueError):
+            trace.parse_trace(["0 x"])
+        with self.assertRaises(ValueError):
+            trace.parse_trace(["0 d"])
+
+    def test_replay_reproduces_state(self):
+        """再生すると記録時と同じ最終状態になるテスト"""
+        recorder, original = self.record_session()
+        report = trace.replay(create_gui(), recorder.events)
+        self.assertEqual(report.checksum, trace.state_checksum(original))
+        summary = report.summary()
+        self.assertEqual(summary["on_digit"]["count"], 4)
+        self.assertEqual(summary["all"]["count"], 14)
+        self.assertLessEqual(summary["all"]["p50"], summary["all"]["max"])
+
+    def test_checksum_detects_difference(self):
+        """最終状態が違えばチェックサムも変わるテスト"""
+        events = trace.parse_trace(["0 d 1", "0 o +", "0 d 2", "0 ="])
+        other = trace.parse_trace(["0 d 1", "0 o +", "0 d 3", "0 ="])
+        self.assertNotEqual(
+            trace.replay(create_gui(), events).checksum,
+            trace.replay(create_gui(), other).checksum,
+        )
+
+    def test_replay_realtime(self):
+        """記録時の間隔どおりに再生するテスト"""
+        clock = FakeClock(0.0)
+        events = trace.parse_trace(["0 d 1", "500000 d 2", "250000 ="])
+        trace.replay(
+            create_gui(), events, realtime=True, clock=clock, sleep=clock.sleep
+        )
+        self.assertEqual(clock.sleeps, [0.5, 0.25])
+
+    def test_replay_waits_for_background(self):
+        """バックグラウンドの計算を待ってから次のイベントに進むテスト"""
+        events = trace.parse_trace(["0 d 2", "0 o ^", "0 a 70000", "0 o +"])
+        events += trace.parse_trace(["0 d 1", "0 ="])
+        gui = create_gui()
+        report = trace.replay(gui, events)
+        self.assertEqual(gui.calc.last_result, 2**70000 + 1)
+        self.assertEqual(report.checksum, trace.replay(create_gui(), events).checksum)
+
+    def test_record_keys_pressed_while_busy(self):
+        """計算中に押したキーを二重に記録しないテスト"""
+        recorder = trace.TraceRecorder(clock=FakeClock())
+        gui = create_gui(recorder)
+        gui.feed("2^70000")
+        gui.on_operation("+")
+        self.assertTrue(gui.evaluator.busy)
+        gui.on_digit("1")
+        gui.on_equals()
+        trace._wait_background(gui, lambda seconds: None)
+        self.assertEqual(gui.calc.last_result, 2**70000 + 1)
+        codes = [code for _, code, _ in recorder.events]
+        self.assertEqual(codes, ["a", "o", "a", "o", "a", "="])
+        report = trace.replay(create_gui(), recorder.events)
+        self.assertEqual(report.checksum, trace.state_checksum(gui))
+
+    def test_percentile(self):
+        """最近順位法の分位のテスト"""
+        values = list(range(1, 101))
+        self.assertEqual(trace.percentile(values, 0.5), 50)
+        self.assertEqual(trace.percentile(values, 0.99), 99)
+        self.assertEqual(trace.percentile(values, 1.0), 100)
+        self.assertEqual(trace.percentile([], 0.5), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
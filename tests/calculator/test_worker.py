@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Standard library imports
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.calculator.power import bounded_power
+from apps.calculator.worker import BackgroundEvaluator
+
+
+class TestBackgroundEvaluator(unittest.TestCase):
+    """バックグラウンド評価器のテスト"""
+
+    def test_thread_result(self):
+        """スレッドで計算した結果を受け取るテスト"""
+        evaluator = BackgroundEvaluator()
+        self.assertIsNone(evaluator.poll())
+        evaluator.submit(bounded_power, 2, 10)
+        self.assertTrue(evaluator.busy)
+        job = evaluator.wait(timeout=5)
+        self.assertEqual(job.value, 1024)
+        self.assertIsNone(job.error)
+        self.assertFalse(evaluator.busy)
+
+    def test_thread_error(self):
+        """例外がJobResultとして返るテスト"""
+        evaluator = BackgroundEvaluator()
+        evaluator.submit(bounded_power, 10, 10**8)
+        job = evaluator.wait(timeout=5)
+        self.assertIsInstance(job.error, OverflowError)
+
+    def test_cancel_discards_result(self):
+        """キャンセルしたジョブの結果が捨てられるテスト"""
+        release = threading.Event()
+        evaluator = BackgroundEvaluator()
+        evaluator.submit(lambda: release.wait(5) and "old")
+        evaluator.cancel()
+        self.assertFalse(evaluator.busy)
+        evaluator.submit(lambda: "new")
+        release.set()
+        self.assertEqual(evaluator.wait(timeout=5).value, "new")
+
+    def test_process_mode(self):
+        """プロセスで計算し、キャンセルで終了させるテスト"""
+        evaluator = BackgroundEvaluator(mode="process")
+        evaluator.submit(time.sleep, 30)
+        evaluator.cancel()
+        self.assertFalse(evaluator.busy)
+
+        evaluator.submit(bounded_power, 3, 4)
+        self.assertEqual(evaluator.wait(timeout=30).value, 81)
+
+    def test_invalid_mode(self):
+        """不正なモードのテスト"""
+        with self.assertRaises(ValueError):
+            BackgroundEvaluator(mode="fiber")
+
+
+if __name__ == "__main__":
+    unittest.main()
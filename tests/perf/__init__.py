@@ -0,0 +1,2 @@
+# テストパッケージ
+"""ベンチマーク（benchmarks/）のテストパッケージ"""
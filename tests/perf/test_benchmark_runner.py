@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Standard library imports
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from benchmarks import runner
+
+
+class TestRunner(unittest.TestCase):
+    """ベンチマーク実行とベースライン比較のテスト"""
+
+    def test_measure_calls_setup(self):
+        """setup が計測前に呼ばれるテスト"""
+        calls = []
+
+        def bench(size):
+            calls.append(("run", size))
+            return size
+
+        bench.setup = lambda size: calls.append(("setup", size))
+        result = runner.measure(bench, 10, repeat=2)
+        self.assertEqual(calls, [("setup", 10), ("run", 10), ("run", 10)])
+        self.assertEqual(result["ops"], 10)
+
+    def test_baseline_roundtrip_and_compare(self):
+        """ベースラインの保存・読み込みと性能低下の検出テスト"""
+        baseline = {
+            "fast": {"ops": 1, "seconds": 1, "ops_per_sec": 100.0},
+            "slow": {"ops": 1, "seconds": 1, "ops_per_sec": 100.0},
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "baseline.json"
+            runner.save_baseline(path, baseline)
+            loaded = runner.load_baseline(path)
+        self.assertEqual(loaded, baseline)
+
+        results = {
+            "fast": {"ops_per_sec": 90.0},
+            "slow": {"ops_per_sec": 70.0},
+            "new": {"ops_per_sec": 1.0},
+        }
+        regressions = runner.compare(results, loaded, threshold=0.2)
+        self.assertEqual(regressions, [("slow", 100.0, 70.0)])
+
+    def test_missing_baseline(self):
+        """ベースラインがない場合のテスト"""
+        self.assertEqual(runner.load_baseline("/nonexistent/baseline.json"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
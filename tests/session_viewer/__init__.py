@@ -0,0 +1 @@
+"""セッションログビューアのテストパッケージ"""
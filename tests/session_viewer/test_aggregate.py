@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# Standard library imports
+import gzip
+import io
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import aggregate
+from apps.session_viewer.cli import main
+
+
+def _session(day, tools):
+    lines = [
+        {"type": "user", "timestamp": f"{day}T10:00:00Z", "message": {"content": "hi"}},
+        {"type": "assistant", "message": {"content": "hello"}},
+    ]
+    lines += [{"type": "tool_use", "name": name, "input": {}} for name in tools]
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+
+class TestAggregate(unittest.TestCase):
+    """複数セッションの集計のテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "a").mkdir()
+        (self.root / "b").mkdir()
+        self.paths = []
+        for i in range(20):
+            path = self.root / "ab"[i % 2] / f"s{i:02}.jsonl"
+            day = "2025-01-01" if i < 15 else "2025-01-02"
+            path.write_text(_session(day, ["Bash"] * i + ["Read"]))
+            self.paths.append(str(path))
+        (self.root / "a" / "notes.txt").write_text("not a session\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_summarize_file(self):
+        """1ファイルの集計のテスト"""
+        path = self.root / "mixed.jsonl"
+        path.write_text(_session("2025-03-04", ["Bash"]) + "broken\n[1]\n")
+        stats = aggregate.summarize_file(path, aggregate.SessionStats())
+        self.assertEqual(stats.files, 1)
+        self.assertEqual(stats.lines, 5)
+        self.assertEqual(stats.invalid_lines, 2)
+        self.assertEqual(stats.types, {"user": 1, "assistant": 1, "tool_use": 1})
+        self.assertEqual(stats.sessions_per_day, {"2025-03-04": 1})
+        self.assertEqual(stats.largest[0][0], path.stat().st_size)
+
+    def test_unreadable_file(self):
+        """読めないファイルを数えるテスト"""
+        stats = aggregate.summarize_files([self.root / "missing.jsonl"])
+        self.assertEqual(stats.files, 0)
+        self.assertEqual(stats.unreadable_files, 1)
+
+    def test_file_failing_midway(self):
+        """途中で読めなくなったファイルの集計を加えないテスト"""
+        line = json.dumps({"type": "user", "message": {"content": "x" * 100}}) + "\n"
+        data = gzip.compress((line * 30000).encode(), compresslevel=0)
+        path = self.root / "truncated.jsonl.gz"
+        path.write_bytes(data[: len(data) // 2])
+        stats = aggregate.summarize_file(path, aggregate.SessionStats())
+        self.assertEqual(stats.unreadable_files, 1)
+        self.assertEqual((stats.files, stats.lines, stats.bytes), (0, 0, 0))
+        self.assertEqual(stats.types, {})
+
+    def test_merge(self):
+        """分けて集計して足し合わせても同じ結果になるテスト"""
+        whole = aggregate.summarize_files(self.paths, top=3)
+        merged = aggregate.SessionStats(top=3)
+        for shard in aggregate.shards(self.paths, size=3):
+            merged.merge(aggregate.summarize_files(shard, top=3))
+        self.assertEqual(merged.to_dict(), whole.to_dict())
+        self.assertEqual(len(merged.largest), 3)
+        self.assertEqual(merged.largest[0][2], self.paths[-1])
+
+    def test_find_sessions(self):
+        """ディレクトリ・glob・ファイルの列挙のテスト"""
+        found = list(aggregate.find_sessions([self.tmp.name]))
+        self.assertEqual(sorted(found), sorted(self.paths))
+        pattern = str(self.root / "**" / "s1*.jsonl")
+        self.assertEqual(len(list(aggregate.find_sessions([pattern]))), 10)
+        self.assertEqual(list(aggregate.find_sessions(["x.jsonl"])), ["x.jsonl"])
+        found = list(aggregate.find_sessions([self.tmp.name], pattern="*.txt"))
+        self.assertEqual(len(found), 1)
+
+    def test_aggregate(self):
+        """並列でも直列でも同じ結果になるテスト"""
+        serial = aggregate.aggregate(iter(self.paths), workers=1)
+        parallel = aggregate.aggregate(iter(self.paths), workers=2)
+        self.assertEqual(parallel.to_dict(), serial.to_dict())
+        self.assertEqual(serial.files, 20)
+        self.assertEqual(serial.tools, {"Bash": sum(range(20)), "Read": 20})
+        self.assertEqual(serial.sessions_per_day, {"2025-01-01": 15, "2025-01-02": 5})
+
+    def test_progress(self):
+        """足し込むたびに進捗が通知されるテスト"""
+        seen = []
+        aggregate.aggregate(self.paths, on_progress=lambda s: seen.append(s.files))
+        self.assertEqual(seen, [8, 16, 20])
+
+    def test_cli(self):
+        """aggregate サブコマンドのテスト"""
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main(["aggregate", self.tmp.name, "-j", "1", "--json"]), 0)
+        result = json.loads(out.getvalue())
+        self.assertEqual(result["files"], 20)
+        self.assertEqual(len(result["largest_sessions"]), aggregate.DEFAULT_TOP)
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main(["aggregate", self.tmp.name, "-j", "1", "--top", "2"])
+        self.assertIn("Sessions: 20", out.getvalue())
+        self.assertIn("Read", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
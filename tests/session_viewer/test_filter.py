@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# Standard library imports
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer.cli import main
+from apps.session_viewer.filter import RecordFilter
+
+
+def line(data, ensure_ascii=False):
+    return (json.dumps(data, ensure_ascii=ensure_ascii) + "\n").encode("utf-8")
+
+
+def tool(name, command, i=0):
+    return {
+        "type": "tool_use",
+        "timestamp": f"2025-01-01T10:00:{i:02d}Z",
+        "name": name,
+        "input": {"command": command},
+    }
+
+
+def user(text, i=0):
+    return {
+        "type": "user",
+        "timestamp": f"2025-01-01T10:00:{i:02d}Z",
+        "message": {"content": text},
+    }
+
+
+class TestRecordFilter(unittest.TestCase):
+    """デコード前のバイト列による絞り込みのテスト"""
+
+    def test_rejects_without_decoding(self):
+        """条件の文字列を含まない行はデコードしないテスト"""
+        lines = [line(user(f"質問 {i}")) for i in range(9)]
+        lines.append(line(tool("Bash", "pytest")))
+        record_filter = RecordFilter(tools=["Bash"])
+        matched = [record_filter.decode(raw) for raw in lines]
+        self.assertEqual(sum(data is not None for data in matched), 1)
+        self.assertEqual(record_filter.lines, 10)
+        self.assertEqual(record_filter.decoded, 1)
+
+    def test_candidates_are_confirmed(self):
+        """文字列が別の場所に現れるだけの行は一致しないテスト"""
+        record_filter = RecordFilter(types=["tool_use"], grep="ls")
+        self.assertIsNone(record_filter.decode(line(user('"tool_use" ls'))))
+        other_field = line({"type": "user", "ls": "tool_use"})
+        self.assertIsNone(record_filter.decode(other_field))
+        self.assertIsNone(record_filter.decode(line(tool("Bash", "pwd"))))
+        self.assertIsNone(record_filter.decode(b'{"type": "tool_use", "ls": 1}\n'))
+        self.assertIsNotNone(record_filter.decode(line(tool("Bash", "ls -la"))))
+        # 引用符がエスケープされた文字列や名前の違う行はデコードしない
+        self.assertEqual(record_filter.decoded, 3)
+
+    def test_escaped_strings(self):
+        """\\uXXXX や \\/ で書かれた文字列も見逃さないテスト"""
+        escaped = line(tool("検索", "cat a/b"), ensure_ascii=True)
+        self.assertIn(b"\\u", escaped)
+        self.assertIsNotNone(RecordFilter(tools=["検索"]).decode(escaped))
+        self.assertIsNotNone(RecordFilter(grep="索").decode(escaped))
+        slash = line(tool("Bash", "cat a/b")).replace(b"a/b", b"a\\/b")
+        self.assertIsNotNone(RecordFilter(grep="a/b").decode(slash))
+        quote = line(user('say "hi"\tnow'))
+        self.assertIsNotNone(RecordFilter(grep='"hi"\t').decode(quote))
+
+    def test_invalid_lines(self):
+        """不正な行は一致しないテスト"""
+        record_filter = RecordFilter(grep="tool_use")
+        self.assertIsNone(record_filter.decode(b'{"type": "tool_use"\n'))
+        self.assertIsNone(record_filter.decode(b'["tool_use"]\n'))
+        self.assertIsNone(RecordFilter(types=["user"]).decode(b'{"type": ["user"]}\n'))
+
+    def test_combined_conditions(self):
+        """複数の条件はすべて満たす必要があるテスト"""
+        self.assertFalse(RecordFilter())
+        record_filter = RecordFilter(types=["user"], tools=["Bash"])
+        self.assertIsNone(record_filter.decode(line(tool("Bash", "ls"))))
+        self.assertIsNone(record_filter.decode(line(user("Bash"))))
+        record_filter = RecordFilter(tools=["Bash", "Read"], grep="x")
+        self.assertIsNotNone(record_filter.decode(line(tool("Read", "x"))))
+        self.assertIsNone(record_filter.decode(line(tool("Edit", "x"))))
+
+    def test_may_match_kind(self):
+        """インデックスの type の番号による判定のテスト"""
+        record_filter = RecordFilter(tools=["Bash"])
+        self.assertTrue(record_filter.may_match_kind(3))
+        self.assertTrue(record_filter.may_match_kind(3 | 0x80))
+        self.assertFalse(record_filter.may_match_kind(1))
+        self.assertFalse(record_filter.may_match_kind(5))
+        self.assertTrue(RecordFilter(types=["progress"]).may_match_kind(5))
+        self.assertTrue(RecordFilter(grep="x").may_match_kind(0))
+
+
+class TestFilterOptions(unittest.TestCase):
+    """--type / --tool / --grep の表示テスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "session.jsonl"
+        records = []
+        for i in range(20):
+            records.append(user(f"question {i}", i))
+            records.append(tool("Bash" if i % 2 else "Read", f"cmd {i}", i))
+        self.path.write_bytes(b"".join(line(data) + b"broken\n" for data in records))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def view(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            self.assertEqual(main([str(self.path), *args]), 0)
+        self.assertEqual(stderr.getvalue(), "")
+        return stdout.getvalue()
+
+    def test_streaming(self):
+        """インデックスを使わない表示のテスト"""
+        output = self.view("--tool", "Bash")
+        self.assertEqual(output.count("TOOL: Bash"), 10)
+        self.assertNotIn("USER:", output)
+        output = self.view("--type", "user", "--grep", "question 1")
+        self.assertEqual(output.count("USER:"), 11)
+        self.assertEqual(self.view("--grep", "cmd 7"), self.view("--message", "31"))
+
+    def test_with_index(self):
+        """インデックスと組み合わせた表示のテスト"""
+        output = self.view("--tool", "Bash", "--tail", "2")
+        self.assertEqual(
+            output,
+            '\n[2025-01-01 10:00:17] TOOL: Bash\nInput: {"command": "cmd 17"}...\n'
+            '\n[2025-01-01 10:00:19] TOOL: Bash\nInput: {"command": "cmd 19"}...\n',
+        )
+        output = self.view("--since", "2025-01-01T10:00:15Z", "--type", "user")
+        self.assertEqual(output.count("USER:"), 5)
+        self.assertEqual(self.view("--message", "1", "--tool", "Bash"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
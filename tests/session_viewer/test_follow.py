@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# Standard library imports
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import follow
+
+
+class TestFollower(unittest.TestCase):
+    """追記されていくログの追跡のテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "session.jsonl"
+        self.path.write_bytes(b"")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def append(self, data):
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    def test_starts_after_last_complete_line(self):
+        """既存の内容は読まず、書き込み途中の行は完成してから返すテスト"""
+        self.append(b"old 1\nold 2\npart")
+        with follow.Follower(self.path) as follower:
+            self.assertEqual(follower.poll(), [])
+            self.append(b"ial\nnew\n")
+            self.assertEqual(follower.poll(), [b"partial\n", b"new\n"])
+
+    def test_partial_line(self):
+        """改行で終わるまで行を持ち越すテスト"""
+        with follow.Follower(self.path, offset=0) as follower:
+            self.append(b"a\nb")
+            self.assertEqual(follower.poll(), [b"a\n"])
+            self.append(b"c")
+            self.assertEqual(follower.poll(), [])
+            self.append(b"\n")
+            self.assertEqual(follower.poll(), [b"bc\n"])
+
+    def test_truncation(self):
+        """切り詰められたら先頭から読み直すテスト"""
+        self.append(b"first line\nsecond line\n")
+        with follow.Follower(self.path) as follower:
+            with open(self.path, "wb") as f:
+                f.write(b"new\n")
+            self.assertEqual(follower.poll(), [b"new\n"])
+            self.assertEqual(follower.truncations, 1)
+
+    def test_rotation(self):
+        """ローテーションされたら古いファイルを読み切ってから新しいファイルに移るテスト"""
+        with follow.Follower(self.path) as follower:
+            self.append(b"last of old\n")
+            os.rename(self.path, f"{self.path}.1")
+            self.path.write_bytes(b"first of new\n")
+            self.assertEqual(follower.poll(), [b"last of old\n", b"first of new\n"])
+            self.assertEqual(follower.rotations, 1)
+            self.append(b"more\n")
+            self.assertEqual(follower.poll(), [b"more\n"])
+
+    def test_deleted_file(self):
+        """削除されて新しいファイルがまだない間は待つテスト"""
+        with follow.Follower(self.path) as follower:
+            os.unlink(self.path)
+            self.assertEqual(follower.poll(), [])
+            self.path.write_bytes(b"recreated\n")
+            self.assertEqual(follower.poll(), [b"recreated\n"])
+
+    def test_end_of_complete_lines(self):
+        """末尾の書き込み途中の行の先頭を求めるテスト"""
+        self.append(b"x" * (follow.READ_BLOCK + 10) + b"\n" + b"y" * 100)
+        with open(self.path, "rb") as f:
+            self.assertEqual(follow.end_of_complete_lines(f), follow.READ_BLOCK + 11)
+
+    def test_follow_waits_for_lines(self):
+        """追記を待って行を返し続けるテスト（別スレッドで追記）"""
+        received = []
+
+        def writer():
+            for i in range(3):
+                time.sleep(0.02)
+                self.append(f"line {i}\n".encode())
+
+        thread = threading.Thread(target=writer)
+        waiter = follow.PollingWaiter(min_interval=0.001, max_interval=0.01)
+        with follow.Follower(self.path, waiter=waiter) as follower:
+            thread.start()
+            deadline = time.monotonic() + 5
+
+            def stop():
+                return len(received) >= 3 or time.monotonic() > deadline
+
+            for lines in follower.follow(stop):
+                received.extend(lines)
+        thread.join()
+        self.assertEqual(received, [b"line 0\n", b"line 1\n", b"line 2\n"])
+
+    def test_polling_backoff(self):
+        """変化がないほどポーリング間隔が伸び、届いたら戻るテスト"""
+        waiter = follow.PollingWaiter(min_interval=0.001, max_interval=0.004)
+        for expected in (0.002, 0.004, 0.004):
+            waiter.wait()
+            self.assertEqual(waiter.interval, expected)
+        waiter.reset()
+        self.assertEqual(waiter.interval, 0.001)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify はLinuxのみ")
+    def test_inotify_wakes_on_append(self):
+        """inotify の通知で待ちが解除されるテスト"""
+        try:
+            waiter = follow.InotifyWaiter(self.path, timeout=5)
+        except (OSError, AttributeError):
+            self.skipTest("inotify が使えません")
+        try:
+            timer = threading.Timer(0.05, self.append, args=(b"x\n",))
+            timer.start()
+            started = time.monotonic()
+            waiter.wait()
+            self.assertLess(time.monotonic() - started, 4)
+            timer.join()
+        finally:
+            waiter.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
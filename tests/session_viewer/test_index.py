@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# Standard library imports
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import index as session_index
+from apps.session_viewer.cli import main
+
+
+def record(i, kind="user", timestamp=True):
+    data = {"type": kind, "message": {"content": f"message {i}"}}
+    if timestamp:
+        data["timestamp"] = f"2025-01-01T10:{i // 60:02d}:{i % 60:02d}Z"
+    return json.dumps(data) + "\n"
+
+
+class TestSessionIndex(unittest.TestCase):
+    """バイトオフセットのインデックスのテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "session.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, mode="w"):
+        with open(self.path, mode, encoding="utf-8") as f:
+            f.write(text)
+
+    def view(self, *args):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.assertEqual(main([str(self.path), *args]), 0)
+        return stdout.getvalue()
+
+    def test_offsets_and_kinds(self):
+        """各行のオフセット・type・タイムスタンプが記録されるテスト"""
+        lines = [record(0), record(1, "assistant"), "broken\n", record(2, "x", False)]
+        self.write("".join(lines))
+        with session_index.open_index(self.path) as index:
+            records = list(index.records())
+        offsets = [0]
+        for line in lines[:-1]:
+            offsets.append(offsets[-1] + len(line.encode("utf-8")))
+        self.assertEqual([r[0] for r in records], offsets)
+        inherited = session_index.INHERITED_TIMESTAMP
+        kinds = [session_index.KINDS[r[2] & ~inherited] for r in records]
+        self.assertEqual(kinds, ["user", "assistant", "invalid", "other"])
+        # タイムスタンプのない行は直前の値を引き継ぐ
+        self.assertEqual(records[2][1], records[1][1])
+        self.assertTrue(records[3][2] & inherited)
+
+    def test_incremental_update(self):
+        """追記分だけをインデックスに加え、書き込み途中の行は次回に回すテスト"""
+        self.write(record(0) + record(1))
+        with session_index.open_index(self.path) as index:
+            self.assertEqual(len(index), 2)
+        self.write(record(2) + record(3)[:10], mode="a")
+        with session_index.SessionIndex(self.path) as index:
+            self.assertEqual(index.update(), 1)
+            self.assertEqual(index.update(), 0)
+        self.write(record(3)[10:], mode="a")
+        with session_index.SessionIndex(self.path) as index:
+            self.assertEqual(index.update(), 1)
+            self.assertEqual(len(index), 4)
+            self.assertEqual(index.indexed_bytes, os.path.getsize(self.path))
+
+    def test_rebuild_after_rotation(self):
+        """ログが短くなったり先頭が変わったら作り直すテスト"""
+        self.write(record(0) + record(1) + record(2))
+        session_index.open_index(self.path).close()
+        self.write(record(5))
+        with session_index.SessionIndex(self.path) as index:
+            self.assertEqual(index.update(), 1)
+            self.assertEqual(len(index), 1)
+        self.write(record(6) + record(7))
+        with session_index.SessionIndex(self.path) as index:
+            self.assertEqual(index.update(), 2)
+            self.assertEqual(len(index), 2)
+
+    def test_select_sorted_and_unsorted(self):
+        """時間範囲の選択（昇順なら二分探索、そうでなければ走査）のテスト"""
+        parse = session_index.parse_timestamp
+        self.write("".join(record(i) for i in range(100)))
+        with session_index.open_index(self.path) as index:
+            self.assertTrue(index.is_sorted)
+            positions = index.select(
+                parse("2025-01-01T10:00:10Z"), parse("2025-01-01T10:00:20")
+            )
+            self.assertEqual(list(positions), list(range(10, 20)))
+        self.write(record(5), mode="a")
+        with session_index.open_index(self.path) as index:
+            self.assertFalse(index.is_sorted)
+            positions = index.select(
+                parse("2025-01-01T10:00:05Z"), parse("2025-01-01T10:00:06Z")
+            )
+            self.assertEqual(list(positions), [5, 100])
+
+    def test_view_options(self):
+        """--tail / --message / --since / --until の表示テスト"""
+        self.write("".join(record(i) for i in range(10)))
+        self.assertEqual(
+            self.view("--tail", "1"), "\n[2025-01-01 10:00:09] USER:\nmessage 9\n"
+        )
+        self.assertEqual(
+            self.view("--message", "3"), "\n[2025-01-01 10:00:02] USER:\nmessage 2\n"
+        )
+        self.assertEqual(self.view("--message", "11"), "")
+        output = self.view(
+            "--since", "2025-01-01T10:00:07Z", "--until", "2025-01-01T10:00:09Z"
+        )
+        self.assertEqual(output.count("USER:"), 2)
+        output = self.view("--since", "2025-01-01T10:00:02Z", "--tail", "2")
+        self.assertIn("message 8", output)
+        self.assertIn("message 9", output)
+        self.assertTrue(Path(f"{self.path}.idx").exists())
+
+    def test_unwritable_index(self):
+        """インデックスを書けなければ一時ファイルに作って表示するテスト"""
+        self.write("".join(record(i) for i in range(10)))
+        index_file = str(Path(self.tmp.name) / "missing" / "session.idx")
+        output = self.view("--tail", "1", "--index-file", index_file)
+        self.assertEqual(output, "\n[2025-01-01 10:00:09] USER:\nmessage 9\n")
+        with session_index.open_index(self.path, index_file, fallback=True) as index:
+            self.assertIsNone(index.index_file)
+            self.assertEqual(len(index), 10)
+        with self.assertRaises(OSError):
+            session_index.open_index(self.path, index_file)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(
+                main(["index", str(self.path), "--index-file", index_file]), 1
+            )
+        self.assertIn("Unable to write index", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# Standard library imports
+import contextlib
+import gzip
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import latency
+from apps.session_viewer.cli import main
+
+
+def record(kind, second, **fields):
+    timestamp = f"2025-01-01T10:{second // 60:02d}:{second % 60:02d}Z"
+    return json.dumps({"type": kind, "timestamp": timestamp, **fields}) + "\n"
+
+
+# user(0) → assistant(2) → tool_use Bash(3) → assistant(7) → user(10)
+#   → user(11) → assistant(15)
+SESSION = "".join(
+    [
+        record("user", 0),
+        record("assistant", 2),
+        record("tool_use", 3, name="Bash"),
+        record("assistant", 7),
+        "broken\n",
+        json.dumps({"type": "summary"}) + "\n",
+        record("user", 10),
+        record("user", 11),
+        record("assistant", 15),
+    ]
+)
+
+
+class TestLatency(unittest.TestCase):
+    """ターンの所要時間の統計のテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.path = self.dir / "session.jsonl"
+        self.path.write_text(SESSION, encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_analyze_file(self):
+        """応答時間・ツールの所要時間・ターンの間隔を数えるテスト"""
+        stats = latency.analyze_file(self.path, latency.LatencyStats())
+        self.assertEqual((stats.files, stats.records), (1, 7))
+        response = stats.sketches["response"]
+        # 2つ目のユーザーのメッセージは、返答を待っている1つ目から数える
+        self.assertEqual((response.count, response.min, response.max), (2, 2, 5))
+        tool = stats.sketches["tool"]
+        self.assertEqual((tool.count, tool.max), (1, 4))
+        self.assertEqual(stats.tools["Bash"].count, 1)
+        gap = stats.sketches["gap"]
+        self.assertEqual((gap.count, gap.min, gap.max), (2, 1, 3))
+
+    def test_file_failing_midway(self):
+        """途中で読めなくなったファイルの所要時間を加えないテスト"""
+        data = gzip.compress((SESSION * 10000).encode(), compresslevel=0)
+        path = self.dir / "truncated.jsonl.gz"
+        path.write_bytes(data[: len(data) // 2])
+        stats = latency.analyze_file(path, latency.LatencyStats())
+        self.assertEqual(stats.unreadable_files, 1)
+        self.assertEqual((stats.files, stats.records, stats.out_of_order), (0, 0, 0))
+        self.assertEqual([s.count for s in stats.sketches.values()], [0, 0, 0])
+        self.assertEqual(stats.tools, {})
+
+    def test_out_of_order(self):
+        """時刻が前に戻った区間は数えないテスト"""
+        path = self.dir / "unordered.jsonl"
+        path.write_text(
+            record("user", 10) + record("assistant", 5) + record("assistant", 8),
+            encoding="utf-8",
+        )
+        stats = latency.analyze_file(path, latency.LatencyStats())
+        self.assertEqual(stats.out_of_order, 1)
+        self.assertEqual(stats.sketches["response"].count, 0)
+
+    def test_merge_and_round_trip(self):
+        """ファイルごとの結果を合わせ、保存して読み込めるテスト"""
+        other = self.dir / "other.jsonl.gz"
+        other.write_bytes(gzip.compress(SESSION.encode("utf-8")))
+        stats = latency.analyze([self.path, other])
+        self.assertEqual(stats.files, 2)
+        self.assertEqual(stats.sketches["response"].count, 4)
+        data = json.loads(json.dumps(stats.to_dict()))
+        loaded = latency.LatencyStats.from_dict(data)
+        self.assertEqual(loaded.summary(), stats.summary())
+        loaded.merge(stats)
+        self.assertEqual(loaded.tools["Bash"].count, 4)
+        with self.assertRaises(ValueError):
+            latency.LatencyStats.from_dict({"version": 0})
+
+    def test_cli(self):
+        """stats サブコマンドで保存した結果を次回合わせられるテスト"""
+        saved = self.dir / "stats.json"
+
+        def run(*args):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                self.assertEqual(main(["stats", *map(str, args)]), 0)
+            return stdout.getvalue()
+
+        report = run(self.dir, "-j", "1", "--save", saved)
+        self.assertIn("User -> assistant", report)
+        self.assertIn("Bash", report)
+        summary = json.loads(run("--load", saved, "--load", saved, "--json"))
+        self.assertEqual(summary["files"], 2)
+        self.assertEqual(summary["metrics"]["response"]["count"], 4)
+        self.assertEqual(summary["metrics"]["response"]["max"], 5)
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main(["stats"])
+
+    def test_cli_file_errors(self):
+        """--load / --save のファイルが読み書きできなければエラーで終了するテスト"""
+        missing = self.dir / "missing" / "stats.json"
+        for args in (["--load", missing], [self.dir, "--save", missing]):
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                with self.assertRaises(SystemExit) as cm:
+                    main(["stats", *map(str, args)])
+            self.assertEqual(cm.exception.code, 1)
+            self.assertIn(f"'{missing}'", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# Standard library imports
+import io
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import viewer
+from apps.session_viewer.viewer import OutputBuffer, format_time_prefix
+
+
+def text_stream(encoding="utf-8", errors="strict"):
+    return io.TextIOWrapper(io.BytesIO(), encoding=encoding, errors=errors)
+
+
+def strftime_prefix(timestamp_str):
+    timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+    return f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] "
+
+
+class TestOutputBuffer(unittest.TestCase):
+    """OutputBuffer のテスト"""
+
+    def test_buffers_until_limit(self):
+        """limit に達するまで書き出さない"""
+        stream = text_stream()
+        out = OutputBuffer(stream, limit=10)
+        out.write("abc\n")
+        self.assertEqual(stream.buffer.getvalue(), b"")
+        out.write("あいう\n")
+        self.assertEqual(stream.buffer.getvalue(), "abc\nあいう\n".encode("utf-8"))
+
+    def test_flush_on_exit(self):
+        """with を抜けるときに残りを書き出す"""
+        stream = text_stream()
+        with OutputBuffer(stream) as out:
+            out.write("a\n")
+            out.write("b\n")
+        self.assertEqual(stream.buffer.getvalue(), b"a\nb\n")
+
+    def test_keeps_order_with_direct_writes(self):
+        """出力先に直接書かれたテキストとの順序を保つ"""
+        stream = text_stream()
+        with OutputBuffer(stream) as out:
+            stream.write("first\n")
+            out.write("second\n")
+            out.flush()
+            stream.write("third\n")
+        stream.flush()
+        self.assertEqual(stream.buffer.getvalue(), b"first\nsecond\nthird\n")
+
+    def test_encoding_error_on_write(self):
+        """エンコードできない文字は print と同じくその書き込みでエラーになる"""
+        stream = text_stream("ascii")
+        out = OutputBuffer(stream)
+        out.write("ok\n")
+        with self.assertRaises(UnicodeEncodeError):
+            out.write("日本語\n")
+        out.flush()
+        self.assertEqual(stream.buffer.getvalue(), b"ok\n")
+
+    def test_encoding_errors_handler(self):
+        """出力先の errors の指定に従う"""
+        stream = text_stream("ascii", "replace")
+        with OutputBuffer(stream) as out:
+            out.write("日本\n")
+        self.assertEqual(stream.buffer.getvalue(), b"??\n")
+
+    def test_text_stream_without_buffer(self):
+        """バイト列の出力先がない場合は文字列のまま書く"""
+        stream = io.StringIO()
+        with OutputBuffer(stream, limit=4) as out:
+            out.write("ab\n")
+            self.assertEqual(stream.getvalue(), "")
+            out.write("cd\n")
+            self.assertEqual(stream.getvalue(), "ab\ncd\n")
+            out.write("e\n")
+        self.assertEqual(stream.getvalue(), "ab\ncd\ne\n")
+
+    def test_broken_pipe_exits_quietly(self):
+        """出力先が閉じられていたら終了コード0で終了"""
+
+        class ClosedPipe(io.StringIO):
+            def write(self, text):
+                raise BrokenPipeError
+
+        original = viewer.exit_quietly
+        viewer.exit_quietly = lambda: sys.exit(0)
+        try:
+            with self.assertRaises(SystemExit) as cm:
+                with OutputBuffer(ClosedPipe()) as out:
+                    out.write("a\n")
+        finally:
+            viewer.exit_quietly = original
+        self.assertEqual(cm.exception.code, 0)
+
+
+class TestFormatTimePrefix(unittest.TestCase):
+    """format_time_prefix のテスト"""
+
+    def setUp(self):
+        viewer._time_prefixes.clear()
+
+    def test_same_as_strftime(self):
+        """キャッシュの有無によらず strftime と同じ表示になる"""
+        timestamps = [
+            "2025-01-01T10:00:05Z",
+            "2025-01-01T10:00:05.123Z",
+            "2025-01-01T10:00:05.123456+09:00",
+            "2025-01-01 10:00:05",
+            "2025-01-01T10:00:05-05:30",
+            "0999-01-01T10:00:05",
+        ]
+        for timestamp in timestamps:
+            expected = strftime_prefix(timestamp)
+            self.assertEqual(format_time_prefix(timestamp), expected, timestamp)
+            self.assertEqual(format_time_prefix(timestamp), expected, timestamp)
+
+    def test_invalid_suffix_not_cached(self):
+        """秒が同じでも不正なタイムスタンプはエラーになる"""
+        self.assertEqual(
+            format_time_prefix("2025-01-01T10:00:05Z"), "[2025-01-01 10:00:05] "
+        )
+        with self.assertRaises(ValueError):
+            format_time_prefix("2025-01-01T10:00:05garbage")
+
+    def test_invalid_date(self):
+        """存在しない日付は datetime と同じくエラーになる"""
+        with self.assertRaises(ValueError):
+            format_time_prefix("2025-02-30T10:00:05Z")
+        self.assertNotIn("2025-02-30T10:00:05", viewer._time_prefixes)
+
+    def test_not_a_string(self):
+        """文字列でない場合も元と同じ例外になる"""
+        with self.assertRaises(AttributeError):
+            format_time_prefix(12345)
+
+    def test_cache_size_limited(self):
+        """覚えておく件数は TIMESTAMP_CACHE_SIZE まで"""
+        for i in range(viewer.TIMESTAMP_CACHE_SIZE + 10):
+            minutes, seconds = divmod(i, 60)
+            hours, minutes = divmod(minutes, 60)
+            format_time_prefix(f"2025-01-01T{hours:02d}:{minutes:02d}:{seconds:02d}Z")
+        self.assertLessEqual(len(viewer._time_prefixes), viewer.TIMESTAMP_CACHE_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
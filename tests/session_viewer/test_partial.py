@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# Standard library imports
+import contextlib
+import io
+import json
+import random
+import sys
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import partial
+from apps.session_viewer.viewer import process_line
+
+
+def render(line, threshold):
+    """PARTIAL_DECODE_CHARS を threshold にして process_line の出力を返す"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with patch.object(partial, "PARTIAL_DECODE_CHARS", threshold):
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            process_line(line)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+def random_value(rng, depth=0):
+    choice = rng.randrange(9 if depth < 3 else 5)
+    if choice == 0:
+        return rng.choice([None, True, False, 0, -1, 1.5, 1e300, 10**30])
+    if choice in (1, 2, 3, 4):
+        alphabet = 'ab "\\/\n\t\x01あ😀{}[],:'
+        return "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 150)))
+    if choice in (5, 6):
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(0, 6))]
+    value = {}
+    for _ in range(rng.randrange(0, 6)):
+        key = rng.choice(["a", "b", "text", "type", "キー"]) + str(rng.randrange(3))
+        value[key] = random_value(rng, depth + 1)
+    return value
+
+
+class TestPartialDecode(unittest.TestCase):
+    """長い行の部分的なデコードのテスト"""
+
+    def assertSameOutput(self, line):
+        self.assertEqual(render(line, 0), render(line, float("inf")), line)
+
+    def test_random_records(self):
+        """ランダムなレコードで行全体をデコードした場合と同じ出力になるテスト"""
+        rng = random.Random(0)
+        for _ in range(300):
+            kind = rng.choice(["assistant", "tool_use", "user", "summary", "x"])
+            record = {"type": kind, "timestamp": "2025-01-01T10:00:00Z"}
+            if kind == "assistant":
+                kinds = ["text", "tool_use"]
+                blocks = [
+                    {"type": rng.choice(kinds), "text": random_value(rng)}
+                    for _ in range(rng.randrange(4))
+                ]
+                blocks.append(random_value(rng))
+                content = rng.choice([blocks, random_value(rng)])
+                record["message"] = {"content": content}
+            elif kind == "tool_use":
+                record.update(name="Bash", input=random_value(rng))
+            else:
+                record.update(message={"content": random_value(rng)}, summary="s")
+            indent = rng.choice([None, 1])
+            ensure_ascii = rng.random() < 0.5
+            line = json.dumps(record, indent=indent, ensure_ascii=ensure_ascii)
+            self.assertSameOutput(line.replace("\n", " ") + "\n")
+
+    def test_edge_cases(self):
+        """不正な行・キーの重複・想定外の形で同じ出力になるテスト"""
+        long_text = "x" * 400
+        text_block = '{"type": "text", "text": 1}'
+        lines = [
+            '{"type": "assistant", "message": {"content": "' + long_text + '"}',
+            '{"type": "assistant", "message": {"content": "a"}} trailing',
+            '["type", "assistant"]',
+            '{"message": {"content": "late type"}, "type": "assistant"}',
+            '{"type": "assistant", "message": {"content": "a"}, "type": "user"}',
+            '{"type": "tool_use", "input": {"a": "1", "b": 2, "a": "%s"}}' % long_text,
+            '{"type": "tool_use", "input": {"a": "%s", "b": 2, "a": 1}}' % long_text,
+            '{"type": "tool_use", "input": {"a": "%s", "b": "\\x"}}' % long_text,
+            '{"type": "tool_use", "input": [%s]}' % ", ".join(["1.0e2"] * 100),
+            '{"type": "tool_use", "input": "\\ud83d\\ude00%s"}' % long_text,
+            '{"type": "tool_use", "name": "Bash"}',
+            '{"type": "assistant", "message": null}',
+            '{"type": "assistant", "message": {"content": 5}}',
+            '{"type": "assistant", "message": {"content": [%s]}}' % text_block,
+            '{"type": "assistant", "message": {"content": ["text", {"type": "text"}]}}',
+            '{"timestamp": "bad", "type": "assistant", "message": {}}',
+            '{"type": "assistant", "message": {"content": "\x01"}}',
+            '{"type": "assistant", "message": {"content": "%s"' % long_text,
+            '{"type": "assistant"',
+            "",
+        ]
+        for line in lines:
+            self.assertSameOutput(line + "\n")
+
+    def test_does_not_decode_everything(self):
+        """表示しない部分のオブジェクトを残さないテスト"""
+        record = {
+            "type": "assistant",
+            "message": {
+                "content": [
+                    {"type": "text", "text": "本文" * 1_000_000},
+                    {"type": "tool_use", "input": {"data": list(range(200_000))}},
+                ]
+            },
+        }
+        data = partial.decode_line(json.dumps(record), 300, 100)
+        self.assertEqual(
+            data["message"]["content"],
+            [{"type": "text", "text": "本文" * 150 + "本"}, {"type": "tool_use"}],
+        )
+
+        record = {"type": "tool_use", "input": {"command": "x" * 5_000_000, "n": 1}}
+        line = json.dumps(record)
+        tracemalloc.start()
+        data = partial.decode_line(line, 300, 100)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertIsInstance(data["input"], partial.JSONPrefix)
+        self.assertEqual(data["input"], '{"command": "' + "x" * 87)
+        # 文字列全体も json.dumps した全体も作らない
+        self.assertLess(peak, len(line) // 10)
+
+    def test_does_not_decode_long_strings(self):
+        """表示しない文字列や切り詰める本文の残りをデコードしないテスト"""
+        blocks = [
+            {"type": "text", "text": "本文\n" * 2_000_000},
+            {"type": "tool_use", "input": {"data": "\t" * 2_000_000}},
+        ]
+        record = {"type": "assistant", "message": {"content": blocks}}
+        line = json.dumps(record)
+        tracemalloc.start()
+        data = partial.decode_line(line, 300, 100)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(
+            data["message"]["content"],
+            [{"type": "text", "text": ("本文\n" * 101)[:301]}, {"type": "tool_use"}],
+        )
+        self.assertLess(peak, len(line) // 10)
+
+    def test_escapes_at_cut(self):
+        """切り詰める位置の前後にエスケープやサロゲートペアがあっても正しいテスト"""
+        rng = random.Random(1)
+        alphabet = ["a", '"', "\\", "\n", "\x01", "あ", "😀"]
+        for _ in range(300):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(400)))
+            limit = rng.randrange(50)
+            record = {"type": "assistant", "message": {"content": text}}
+            line = json.dumps(record, ensure_ascii=rng.random() < 0.5)
+            with patch.object(partial, "PARTIAL_DECODE_CHARS", 0):
+                data = partial.decode_line(line, limit, limit)
+            self.assertEqual(data["message"]["content"], text[: limit + 1], line)
+            record = {"type": "tool_use", "input": [text, text]}
+            line = json.dumps(record, ensure_ascii=rng.random() < 0.5)
+            with patch.object(partial, "PARTIAL_DECODE_CHARS", 0):
+                data = partial.decode_line(line, limit, limit)
+            dumped = json.dumps([text, text], ensure_ascii=False)
+            self.assertEqual(data["input"], dumped[:limit], line)
+
+    def test_short_lines(self):
+        """短い行は json.loads の結果をそのまま返すテスト"""
+        line = '{"type": "tool_use", "input": {"a": 1}}'
+        self.assertEqual(partial.decode_line(line, 300, 100), json.loads(line))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Standard library imports
+import json
+import random
+import sys
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer.sketch import QuantileSketch
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """分位点スケッチのテスト"""
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.values = [rng.lognormvariate(0, 2) for _ in range(20000)]
+
+    def sketch(self, values, **kwargs):
+        sketch = QuantileSketch(**kwargs)
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def test_relative_accuracy(self):
+        """分位点が相対誤差以内に収まるテスト"""
+        sketch = self.sketch(self.values)
+        for q in (0, 0.01, 0.5, 0.9, 0.99, 0.999):
+            exact = exact_quantile(self.values, q)
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), 0.01 * exact, q)
+        self.assertEqual(sketch.quantile(1), max(self.values))
+        self.assertEqual(len(sketch), len(self.values))
+        self.assertAlmostEqual(sketch.mean, sum(self.values) / len(self.values))
+
+    def test_bounded_buckets(self):
+        """バケツ数が上限を超えず、大きい値の分位点は正確なままのテスト"""
+        sketch = self.sketch(self.values, max_buckets=300)
+        self.assertLessEqual(len(sketch.buckets), 300)
+        exact = exact_quantile(self.values, 0.99)
+        self.assertLessEqual(abs(sketch.quantile(0.99) - exact), 0.01 * exact)
+
+    def test_merge(self):
+        """分けて作ったスケッチを合わせると、まとめて作った場合と同じになるテスト"""
+        whole = self.sketch(self.values)
+        merged = QuantileSketch()
+        for start in range(0, len(self.values), 3000):
+            merged.merge(self.sketch(self.values[start : start + 3000]))
+        self.assertEqual(merged.buckets, whole.buckets)
+        for q in (0, 0.5, 0.99, 1):
+            self.assertEqual(merged.quantile(q), whole.quantile(q))
+        with self.assertRaises(ValueError):
+            merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_round_trip(self):
+        """to_dict() / from_dict() で保存して読み込めるテスト"""
+        sketch = self.sketch(self.values + [0, 0])
+        data = json.loads(json.dumps(sketch.to_dict()))
+        loaded = QuantileSketch.from_dict(data)
+        for q in (0, 0.5, 0.99, 1):
+            self.assertEqual(loaded.quantile(q), sketch.quantile(q))
+        empty = QuantileSketch.from_dict(QuantileSketch().to_dict())
+        self.assertIsNone(empty.quantile(0.5))
+
+    def test_zero_and_invalid_values(self):
+        """0は0として数え、負の値やNaNはエラーになるテスト"""
+        sketch = self.sketch([0, 0, 5, 5])
+        self.assertEqual(sketch.quantile(0.5), 0)
+        self.assertAlmostEqual(sketch.quantile(0.99), 5, delta=0.05)
+        for value in (-1, float("nan")):
+            with self.assertRaises(ValueError):
+                sketch.add(value)
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
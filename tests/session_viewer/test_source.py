@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# Standard library imports
+import bz2
+import contextlib
+import gzip
+import io
+import json
+import lzma
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import source
+from apps.session_viewer.aggregate import summarize_files
+from apps.session_viewer.cli import main
+from apps.session_viewer.source import (
+    CorruptLogError,
+    detect_compression,
+    open_lines,
+    text_lines,
+)
+
+COMPRESSORS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+def record(i):
+    kind = ("user", "assistant", "tool_use", "summary")[i % 4]
+    data = {"type": kind, "timestamp": f"2025-01-01T10:00:{i % 60:02d}Z"}
+    if kind == "tool_use":
+        data.update(name="Bash", input={"command": f"echo {i}"})
+    elif kind == "summary":
+        data["summary"] = f"summary {i}"
+    else:
+        data["message"] = {"content": f"message {i} 日本語"}
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+class TestSource(unittest.TestCase):
+    """ログの読み込み（圧縮・mmap）のテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.data = "".join(record(i) for i in range(200)).encode("utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = self.dir / name
+        path.write_bytes(data)
+        return path
+
+    def read(self, path):
+        with open_lines(path) as lines:
+            return list(lines)
+
+    def test_detect_compression(self):
+        """マジックバイトで圧縮形式を判別するテスト"""
+        for name, compress in COMPRESSORS.items():
+            path = self.write(f"session.{name}", compress(self.data))
+            self.assertEqual(detect_compression(path), name)
+        self.assertIsNone(detect_compression(self.write("plain.jsonl", self.data)))
+        self.assertIsNone(detect_compression(self.write("empty.jsonl", b"")))
+
+    def test_compressed_lines(self):
+        """圧縮されたログも展開前と同じ行になるテスト（ブロックをまたぐ行を含む）"""
+        data = self.data + b"x" * 2050 + b"\n" + b"y" * 350
+        expected = data.splitlines(keepends=True)
+        original = source.READ_BLOCK
+        source.READ_BLOCK = 100
+        try:
+            for name, compress in COMPRESSORS.items():
+                with self.subTest(name=name):
+                    path = self.write(f"session.{name}", compress(data))
+                    self.assertEqual(self.read(path), expected)
+        finally:
+            source.READ_BLOCK = original
+
+    def test_plain_lines(self):
+        """圧縮されていないログ（空・末尾の改行なしを含む）の行のテスト"""
+        path = self.write("plain.jsonl", self.data)
+        self.assertEqual(self.read(path), self.data.splitlines(keepends=True))
+        self.assertEqual(self.read(self.write("empty.jsonl", b"")), [])
+        path = self.write("partial.jsonl", b"a\nb")
+        self.assertEqual(self.read(path), [b"a\n", b"b"])
+        path = self.write("partial.gz", gzip.compress(b"a\nb"))
+        self.assertEqual(self.read(path), [b"a\n", b"b"])
+
+    def test_corrupt_log(self):
+        """途中で切れた圧縮ファイルは CorruptLogError になるテスト"""
+        for name, compress in COMPRESSORS.items():
+            with self.subTest(name=name):
+                data = compress(self.data * 20)
+                path = self.write(f"truncated.{name}", data[: len(data) // 2])
+                with self.assertRaises(CorruptLogError):
+                    self.read(path)
+
+    def test_text_lines(self):
+        """テキストモードで読んだ場合と同じ行になるテスト（\\r と \\r\\n を含む）"""
+        rng = random.Random(0)
+        pieces = [b"a", b"\xe3\x81\x82", b"\n", b"\r", b"\r\n", b" "]
+        for _ in range(200):
+            data = b"".join(rng.choice(pieces) for _ in range(rng.randrange(30)))
+            path = self.write("text.jsonl", data)
+            with open(path, "r", encoding="utf-8") as f:
+                expected = list(f)
+            self.assertEqual(list(text_lines(self.read(path))), expected, data)
+
+    def test_view_compressed(self):
+        """圧縮されたログも展開したログと同じ表示になるテスト"""
+        plain = self.write("session.jsonl", self.data)
+
+        def view(*args):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                self.assertEqual(main([str(arg) for arg in args]), 0)
+            return stdout.getvalue()
+
+        for name, compress in COMPRESSORS.items():
+            with self.subTest(name=name):
+                path = self.write(f"session.jsonl.{name}", compress(self.data))
+                self.assertEqual(view(path), view(plain))
+                filtered = view(path, "--tool", "Bash")
+                self.assertEqual(filtered, view(plain, "--tool", "Bash"))
+
+    def test_view_compressed_errors(self):
+        """圧縮されたログではインデックスを使うオプションがエラーになるテスト"""
+        path = self.write("session.jsonl.gz", gzip.compress(self.data))
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main([str(path), "--tail", "3"])
+            with self.assertRaises(SystemExit):
+                main(["index", str(path)])
+        data = gzip.compress(self.data * 20)
+        path = self.write("truncated.jsonl.gz", data[: len(data) // 2])
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()):
+            with contextlib.redirect_stderr(stderr):
+                self.assertEqual(main([str(path)]), 1)
+        self.assertIn("Error:", stderr.getvalue())
+
+    def test_aggregate_compressed(self):
+        """集計では展開した内容を数えるテスト"""
+        plain = self.write("session.jsonl", self.data)
+        compressed = self.write("session.jsonl.xz", lzma.compress(self.data))
+        expected = summarize_files([plain]).to_dict()
+        actual = summarize_files([compressed]).to_dict()
+        self.assertEqual(actual["lines"], expected["lines"])
+        self.assertEqual(actual["bytes"], len(self.data))
+        self.assertEqual(actual["types"], expected["types"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# Standard library imports
+import contextlib
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import store
+from apps.session_viewer.cli import main
+from apps.session_viewer.index import parse_timestamp
+
+
+def record(i, kind="user", timestamp=True, **fields):
+    data = {"type": kind, "message": {"content": f"message {i}"}, **fields}
+    if timestamp:
+        data["timestamp"] = f"2025-01-01T10:{i // 60:02d}:{i % 60:02d}Z"
+    return json.dumps(data) + "\n"
+
+
+def tool(i, name, command):
+    return record(i, "tool_use", name=name, input={"command": command})
+
+
+class TestSessionStore(unittest.TestCase):
+    """セッションログのデータベースのテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.path = self.dir / "session.jsonl"
+        self.db_file = self.dir / "sessions.db"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, mode="w", path=None):
+        with open(path or self.path, mode, encoding="utf-8") as f:
+            f.write(text)
+
+    def rows(self, db):
+        return db._db.execute(
+            "SELECT byte_offset, timestamp, type, tool, text FROM records"
+            " ORDER BY byte_offset"
+        ).fetchall()
+
+    def test_ingest_records(self):
+        """各行のオフセット・タイムスタンプ・type・ツール名・本文が保存されるテスト"""
+        lines = [record(0), tool(1, "Bash", "ls"), "broken\n", record(2, "x", False)]
+        self.write("".join(lines))
+        with store.open_store(self.db_file) as db:
+            self.assertEqual(db.ingest_file(self.path), 4)
+            rows = self.rows(db)
+        offsets = [0]
+        for line in lines[:-1]:
+            offsets.append(offsets[-1] + len(line.encode("utf-8")))
+        self.assertEqual([row[0] for row in rows], offsets)
+        self.assertEqual([row[2] for row in rows], ["user", "tool_use", None, "x"])
+        self.assertEqual(rows[1][3], "Bash")
+        self.assertEqual(rows[1][4], '{"command": "ls"}')
+        self.assertEqual(rows[0][4], "message 0")
+        # タイムスタンプのない行は直前の値を引き継ぐ
+        self.assertEqual(rows[1][1], parse_timestamp("2025-01-01T10:00:01Z"))
+        self.assertEqual(rows[3][1], rows[2][1])
+
+    def test_text_truncated(self):
+        """本文は先頭 STORED_TEXT_CHARS 文字だけを保存するテスト"""
+        text = "あ" * (store.STORED_TEXT_CHARS * 2)
+        blocks = [{"type": "text", "text": text}, {"type": "tool_use"}]
+        self.write(record(0, "assistant", message={"content": blocks}))
+        with store.open_store(self.db_file) as db:
+            db.ingest_file(self.path)
+            self.assertEqual(self.rows(db)[0][4], text[: store.STORED_TEXT_CHARS])
+
+    def test_incremental_ingest(self):
+        """追記分だけを取り込み、書き込み途中の行は次回に回すテスト"""
+        self.write(record(0) + record(1))
+        with store.open_store(self.db_file) as db:
+            self.assertEqual(db.ingest_file(self.path), 2)
+        self.write(record(2) + record(3)[:10], mode="a")
+        with store.open_store(self.db_file) as db:
+            self.assertEqual(db.ingest_file(self.path), 1)
+            self.assertEqual(db.ingest_file(self.path), 0)
+        self.write(record(3)[10:], mode="a")
+        with store.open_store(self.db_file) as db:
+            self.assertEqual(db.ingest_file(self.path), 1)
+            self.assertEqual(len(db), 4)
+            self.assertTrue(db.is_current(self.path))
+
+    def test_batches(self):
+        """INGEST_BATCH 件ごとに取り込み済みの位置を保存するテスト"""
+        self.write("".join(record(i) for i in range(25)))
+        original = store.INGEST_BATCH
+        store.INGEST_BATCH = 10
+        try:
+            with store.open_store(self.db_file) as db:
+                self.assertEqual(db.ingest_file(self.path), 25)
+                self.assertEqual(len(db), 25)
+                ingested = db._file_state(os.path.abspath(self.path))[1]
+        finally:
+            store.INGEST_BATCH = original
+        self.assertEqual(ingested, os.path.getsize(self.path))
+
+    def test_reingest_after_rotation(self):
+        """ログが短くなったり先頭が変わったら取り込み直すテスト"""
+        self.write(record(0) + record(1) + record(2))
+        with store.open_store(self.db_file) as db:
+            db.ingest_file(self.path)
+        self.write(record(5) + record(6) + record(7))
+        with store.open_store(self.db_file) as db:
+            self.assertFalse(db.is_current(self.path))
+            self.assertEqual(db.ingest_file(self.path), 3)
+            self.assertEqual(len(db), 3)
+            self.assertEqual(self.rows(db)[0][4], "message 5")
+        self.write(record(8))
+        with store.open_store(self.db_file) as db:
+            self.assertEqual(db.ingest_file(self.path), 1)
+            self.assertEqual(len(db), 1)
+
+    def test_reingest_after_rewrite(self):
+        """先頭の行が同じでも、最後に取り込んだ行が書き換わったら取り込み直すテスト"""
+        self.write(record(0) + record(1))
+        with store.open_store(self.db_file) as db:
+            db.ingest_file(self.path)
+        lines = [record(0), record(2, extra="x" * 100), record(3)]
+        self.write("".join(lines))
+        with store.open_store(self.db_file) as db:
+            self.assertFalse(db.is_current(self.path))
+            self.assertEqual(db.ingest_file(self.path), 3)
+            offsets = [row[0] for row in self.rows(db)]
+            self.assertEqual(offsets, [0, len(lines[0]), len(lines[0] + lines[1])])
+            self.assertEqual(self.rows(db)[1][4], "message 2")
+        # 書き込み途中の行を挟んでも、追記だけなら続きから取り込む
+        self.write(record(4)[:10], "a")
+        with store.open_store(self.db_file) as db:
+            self.assertEqual(db.ingest_file(self.path), 0)
+        self.write(record(4)[10:], "a")
+        with store.open_store(self.db_file) as db:
+            self.assertTrue(db.is_current(self.path))
+            self.assertEqual(db.ingest_file(self.path), 1)
+            self.assertEqual(len(db), 4)
+
+    def test_compressed_rejected(self):
+        """圧縮されたログは取り込まないテスト"""
+        path = self.dir / "session.jsonl.gz"
+        path.write_bytes(gzip.compress(record(0).encode("utf-8")))
+        with store.open_store(self.db_file) as db:
+            with self.assertRaises(ValueError):
+                db.ingest_file(path)
+            self.assertEqual(len(db), 0)
+
+    def test_select(self):
+        """type・ツール名・時刻で絞り込み、ファイルごとにまとめるテスト"""
+        other = self.dir / "other.jsonl"
+        self.write(record(0) + tool(1, "Bash", "ls") + tool(2, "Read", "x"))
+        self.write(tool(3, "Bash", "pwd") + record(4, "assistant"), path=other)
+        with store.open_store(self.db_file) as db:
+            db.ingest_file(self.path)
+            db.ingest_file(other)
+            bash = list(db.select(tools=["Bash"]))
+            names = [Path(path).name for path, _ in bash]
+            self.assertEqual(names, ["other.jsonl", "session.jsonl"])
+            self.assertEqual(len(bash[1][1]), 1)
+            kinds = list(db.select(types=["user", "assistant"]))
+            self.assertEqual(sum(len(offsets) for _, offsets in kinds), 2)
+            since = parse_timestamp("2025-01-01T10:00:02Z")
+            until = parse_timestamp("2025-01-01T10:00:04Z")
+            selected = list(db.select(since=since, until=until))
+            self.assertEqual(sum(len(offsets) for _, offsets in selected), 2)
+
+    def test_cli(self):
+        """ingest と query で、ログを直接絞り込んだ場合と同じ表示になるテスト"""
+        lines = [record(0), tool(1, "Bash", "ls"), tool(2, "Bash", "pytest")]
+        self.write("".join(lines))
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(
+                main(["ingest", str(self.dir), "--db", str(self.db_file)]), 0
+            )
+        self.assertIn("3 件を追加", stderr.getvalue())
+
+        def run(*args):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                self.assertEqual(main(list(args)), 0)
+            return stdout.getvalue()
+
+        direct = run(str(self.path), "--tool", "Bash", "--grep", "pytest")
+        queried = run(
+            "query", "--db", str(self.db_file), "--tool", "Bash", "--grep", "pytest"
+        )
+        header = f"==> {os.path.abspath(self.path)} <==\n"
+        self.assertEqual(queried, header + direct)
+        self.assertIn("pytest", direct)
+        since = run(
+            "query", "--db", str(self.db_file), "--since", "2025-01-01T10:00:02"
+        )
+        self.assertEqual(since.count("TOOL: Bash"), 1)
+
+    def test_query_missing_db(self):
+        """データベースがなければエラーになるテスト"""
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(main(["query", "--db", str(self.db_file)]), 1)
+        self.assertFalse(self.db_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Standard library imports
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# appsディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Local application imports
+from apps.session_viewer import view_session
+from apps.session_viewer.cli import main
+
+RECORDS = [
+    {"type": "user", "timestamp": "2025-01-01T10:00:00Z", "message": {"content": "hi"}},
+    {
+        "type": "assistant",
+        "timestamp": "2025-01-01T10:00:05.123Z",
+        "message": {"content": [{"type": "text", "text": "あ" * 301}]},
+    },
+    {"type": "tool_use", "name": "Bash", "input": {"command": "ls"}},
+    {"type": "summary", "summary": "まとめ"},
+]
+
+EXPECTED = (
+    "\n[2025-01-01 10:00:00] USER:\nhi\n"
+    "\n[2025-01-01 10:00:05] CLAUDE:\n" + "あ" * 300 + "...\n"
+    '\nTOOL: Bash\nInput: {"command": "ls"}...\n'
+    "\nSUMMARY: まとめ\n"
+)
+
+
+def write_session(path, records, extra=""):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write(extra)
+
+
+def run(func, *args):
+    """func を実行して (標準出力, 標準エラー出力) を返す"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        func(*args)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+class TestViewer(unittest.TestCase):
+    """セッションログの表示のテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "session.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render(self):
+        """各 type の表示形式のテスト"""
+        write_session(self.path, RECORDS)
+        stdout, stderr = run(view_session, self.path)
+        self.assertEqual(stdout, EXPECTED)
+        self.assertEqual(stderr, "")
+
+    def test_invalid_lines(self):
+        """不正な行は警告を出して読み飛ばすテスト"""
+        write_session(self.path, RECORDS[:1], extra='not json\n{"no_type": 1}\n')
+        stdout, stderr = run(view_session, self.path)
+        self.assertEqual(stdout, "\n[2025-01-01 10:00:00] USER:\nhi\n")
+        self.assertEqual(stderr.count("Warning: Skipping invalid line"), 2)
+
+    def test_usage(self):
+        """引数なしで使用方法を表示するテスト"""
+        stdout, _ = run(main, [])
+        self.assertIn("使用方法", stdout)
+
+    def test_missing_file(self):
+        """存在しないファイルはエラー終了するテスト"""
+        with self.assertRaises(SystemExit) as cm:
+            run(main, [str(self.path)])
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()